@@ -3,6 +3,10 @@ from setuptools import find_packages, setup
 setup(
     name='src',
     packages=find_packages(),
+    package_data={
+        'src.data': ['schema.yaml'],
+        'src.visualization': ['dashboard.html', 'simviz.mplstyle'],
+    },
     version='0.1.0',
     description='A short description of the project.',
     author='Manuel Mauro',
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# modules that must stay importable without pulling in the plotting stack
+MODULES = [
+    'src.features.calendar',
+    'src.features.comfort',
+    'src.visualization.visualize',
+]
+# libraries that should only be loaded when a chart is drawn
+HEAVY_MODULES = ['matplotlib', 'seaborn', 'psychrochart', 'scipy']
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ','.join(heavy))
+'''
+
+
+def measure_import(module, repeat=5):
+    '''
+    Imports the module in fresh interpreters and returns the median import
+    time in seconds, together with the heavy libraries it loaded.
+    '''
+    project_dir = Path(__file__).resolve().parents[2]
+    code = PROBE.format(module=module, heavy=HEAVY_MODULES)
+
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, '-c', code],
+                             cwd=str(project_dir),
+                             check=True,
+                             stdout=subprocess.PIPE,
+                             universal_newlines=True).stdout.split()
+        timings.append(float(out[0]))
+        heavy = out[1].split(',') if len(out) > 1 else []
+
+    return statistics.median(timings), heavy
+
+
+@click.command()
+@click.option('--repeat', default=5, help='Fresh interpreters per module.')
+@click.option('--budget', default=0.5, help='Max import time in seconds.')
+def main(repeat, budget):
+    """ Measures the cold import time of the library modules and fails if
+        one of them is over budget or eagerly loads the plotting stack.
+    """
+    logger = logging.getLogger(__name__)
+
+    failed = False
+    for module in MODULES:
+        elapsed, heavy = measure_import(module, repeat)
+        logger.info('%-32s %7.1f ms %s', module, elapsed * 1000,
+                    'loads ' + ', '.join(heavy) if heavy else '')
+        if elapsed > budget or heavy:
+            failed = True
+
+    if failed:
+        raise click.ClickException('import time benchmark failed')
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
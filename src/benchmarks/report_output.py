@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import statistics
+import tempfile
+import time
+import pandas as pd
+from pathlib import Path
+
+from src.data.catalog import build_catalog, query_runs
+from src.data.shared import load_run
+from src.lazy import LazyModule
+from src.visualization.report import DEFAULT_DPI, draw_chart, report_charts
+from src.visualization.report import save_chart
+
+mpl = LazyModule('matplotlib')
+
+# outputs compared for every chart, as (file extension, save_chart arguments)
+OUTPUTS = {
+    'svg': ('svg', {'rasterize': False}),
+    'svg rasterized': ('svg', {}),
+    'pdf': ('pdf', {'rasterize': False}),
+    'pdf rasterized': ('pdf', {}),
+    'png': ('png', {}),
+    'png 256 colors': ('png', {'colors': 256}),
+    'webp': ('webp', {}),
+}
+
+
+def measure_outputs(tables, folder, dpi=DEFAULT_DPI, repeat=3):
+    '''
+    Saves every chart of the report of a run in every output and returns the
+    median save time [s] and the file size [kB] of each, one row per chart
+    and output.
+    '''
+    rows = []
+    for name, draw in report_charts(tables):
+        figure = draw_chart(draw)
+
+        for output, (fmt, kwargs) in OUTPUTS.items():
+            filepath = Path(folder) / '{}.{}'.format(name, fmt)
+
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                save_chart(figure, filepath, dpi, **kwargs)
+                timings.append(time.perf_counter() - start)
+
+            rows.append({
+                'chart': name,
+                'output': output,
+                'time': statistics.median(timings),
+                'size': filepath.stat().st_size / 1024,
+            })
+
+    return pd.DataFrame(rows)
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.option('--query', default=None, help='Filter on the run parameters.')
+@click.option('--dpi', default=DEFAULT_DPI, show_default=True)
+@click.option('--repeat', default=3, help='Saves per chart and output.')
+@click.option('--output', default=None, type=click.Path(),
+              help='CSV file of the measures.')
+def main(processed_filepath, query, dpi, repeat, output):
+    """ Measures the save time and file size of every chart of the report of
+        the first run processed below PROCESSED_FILEPATH, in each output.
+    """
+    logger = logging.getLogger(__name__)
+
+    # charts are rendered off-screen
+    mpl.use('Agg')
+
+    run = query_runs(build_catalog(processed_filepath), query)[0]
+    with tempfile.TemporaryDirectory() as folder:
+        measures = measure_outputs(load_run(run), folder, dpi, repeat)
+
+    for (chart, output_name), row in measures.set_index(
+            ['chart', 'output']).iterrows():
+        logger.info('%-32s %-16s %8.3f s %10.1f kB', chart, output_name,
+                    row['time'], row['size'])
+
+    totals = measures.groupby('output', sort=False)[['time', 'size']].sum()
+    for output_name, row in totals.iterrows():
+        logger.info('total %-26s %-16s %8.3f s %10.1f kB', run.id,
+                    output_name, row['time'], row['size'])
+
+    if output is not None:
+        measures.to_csv(output, index=False)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
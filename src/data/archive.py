@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+import io
+import json
+import numpy as np
+import pandas as pd
+import zipfile
+from pathlib import Path
+
+from src.data.catalog import (INPUT_FILE, RUN_TABLES, load_run_tables,
+                              read_input_parameters)
+from src.data.weather_store import (read_weather, read_weather_records,
+                                    records_file, referenced_file,
+                                    weather_file, weather_reference)
+
+# single file bundling a processed run, saved in its folder: a zip with one
+# compressed .npy member per column and the metadata. The weather is shared
+# with other runs, the metadata only references it in the weather store
+ARCHIVE_FILE = 'run.zip'
+METADATA_MEMBER = 'metadata.json'
+ARCHIVE_TABLES = [table for table in RUN_TABLES if table != 'meteo']
+COMPRESSION_LEVEL = 6
+
+
+def _column_member(table, column):
+    return '{}/{}.npy'.format(table, column)
+
+
+def write_archive(run_path, filepath=None):
+    '''
+    Bundles the processed tables of a run in a single archive, by default
+    ARCHIVE_FILE in the folder of the run. Every column is compressed on its
+    own, so that it can be read without decompressing the others. The
+    metadata holds the layout of the tables, the units of their columns, the
+    input parameters, the location of the weather file and its reference,
+    relative to the folder of the archive.
+    '''
+    run_path = Path(run_path)
+    filepath = filepath or run_path / ARCHIVE_FILE
+
+    metadata = {'tables': dict(), 'units': dict()}
+    if (run_path / INPUT_FILE).exists():
+        metadata['inputs'] = read_input_parameters(run_path /
+                                                   INPUT_FILE).to_dict()
+    if (run_path / 'columns.csv').exists():
+        units = pd.read_csv(run_path / 'columns.csv')
+        for table, group in units.groupby('table'):
+            metadata['units'][table] = dict(zip(group['column'],
+                                                group['unit']))
+
+    with zipfile.ZipFile(filepath,
+                         'w',
+                         compression=zipfile.ZIP_DEFLATED,
+                         compresslevel=COMPRESSION_LEVEL) as archive:
+        for table, df in load_run_tables(run_path, ARCHIVE_TABLES).items():
+            for column in df.columns:
+                values = df[column].to_numpy()
+                # text columns are saved as fixed width strings, not pickled
+                if values.dtype == object:
+                    values = values.astype(str)
+                buffer = io.BytesIO()
+                np.save(buffer, values, allow_pickle=False)
+                archive.writestr(_column_member(table, column),
+                                 buffer.getvalue())
+
+            metadata['tables'][table] = {
+                'columns': list(df.columns),
+                'rows': len(df),
+            }
+
+        if weather_file(run_path).exists():
+            metadata['weather'] = weather_reference(run_path,
+                                                    Path(filepath).parent)
+            _, metadata['location'] = read_weather(weather_file(run_path))
+
+        archive.writestr(METADATA_MEMBER, json.dumps(metadata))
+
+    return filepath
+
+
+def read_archive_metadata(filepath):
+    '''
+    Metadata of a run archive, see write_archive.
+    '''
+    with zipfile.ZipFile(filepath) as archive:
+        return json.loads(archive.read(METADATA_MEMBER))
+
+
+def _read_meteo(filepath, metadata, columns=None):
+    # the records of the referenced weather file, shared with the other runs
+    if 'weather' not in metadata:
+        raise KeyError('meteo')
+    records = read_weather_records(
+        records_file(referenced_file(metadata['weather'],
+                                     Path(filepath).parent)))
+
+    return records if columns is None else records[columns]
+
+
+def _read_table(archive, metadata, table, columns=None):
+    if table == 'meteo':
+        return _read_meteo(archive.filename, metadata, columns)
+    if columns is None:
+        columns = metadata['tables'][table]['columns']
+
+    values = dict()
+    for column in columns:
+        with archive.open(_column_member(table, column)) as member:
+            values[column] = np.lib.format.read_array(member,
+                                                      allow_pickle=False)
+
+    return pd.DataFrame(values, columns=columns)
+
+
+def read_archive_table(filepath, table, columns=None):
+    '''
+    Reads a table of a run archive, or only the given columns of it. The
+    other columns are not decompressed.
+    '''
+    with zipfile.ZipFile(filepath) as archive:
+        metadata = json.loads(archive.read(METADATA_MEMBER))
+        return _read_table(archive, metadata, table, columns)
+
+
+def read_archive(filepath, tables=RUN_TABLES):
+    '''
+    Reads the tables of a run archive in a dictionary, as load_run_tables
+    does for a folder. Missing tables are skipped.
+    '''
+    with zipfile.ZipFile(filepath) as archive:
+        metadata = json.loads(archive.read(METADATA_MEMBER))
+        return {
+            table: _read_table(archive, metadata, table)
+            for table in tables
+            if table in metadata['tables'] or
+            (table == 'meteo' and 'weather' in metadata)
+        }
+
+
+def read_archive_weather(filepath):
+    '''
+    Weather of a run archive, as returned by read_epw: the hourly records
+    (with the psychrometric properties added by make_dataset) and the
+    metadata of the location.
+    '''
+    metadata = read_archive_metadata(filepath)
+
+    return _read_meteo(filepath, metadata), metadata['location']
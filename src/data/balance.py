@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+
+# a block of a TRNSYS Type56 balance file: its title (empty if missing),
+# column names, units, the sign of each term in the balance equation and the
+# numeric values as a 2D array
+BalanceBlock = namedtuple('BalanceBlock',
+                          ['title', 'columns', 'units', 'signs', 'values'])
+
+# zone number used by TRNSYS for the whole building
+TOTAL_ZONE = 0
+
+
+def _is_number(token):
+    try:
+        float(token)
+    except ValueError:
+        return False
+    return True
+
+
+def _parse_header(tokens):
+    '''
+    Splits the header of a block into column names and signs. Terms of the
+    balance equation are written as e.g. "BAL_ENERGY= -DQAIRdt +QHEAT", the
+    separators used by the hourly files are dropped.
+    '''
+    columns, signs = [], []
+    for token in tokens:
+        name = token.strip('|').rstrip('=')
+        if not name:
+            continue
+        signs.append(-1 if name[0] == '-' else 1)
+        columns.append(name.lstrip('+-'))
+
+    return columns, signs
+
+
+def parse_balance(filepath):
+    '''
+    Parses a balance file in a list of blocks. A block starts with an optional
+    title, followed by a header and a units row, then by its numeric rows.
+    Blocks without a header (e.g. the total of all zones) share the one of the
+    previous block. The rows of each block are converted in bulk, a row with
+    more or fewer values than the columns of its block raises ValueError.
+    '''
+    with open(filepath, 'r') as bal:
+        lines = [line.replace('|', ' ').split() for line in bal]
+    lines = [tokens for tokens in lines if tokens]
+    numeric = [_is_number(tokens[0]) for tokens in lines] + [True, True]
+
+    blocks = []
+    title, columns, units, signs, rows = '', [], [], [], []
+
+    def close_block():
+        if rows:
+            for row in rows:
+                if len(row) != len(columns):
+                    raise ValueError(
+                        '{} values in a row of {} with {} columns: {}'.format(
+                            len(row), filepath, len(columns), ' '.join(row)))
+            values = np.array(rows, dtype=float)
+            blocks.append(BalanceBlock(title, columns, units, signs, values))
+
+    i = 0
+    while i < len(lines):
+        if numeric[i]:
+            rows.append(lines[i])
+        elif not numeric[i + 1] and numeric[i + 2]:
+            # a header followed by its units row, the title is kept only if
+            # it was right above
+            if rows:
+                close_block()
+                title, rows = '', []
+            columns, signs = _parse_header(lines[i])
+            units = lines[i + 1]
+            i += 1
+        else:
+            # a title, the header comes next or is the previous one
+            close_block()
+            title, rows = ' '.join(lines[i]), []
+        i += 1
+    close_block()
+
+    return blocks
+
+
+def read_summary(filepath):
+    '''
+    Reads the SUMMARY.BAL of a simulation. Returns the balance of each zone,
+    the balance of the whole building (zone 0) and a dictionary with the
+    units of the columns.
+    '''
+    blocks = parse_balance(filepath)
+    columns = blocks[0].columns
+    values = np.vstack([block.values for block in blocks])
+
+    total = values[:, columns.index('Zonenr')] == TOTAL_ZONE
+    zones = pd.DataFrame(values[~total], columns=columns)
+    building = pd.DataFrame(values[total], columns=columns)
+    for df in (zones, building):
+        df['Zonenr'] = df['Zonenr'].astype(int)
+
+    return zones, building, dict(zip(columns, blocks[0].units))
+
+
+def balance_signs(filepath):
+    '''
+    Sign of each term of the balance equation of a balance file, as written
+    in the header of its first block.
+    '''
+    block = parse_balance(filepath)[0]
+
+    return dict(zip(block.columns, block.signs))
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+import click
+from collections import namedtuple
+import logging
+import pandas as pd
+from pathlib import Path
+
+from src.data.weather_store import (read_weather_records, records_file,
+                                    weather_file)
+
+INPUT_FILE = 'cultural-e-input.csv'
+CATALOG_FILE = 'catalog.parquet'
+# processed tables of a run, the hourly ones first
+RUN_TABLES = [
+    'cultural-e', 'energy_zones', 'meteo', 'summary', 'summary-total'
+]
+
+# handle to a processed run, the path points to its folder
+Run = namedtuple('Run', ['id', 'path'])
+
+
+def read_input_parameters(filepath):
+    '''
+    Reads the design parameters of a run from its cultural-e-input.csv,
+    dropping the TIME column and the unused label columns.
+    '''
+    df = pd.read_csv(filepath, index_col=False, nrows=1)
+    columns = [
+        c for c in df.columns if c != 'TIME' and not c.startswith('label')
+    ]
+
+    return df[columns].iloc[0].astype(float)
+
+
+def table_file(run_path, table):
+    '''
+    File of a processed table of a run, the meteo may be in the weather store.
+    The runs processed before the weather records were saved only have their
+    weather file, read_weather_records derives the meteo from it.
+    '''
+    if table == 'meteo':
+        return records_file(weather_file(run_path))
+    return Path(run_path) / (table + '.csv')
+
+
+def load_run_tables(run_path, tables=RUN_TABLES):
+    '''
+    Reads the processed tables of a run in a dictionary, missing tables are
+    skipped. The meteo is resolved through the weather store and shared by
+    the runs with the same weather file.
+    '''
+    loaded = dict()
+    for name in tables:
+        filepath = table_file(run_path, name)
+        if not filepath.exists():
+            continue
+        if name == 'meteo':
+            loaded[name] = read_weather_records(filepath)
+        else:
+            loaded[name] = pd.read_csv(filepath, index_col=False)
+
+    return loaded
+
+
+def build_catalog(processed_filepath):
+    '''
+    Collects the input parameters of every processed run found below the
+    given folder in a single table indexed by run. The id of a run is the
+    path of its folder relative to the given one.
+    '''
+    root = Path(processed_filepath)
+
+    runs, rows = [], []
+    for src in sorted(root.rglob(INPUT_FILE)):
+        run_dir = src.parent
+        run_id = run_dir.relative_to(root).as_posix()
+        runs.append(root.name if run_id == '.' else run_id)
+        rows.append(read_input_parameters(src).to_dict())
+        rows[-1]['path'] = str(run_dir)
+
+    catalog = pd.DataFrame(rows, index=pd.Index(runs, name='run'))
+
+    # keep the path first, followed by the parameters
+    return catalog.reindex(
+        columns=['path'] + [c for c in catalog.columns if c != 'path'])
+
+
+def save_catalog(catalog, filepath):
+    '''
+    Saves a catalog built by build_catalog as Parquet, indexed by run: the
+    parameters keep their types and are read back column by column.
+    '''
+    catalog.to_parquet(filepath)
+
+
+def load_catalog(filepath, columns=None):
+    '''
+    Loads a catalog saved by save_catalog, or only the given columns of it.
+    '''
+    return pd.read_parquet(filepath, columns=columns)
+
+
+def query_runs(catalog, expr):
+    '''
+    Returns the handles of the runs whose parameters satisfy the expression,
+    e.g. "IN_U_ROOF < 0.2 and IN_kWp > 5", or of all the runs if None.
+    '''
+    selected = catalog.query(expr) if expr else catalog
+
+    return [Run(run, path) for run, path in selected['path'].items()]
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.argument('catalog_filepath', type=click.Path(), required=False)
+def main(processed_filepath, catalog_filepath):
+    """ Builds the catalog of the input parameters of all the processed runs
+        below PROCESSED_FILEPATH (saved in PROCESSED_FILEPATH/catalog.parquet
+        by default).
+    """
+    logger = logging.getLogger(__name__)
+
+    if catalog_filepath is None:
+        catalog_filepath = str(Path(processed_filepath) / CATALOG_FILE)
+
+    catalog = build_catalog(processed_filepath)
+    save_catalog(catalog, catalog_filepath)
+
+    logger.info('catalog of %d runs saved to %s', len(catalog),
+                catalog_filepath)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
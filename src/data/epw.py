@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+
+# column names of the EPW data records, the same used by pvlib.iotools
+EPW_COLUMNS = [
+    'year', 'month', 'day', 'hour', 'minute', 'data_source_unct', 'temp_air',
+    'temp_dew', 'relative_humidity', 'atmospheric_pressure', 'etr', 'etrn',
+    'ghi_infrared', 'ghi', 'dni', 'dhi', 'global_hor_illum',
+    'direct_normal_illum', 'diffuse_horizontal_illum', 'zenith_luminance',
+    'wind_direction', 'wind_speed', 'total_sky_cover', 'opaque_sky_cover',
+    'visibility', 'ceiling_height', 'present_weather_observation',
+    'present_weather_codes', 'precipitable_water', 'aerosol_optical_depth',
+    'snow_depth', 'days_since_last_snowfall', 'albedo',
+    'liquid_precipitation_depth', 'liquid_precipitation_quantity'
+]
+# units of the EPW data records and of the columns added by make_dataset
+EPW_UNITS = {
+    'temp_air': 'C',
+    'temp_dew': 'C',
+    'relative_humidity': '%',
+    'atmospheric_pressure': 'Pa',
+    'etr': 'Wh/m2',
+    'etrn': 'Wh/m2',
+    'ghi_infrared': 'Wh/m2',
+    'ghi': 'Wh/m2',
+    'dni': 'Wh/m2',
+    'dhi': 'Wh/m2',
+    'global_hor_illum': 'lux',
+    'direct_normal_illum': 'lux',
+    'diffuse_horizontal_illum': 'lux',
+    'zenith_luminance': 'Cd/m2',
+    'wind_direction': 'deg',
+    'wind_speed': 'm/s',
+    'total_sky_cover': 'tenths',
+    'opaque_sky_cover': 'tenths',
+    'visibility': 'km',
+    'ceiling_height': 'm',
+    'precipitable_water': 'mm',
+    'aerosol_optical_depth': 'thousandths',
+    'snow_depth': 'cm',
+    'days_since_last_snowfall': 'days',
+    'liquid_precipitation_depth': 'mm',
+    'liquid_precipitation_quantity': 'h',
+    'humidity_ratio': 'kg/kg',
+    'enthalpy': 'kJ/kg',
+}
+# fields of the LOCATION header line
+EPW_LOCATION = [
+    'loc', 'city', 'state-prov', 'country', 'data_type', 'WMO_code',
+    'latitude', 'longitude', 'TZ', 'altitude'
+]
+EPW_HEADER_ROWS = 8
+
+
+def read_epw(filepath):
+    '''
+    Reads an EnergyPlus weather file without the overhead of pvlib. Returns
+    the hourly records, indexed by the hour of the year, and the metadata of
+    the LOCATION line.
+    '''
+    with open(filepath, 'r') as epw:
+        location = epw.readline().rstrip('\n').split(',')
+
+    metadata = dict(zip(EPW_LOCATION, location))
+    del metadata['loc']
+    for key in ['latitude', 'longitude', 'TZ', 'altitude']:
+        metadata[key] = float(metadata[key])
+
+    data = pd.read_csv(filepath,
+                       skiprows=EPW_HEADER_ROWS,
+                       header=None,
+                       names=EPW_COLUMNS)
+
+    return data, metadata
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import pandas as pd
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.data.catalog import (INPUT_FILE, RUN_TABLES, read_input_parameters,
+                              table_file)
+from src.data.weather_store import (read_weather, read_weather_records,
+                                    weather_file)
+
+# files read at the same time, reads from network storage are bound by
+# latency rather than bandwidth
+MAX_CONCURRENT_READS = 16
+
+# tables of a run that are not processed .csv files, with their file and
+# reader; any other table is read from its file as in load_run_tables
+READERS = {
+    'inputs': (lambda run_path: Path(run_path) / INPUT_FILE,
+               read_input_parameters),
+    'weather': (weather_file, lambda path: read_weather(path)[0]),
+    'meteo': (lambda run_path: table_file(run_path, 'meteo'),
+              read_weather_records),
+}
+
+
+def _table_file(run_path, table):
+    '''
+    File and reader of a table of a run.
+    '''
+    locate, reader = READERS.get(
+        table, (lambda run_path: table_file(run_path, table),
+                lambda path: pd.read_csv(path, index_col=False)))
+
+    return locate(run_path), reader
+
+
+async def _read_table(path, reader, semaphore, executor):
+    '''
+    Reads and parses a file in the executor, once the semaphore allows it.
+    '''
+    async with semaphore:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, reader, path)
+
+
+async def _load_run(run, tables, semaphore, executor):
+    '''
+    Reads the tables of a run concurrently, missing tables are skipped.
+    '''
+    files = {table: _table_file(run.path, table) for table in tables}
+    files = {table: f for table, f in files.items() if f[0].exists()}
+    values = await asyncio.gather(*[
+        _read_table(path, reader, semaphore, executor)
+        for path, reader in files.values()
+    ])
+
+    return run, dict(zip(files, values))
+
+
+async def iter_runs(runs, tables=RUN_TABLES,
+                    max_reads=MAX_CONCURRENT_READS):
+    '''
+    Asynchronous generator of the tables of the given runs (as returned by
+    query_runs), yielding (run, tables) as soon as all the tables of a run
+    are read, in no particular order. At most max_reads files are read at
+    the same time, each read and parsed in a thread, and only as many runs
+    are loaded ahead of the consumer.
+
+    Tables are named as in load_run_tables, with 'inputs' for the input
+    parameters and 'weather' for the parsed weather file. Weather files shared
+    by many runs are parsed once.
+    '''
+    runs = iter(runs)
+    semaphore = asyncio.Semaphore(max_reads)
+
+    with ThreadPoolExecutor(max_reads) as executor:
+        pending = set()
+        try:
+            while True:
+                while len(pending) < max_reads:
+                    run = next(runs, None)
+                    if run is None:
+                        break
+                    pending.add(
+                        asyncio.ensure_future(
+                            _load_run(run, tables, semaphore, executor)))
+
+                if not pending:
+                    return
+
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            # the consumer stopped early, the runs loaded ahead are dropped
+            for task in pending:
+                task.cancel()
+
+
+async def _produce(runs, tables, max_reads, results, stop):
+    '''
+    Puts the runs read by iter_runs in a queue, until they are all read or
+    the consumer stops.
+    '''
+    loop = asyncio.get_running_loop()
+    async for item in iter_runs(runs, tables, max_reads):
+        # wait for the consumer without blocking the reads in progress
+        await loop.run_in_executor(None, results.put, item)
+        if stop.is_set():
+            break
+
+
+def _run_producer(runs, tables, max_reads, results, stop, done):
+    '''
+    Runs _produce in a new event loop, followed by done or the error raised.
+    '''
+    try:
+        asyncio.run(_produce(runs, tables, max_reads, results, stop))
+        item = done
+    except Exception as error:
+        item = error
+    if not stop.is_set():
+        results.put(item)
+
+
+def _drain(results, thread):
+    '''
+    Empties the queue of a producer thread until it ends: a producer waiting
+    for room in the queue sees that it must stop once its item is taken.
+    '''
+    while thread.is_alive():
+        try:
+            results.get(timeout=0.1)
+        except queue.Empty:
+            pass
+
+
+def stream_runs(runs, tables=RUN_TABLES, max_reads=MAX_CONCURRENT_READS):
+    '''
+    Generator version of iter_runs, for code that is not asynchronous. The
+    event loop runs in a background thread, so that it also works where a
+    loop is already running (e.g. in notebooks). Closing the generator, or
+    leaving a loop over it early, stops the loop and waits for the reads in
+    progress.
+    '''
+    results = queue.Queue(maxsize=max_reads)
+    done = object()
+    stop = threading.Event()
+
+    thread = threading.Thread(target=_run_producer,
+                              args=(runs, tables, max_reads, results, stop,
+                                    done),
+                              daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            item = results.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        _drain(results, thread)
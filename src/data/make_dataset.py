@@ -1,202 +1,347 @@
 # -*- coding: utf-8 -*-
 import click
+from collections import namedtuple
 from dotenv import find_dotenv, load_dotenv
+from fnmatch import fnmatchcase
+from functools import lru_cache, partial
+import io
 import logging
-from itertools import chain
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import re
-from shutil import copyfile
 
-
-def clean_energy_zones(input_filepath, output_filepath):
+from src.data.archive import write_archive
+from src.data.balance import read_summary
+from src.data.epw import EPW_UNITS
+from src.data.schema import DEFAULT_SCHEMA, read_schema
+from src.data.validation import validate_run
+from src.data.weather_store import (WEATHER_STORE, read_weather,
+                                    read_weather_records, store_weather,
+                                    weather_file, write_reference)
+from src.features.psychrometrics import (standard_pressure,
+                                         weather_psychrometrics,
+                                         zone_psychrometrics)
+from src.features.units import infer_unit
+
+# processed tables described in the columns metadata
+PROCESSED_TABLES = {
+    'summary': 'summary.csv',
+    'summary-total': 'summary-total.csv',
+    'energy_zones': 'energy_zones.csv',
+    'cultural-e': 'cultural-e.csv',
+    'meteo': 'meteo.csv',
+}
+# report of the checks on the parsed tables, saved with the processed ones
+VALIDATION_FILE = 'validation.csv'
+
+# characters allowed in the header rows of the TRNSYS outputs
+HEADER = re.compile('[^ A-Za-z1-9_\n]*')
+# the columns of the .BAL are prefixed by the zone number, zeros included
+BAL_HEADER = re.compile('[^ A-Za-z0-9_\n]*')
+PIPES = re.compile(r'\|')
+SPACES = re.compile(' +')
+BLANKS = re.compile('[ \t]+')
+
+# a table of the schema ready to be applied to many runs
+Step = namedtuple('Step', ['table', 'pattern', 'parser', 'parse', 'finish'])
+
+
+def parse_bal(src):
     '''
-    Converts the .BAL containing the output of the simulation for each zone to a proper .csv file.
+    Reads a .BAL with the output of the simulation for each zone. Returns the
+    table and the units of its columns, taken from the second row.
     '''
-    src = input_filepath + '/Energy_zone.BAL'
-    dst = output_filepath + '/energy_zones.csv'
+    with open(src, 'r') as bal:
+        # remove forbidden characters from title row and format it as csv
+        header = BAL_HEADER.sub('', bal.readline())
+        header = SPACES.sub(',', PIPES.sub('', header))
+        columns = header[1:].rstrip('\n').split(',')
+        units = PIPES.sub(' ', bal.readline()).split()
+
+        rows = [SPACES.sub(',', PIPES.sub('', line))[1:] for line in bal]
+
+    df = pd.read_csv(io.StringIO(header[1:] + ''.join(rows)), index_col=False)
 
-    bal = open(src, 'r')
-    csv = open(dst, 'w')
+    if len(units) != len(columns):
+        logging.getLogger(__name__).warning(
+            'units row of %s does not match its header', src)
+        return {'': df}, dict()
+    return {'': df}, dict(zip(columns, units))
 
-    line = bal.readline()
-    # remove forbidden characters from title row
-    o = re.sub('[^ A-Za-z1-9_\n]*', '', line)
-    # format row as csv
-    o = re.sub(r'\|', '', o)
-    o = re.sub(' +', ',', o)
 
-    csv.write(o[1:])
+def parse_out(src):
+    '''
+    The .out file is a sort of csv that uses whitespaces as separators, we
+    read it as a table. Units are not available.
+    '''
+    with open(src, 'r') as out:
+        # remove forbidden characters from title row and format it as csv
+        header = SPACES.sub(',', HEADER.sub('', out.readline()))[1:-2] + '\n'
+        rows = [BLANKS.sub(',', line)[1:-2] + '\n' for line in out]
 
-    # skip second row containing units
-    bal.readline()
+    df = pd.read_csv(io.StringIO(header + ''.join(rows)), index_col=False)
+    # keep repeated names, e.g. the label columns of the inputs
+    df.columns = header.rstrip('\n').split(',')
 
-    # format remaining rows
-    for line in bal.readlines():
-        o = re.sub(r'\|', '', line)
-        o = re.sub(' +', ',', o)
-        csv.write(o[1:])
+    return {'': df}, dict()
 
 
-def fix_year_in_energy_zones(input_filepath, output_filepath):
+def parse_summary(src):
     '''
-    The simulation has a warm-up time of one month and runs for 13 months, thus it is necessary 
-    to skip the data for the first month of the simulation and consider in its place the following
-    January.
+    Reads the .BAL containing the simulation summary. The balance of the
+    whole building (zone 0) goes to a separate table with the -total suffix.
     '''
-    src = output_filepath + '/energy_zones.csv'
-    dst = output_filepath + '/energy_zones.csv'
+    zones, building, units = read_summary(src)
 
-    df = pd.read_csv(src, index_col=False)
+    return {'': zones, '-total': building}, units
 
-    df.drop(range(0, 745), inplace=True)
-    df = df.reindex(chain(range(8760, 9505), range(745, 8760)))
-    df.reset_index(inplace=True)
 
-    del df['index']
-    del df['TIME']
-    df['TIME'] = df.index
+def parse_epw(src):
+    '''
+    The weather file is already in a proper format, it is stored as is.
+    '''
+    return dict(), EPW_UNITS
 
-    df = df.reindex(columns=['TIME'] + [i for i in df.columns if i != 'TIME'])
 
-    df.to_csv(dst, index=False)
+PARSE_FUNCTIONS = {
+    'summary': parse_summary,
+    'bal': parse_bal,
+    'out': parse_out,
+    'epw': parse_epw,
+}
 
 
-def clean_energy_balance(input_filepath, output_filepath):
+def fix_year(df, skip=0, rotate=0, timestep=1):
     '''
-    Converts the .BAL containing the simulation summary to a proper .csv file.
+    The simulation has a warm-up time and runs past the end of the year, thus
+    it is necessary to skip the warm-up rows and move the last rows (e.g. the
+    following January) to the start. TIME is rewritten from the start of the
+    year.
     '''
-    src = input_filepath + '/SUMMARY.BAL'
-    dst = output_filepath + '/summary.csv'
+    df = df.iloc[skip:]
+    n = len(df)
+    df = df.iloc[np.r_[n - rotate:n, 0:n - rotate]].reset_index(drop=True)
+    df['TIME'] = df.index * timestep
 
-    bal = open(src, 'r')
-    csv = open(dst, 'w')
+    return df.reindex(columns=['TIME'] +
+                      [i for i in df.columns if i != 'TIME'])
 
-    # skip first two rows containing the title
-    bal.readline()
-    bal.readline()
 
-    line = bal.readline()
-    # remove forbidden characters from title row
-    o = re.sub('[^ A-Za-z1-9_\n]*', '', line)
-    # format row as csv
-    o = re.sub(r'\|', '', o)
-    o = re.sub(' +', ',', o)
+@lru_cache(maxsize=None)
+def column_dtypes(dtypes, columns):
+    '''
+    Type of each column matching the glob patterns of the schema, given as a
+    tuple of (pattern, dtype). Cached, since the runs of a batch share their
+    columns.
+    '''
+    return {
+        column: dtype
+        for pattern, dtype in dtypes for column in columns
+        if fnmatchcase(column, pattern)
+    }
 
-    csv.write(o[1:])
 
-    # skip second row containing units
-    bal.readline()
+def finish_table(df, skip, rotate, timestep, dtypes, pressure=None):
+    '''
+    Fixes the year of a parsed table when it has warm-up or rotated rows, and
+    applies the column types of the schema. Given the pressure of the site,
+    the psychrometric state of the zones of the table is completed too.
+    '''
+    if skip or rotate:
+        df = fix_year(df, skip, rotate, timestep)
+    if dtypes:
+        df = df.astype(column_dtypes(dtypes, tuple(df.columns)))
+    if pressure is not None:
+        # zones report either their relative humidity or their humidity
+        # ratio, the missing one is derived for all the zones at once
+        df = zone_psychrometrics(df, pressure)
 
-    # format remaining rows
-    for line in bal.readlines()[:-2]:
-        o = re.sub(r'\|', '', line)
-        o = re.sub(' +', ',', o)
-        csv.write(o[1:])
+    return df
 
 
-def clean_cultural_e(input_filepath, output_filepath):
+def compile_schema(schema):
     '''
-    The .out file is a sort of csv that uses whitespaces as separators, we convert it to a
-    .csv in a more classical dialect.
+    Binds the parser and the options of every table of a schema (as read by
+    src.data.schema.read_schema) once, so that the resulting steps can be
+    applied to any number of runs.
     '''
-    src = input_filepath + '/Cultural-e_output.out'
-    dst = output_filepath + '/cultural-e.csv'
+    steps = []
+    for table, options in schema['tables'].items():
+        finish = partial(finish_table,
+                         skip=options['skip'],
+                         rotate=options['rotate'],
+                         timestep=schema['timestep'],
+                         dtypes=tuple(options['dtypes'].items()))
+        steps.append(
+            Step(table, options['pattern'], options['parser'],
+                 PARSE_FUNCTIONS[options['parser']], finish))
 
-    bal = open(src, 'r')
-    csv = open(dst, 'w')
+    return steps
 
-    line = bal.readline()
-    # remove forbidden characters from title row
-    o = re.sub('[^ A-Za-z_1-9\n]*', '', line)
-    # format row as csv
-    o = re.sub(' +', ',', o)
 
-    csv.write(o[1:-2] + '\n')
+def match_file(run_path, pattern):
+    '''
+    The single file of a run matching a pattern of the schema.
+    '''
+    matches = sorted(Path(run_path).glob(pattern))
+    if len(matches) != 1:
+        raise FileNotFoundError('{} files match {} in {}, expected 1'.format(
+            len(matches), pattern, run_path))
 
-    # format remaining rows
-    for line in bal.readlines():
-        o = re.sub('[ \t]+', ',', line)
-        csv.write(o[1:-2] + '\n')
+    return matches[0]
 
 
-def fix_year_in_cultural_e(input_filepath, output_filepath):
+def find_runs(input_filepath, steps):
     '''
-    The simulation has a warm-up time of one month and runs for 13 months, thus it is necessary 
-    to skip the data for the first month of the simulation and consider in its place the following
-    January.
+    Folders below the given one (itself included) containing the file of the
+    first table of the schema, each is processed as a run.
     '''
-    src = output_filepath + '/cultural-e.csv'
-    dst = output_filepath + '/cultural-e.csv'
+    root = Path(input_filepath)
+    folders = [root] + sorted(p for p in root.rglob('*') if p.is_dir())
 
-    df = pd.read_csv(src, index_col=False)
+    return [f for f in folders if any(f.glob(steps[0].pattern))]
 
-    df = df.reindex(chain(range(8015, 8760), range(0, 8015)))
-    df.reset_index(inplace=True)
 
-    del df['index']
-    del df['TIME']
-    df['TIME'] = df.index
+def store_run_weather(src, output_filepath, store_path):
+    '''
+    Adds the weather file of a run to the store and references it from the
+    run. The parsed weather file is saved with the psychrometric properties
+    of the outdoor air, so that the charts never compute them point by point;
+    in the store this is done once for all the runs sharing it. Returns the
+    records and the metadata of the location.
+    '''
+    digest = store_weather(src, store_path)
+    write_reference(output_filepath, digest, store_path)
 
-    df = df.reindex(columns=['TIME'] + [i for i in df.columns if i != 'TIME'])
+    weather, metadata = read_weather(weather_file(output_filepath))
+    records = weather_file(output_filepath, '.csv')
+    if not records.exists():
+        weather_psychrometrics(weather).to_csv(records, index=False)
 
-    df.to_csv(dst, index=False)
+    return read_weather_records(records), metadata
 
 
-def clean_cultural_e_input(input_filepath, output_filepath):
+def clean_run(steps, input_filepath, output_filepath, store_path):
     '''
-    The .out file is a sort of csv that uses whitespaces as separators, we convert it to a
-    .csv in a more classical dialect.
+    Converts the raw files of a run to the processed tables following the
+    compiled schema. Weather files are added to the store and referenced by
+    the run instead of being copied, and the zones get their psychrometric
+    state at the pressure of the site. Returns the units of the columns of
+    each table, the tables as parsed, before fixing their year, and the
+    processed ones.
     '''
-    src = input_filepath + '/Cultural-e_input.out'
-    dst = output_filepath + '/cultural-e-input.csv'
-
-    bal = open(src, 'r')
-    csv = open(dst, 'w')
-
-    line = bal.readline()
-    # remove forbidden characters from title row
-    o = re.sub('[^ A-Za-z_1-9\n]*', '', line)
-    # format row as csv
-    o = re.sub(' +', ',', o)
+    units, parsed, processed = dict(), dict(), dict()
+    pressure = None
+    # the weather first, the zones need the altitude of the site
+    for step in sorted(steps, key=lambda step: step.parser != 'epw'):
+        src = match_file(input_filepath, step.pattern)
+        tables, table_units = step.parse(src)
+
+        if step.parser == 'epw':
+            processed[step.table], location = store_run_weather(
+                src, output_filepath, store_path)
+            units[step.table] = table_units
+            # the indoor pressure is taken as the standard one at the site
+            # altitude
+            pressure = standard_pressure(location['altitude'])
+        for suffix, df in tables.items():
+            df = step.finish(df, pressure=pressure)
+            df.to_csv(output_filepath + '/' + step.table + suffix + '.csv',
+                      index=False)
+            units[step.table + suffix] = table_units
+            parsed[step.table + suffix] = tables[suffix]
+            processed[step.table + suffix] = df
+
+    return units, parsed, processed
+
+
+def write_columns_metadata(output_filepath, tables, units):
+    '''
+    Saves the unit of every column of the processed tables, given in a
+    dictionary, in a single file. Units come from the units rows of the .BAL
+    files when available, the outputs without a units row use the TRNSYS
+    defaults for their variable.
+    '''
+    dst = output_filepath + '/columns.csv'
 
-    csv.write(o[1:-2] + '\n')
+    rows = []
+    for table in PROCESSED_TABLES:
+        if table not in tables:
+            continue
+        for column in tables[table].columns:
+            unit = units.get(table, dict()).get(column, infer_unit(column))
+            rows.append((table, column, unit))
 
-    # format remaining rows
-    for line in bal.readlines():
-        o = re.sub('[ \t]+', ',', line)
-        csv.write(o[1:-2] + '\n')
+    metadata = pd.DataFrame(rows, columns=['table', 'column', 'unit'])
+    metadata.to_csv(dst, index=False)
 
 
-def clean_meteo(input_filepath, output_filepath):
+def report_validation(report, run):
     '''
-    The weather file is already in a proper format, we just rename and copy it to the processed
-    folder.
+    Logs the failed checks of the validation report of a run, one line each.
     '''
-    src = input_filepath + '/Bolzano-metenorm-extreme.epw'
-    dst = output_filepath + '/meteo.epw'
+    logger = logging.getLogger(__name__)
 
-    copyfile(src, dst)
+    failed = report[report['failed'] > 0]
+    for row in failed.itertuples():
+        logger.warning('%s: %s of %s failed on %d of %d, worst %.3g (%s)',
+                       run, row.check, row.table, row.failed, row.checked,
+                       row.worst, row.worst_item)
+    if failed.empty:
+        logger.info('%s: %d checks passed', run, len(report))
 
 
 @click.command()
 @click.argument('input_filepath', type=click.Path(exists=True))
 @click.argument('output_filepath', type=click.Path())
-def main(input_filepath, output_filepath):
+@click.option('--schema',
+              type=click.Path(exists=True),
+              default=str(DEFAULT_SCHEMA),
+              help='Run schema (.yaml) describing the raw files.')
+@click.option('--validate/--no-validate',
+              default=True,
+              help='Check the energy balances and the fixed year.')
+@click.option('--archive/--no-archive',
+              default=True,
+              help='Bundle every processed run in a single file too.')
+def main(input_filepath, output_filepath, schema, validate, archive):
     """ Runs data processing scripts to turn raw data from (../raw) into
-        cleaned data ready to be analyzed (saved in ../processed).
+        cleaned data ready to be analyzed (saved in ../processed). Every
+        folder below INPUT_FILEPATH with the files of the schema is processed
+        as a run, in the same relative folder below OUTPUT_FILEPATH. The
+        weather files are stored once for all the runs in its weather folder.
     """
     logger = logging.getLogger(__name__)
     logger.info('making final data set from raw data')
 
-    # check the docstrings of each function to better understand the cleanup phase
-    clean_energy_balance(input_filepath, output_filepath)
-    clean_energy_zones(input_filepath, output_filepath)
-    fix_year_in_energy_zones(input_filepath, output_filepath)
-    clean_cultural_e(input_filepath, output_filepath)
-    fix_year_in_cultural_e(input_filepath, output_filepath)
-    clean_cultural_e_input(input_filepath, output_filepath)
-    clean_meteo(input_filepath, output_filepath)
+    schema = read_schema(schema)
+    steps = compile_schema(schema)
+    runs = find_runs(input_filepath, steps)
+    if not runs:
+        logger.warning('no run matching the schema found in %s',
+                       input_filepath)
+
+    store_path = Path(output_filepath) / WEATHER_STORE
+    for run in runs:
+        dst = Path(output_filepath) / run.relative_to(input_filepath)
+        dst.mkdir(parents=True, exist_ok=True)
+
+        # check the docstrings of each function to better understand the
+        # cleanup phase
+        units, parsed, processed = clean_run(steps, str(run), str(dst),
+                                             store_path)
+        write_columns_metadata(str(dst), processed, units)
+
+        if validate:
+            report = validate_run(parsed, schema)
+            report.to_csv(dst / VALIDATION_FILE, index=False)
+            report_validation(report, run)
+        if archive:
+            write_archive(dst)
+
+        logger.info('run %s ready', run)
+
     logger.info('final data set ready')
 
 
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+import yaml
+
+# schema of the example data, see the comments in the file for the fields
+DEFAULT_SCHEMA = Path(__file__).with_name('schema.yaml')
+
+PARSERS = ['summary', 'bal', 'out', 'epw']
+TABLE_DEFAULTS = {'skip': 0, 'rotate': 0, 'dtypes': {}}
+
+
+def read_schema(filepath=DEFAULT_SCHEMA):
+    '''
+    Reads a run schema, checking its parsers and filling the optional fields
+    of the tables with their defaults.
+    '''
+    with open(filepath, 'r') as f:
+        schema = yaml.safe_load(f)
+
+    tables = dict()
+    for name, table in schema['tables'].items():
+        if 'pattern' not in table:
+            raise ValueError('Table {} of {} has no pattern'.format(
+                name, filepath))
+        if table.get('parser') not in PARSERS:
+            raise ValueError('Unknown parser {} for table {} of {}'.format(
+                table.get('parser'), name, filepath))
+        tables[name] = {**TABLE_DEFAULTS, **table}
+
+    return {'timestep': schema.get('timestep', 1), 'tables': tables}
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+import click
+import hashlib
+import json
+import logging
+import numpy as np
+import os
+import pandas as pd
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+from src.data.archive import ARCHIVE_FILE, read_archive, read_archive_table
+from src.data.catalog import (build_catalog, load_run_tables, query_runs,
+                              table_file)
+from src.data.weather_store import read_weather_records
+
+# shared memory blocks are named after a hash of the run id: the layout of
+# the run has no suffix, its tables are numbered. The layout and the registry
+# hold the pid of the server that wrote them, their owner
+BLOCK_PREFIX = 'simviz_'
+REGISTRY_BLOCK = BLOCK_PREFIX + 'registry'
+
+# blocks attached by this process with the tables viewing them, the blocks
+# must stay open as long as the views are used
+_attached = dict()
+
+
+def block_name(run_id, table=None):
+    '''
+    Name of the shared memory block with the layout of a run, or with the
+    table at the given position of the layout.
+    '''
+    name = BLOCK_PREFIX + hashlib.sha1(run_id.encode()).hexdigest()[:16]
+    return name if table is None else '{}_{}'.format(name, table)
+
+
+def _create_block(name, size):
+    '''
+    Creates a shared memory block, raising FileExistsError if it exists: the
+    blocks of a server that did not shut down cleanly are removed beforehand
+    by _unlink_stale, a block is never replaced otherwise.
+    '''
+    return shared_memory.SharedMemory(name, create=True, size=max(size, 1))
+
+
+def _attach_block(name):
+    '''
+    Attaches an existing shared memory block without taking ownership of it.
+    '''
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        # before Python 3.13 the resource tracker of this process would
+        # unlink the block when it exits
+        block = shared_memory.SharedMemory(name)
+        resource_tracker.unregister(block._name, 'shared_memory')
+        return block
+
+
+def _write_json(name, content):
+    data = json.dumps(content).encode()
+    block = _create_block(name, len(data))
+    block.buf[:len(data)] = data
+
+    return block
+
+
+def _read_json(name):
+    block = _attach_block(name)
+    # blocks may be rounded up to the page size, the padding is zeroed
+    content = json.loads(bytes(block.buf).rstrip(b'\0'))
+    block.close()
+
+    return content
+
+
+def _is_running(pid):
+    '''
+    Whether a process is running, a pid reused by another one counts as
+    running.
+    '''
+    if os.name == 'nt':
+        # the blocks are freed with their last handle on Windows, an existing
+        # block has a running owner (and os.kill would terminate it)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+
+    return True
+
+
+def _unlink_stale(name):
+    '''
+    Removes the layout or registry block with the given name, together with
+    the table blocks it lists, if the server that wrote it is no longer
+    running. Raises FileExistsError if it is.
+    '''
+    try:
+        content = _read_json(name)
+    except FileNotFoundError:
+        return
+
+    if _is_running(content['pid']):
+        raise FileExistsError(
+            'shared memory block {} is owned by the running process {}'.format(
+                name, content['pid']))
+
+    for table in content.get('tables', dict()).values():
+        try:
+            _attach_block(table['block']).unlink()
+        except FileNotFoundError:
+            pass
+    _attach_block(name).unlink()
+
+
+def publish_run(run_id, tables):
+    '''
+    Copies the numeric columns of the tables of a run in shared memory, one
+    block per table holding its columns one after another, and publishes
+    their layout under the id of the run. Returns the created blocks, which
+    stay available until unlinked by unlink_blocks. The blocks left by a
+    server that did not shut down cleanly are replaced, FileExistsError is
+    raised if a running process publishes the run.
+    '''
+    layout = dict()
+    for n, (name, df) in enumerate(tables.items()):
+        # float columns first, so that they can be viewed as a single array
+        dtypes = df.select_dtypes('number').dtypes
+        floats = dtypes == 'float64'
+        columns = list(dtypes.index[floats]) + list(dtypes.index[~floats])
+        layout[name] = {
+            'block': block_name(run_id, n),
+            'rows': len(df),
+            'columns': columns,
+            'dtypes': [str(dtypes[column]) for column in columns],
+        }
+
+    # the layout is written first, so that the blocks of the tables always
+    # have an owner
+    _unlink_stale(block_name(run_id))
+    blocks = [
+        _write_json(block_name(run_id), {
+            'pid': os.getpid(),
+            'tables': layout
+        })
+    ]
+    for name, df in tables.items():
+        values = df[layout[name]['columns']].to_numpy(dtype=float).T
+
+        block = _create_block(layout[name]['block'], values.nbytes)
+        view = np.ndarray(values.shape, dtype=float, buffer=block.buf)
+        view[:] = values
+        # the block cannot be closed while a view exports its buffer
+        del view
+
+        blocks.append(block)
+
+    return blocks
+
+
+def unlink_blocks(blocks):
+    '''
+    Closes and removes the given blocks, the processes that attached them
+    keep their views until they detach.
+    '''
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+def published_runs():
+    '''
+    Ids of the runs published by the running dataset server, empty if there
+    is none.
+    '''
+    try:
+        return _read_json(REGISTRY_BLOCK)['runs']
+    except FileNotFoundError:
+        return []
+
+
+def attach_run(run_id):
+    '''
+    Tables of a published run as read-only DataFrames viewing the shared
+    memory, without copying the float columns. Integer columns (e.g. TIME)
+    are converted back from the shared floats and follow the float ones,
+    columns that are not numeric are not published. Raises FileNotFoundError
+    if the run is not published.
+    '''
+    if run_id not in _attached:
+        layout = _read_json(block_name(run_id))['tables']
+
+        blocks, tables = [], dict()
+        for name, table in layout.items():
+            block = _attach_block(table['block'])
+            values = np.ndarray((len(table['columns']), table['rows']),
+                                dtype=float,
+                                buffer=block.buf)
+            values.flags.writeable = False
+
+            n = table['dtypes'].count('float64')
+            df = pd.DataFrame(values[:n].T,
+                              columns=table['columns'][:n],
+                              copy=False)
+            others = pd.DataFrame(
+                {
+                    column: values[n + i].astype(dtype)
+                    for i, (column, dtype) in enumerate(
+                        zip(table['columns'][n:], table['dtypes'][n:]))
+                },
+                index=df.index)
+
+            blocks.append(block)
+            # copy-on-write concatenates lazily, the floats stay a view of
+            # the shared memory
+            tables[name] = pd.concat([df, others], axis=1)
+
+        _attached[run_id] = (blocks, tables)
+
+    # callers may add columns, the shared data itself is read-only
+    return {
+        name: df.copy(deep=False)
+        for name, df in _attached[run_id][1].items()
+    }
+
+
+def detach_run(run_id):
+    '''
+    Releases the shared memory of a run attached by this process, the tables
+    returned by attach_run must not be used afterwards.
+    '''
+    blocks, tables = _attached.pop(run_id)
+    tables.clear()
+    for block in blocks:
+        block.close()
+
+
+def load_run(run):
+    '''
+    Tables of a run (as returned by query_runs), attached from the dataset
+    server if it publishes the run, read from its archive or from its folder
+    otherwise.
+    '''
+    try:
+        return attach_run(run.id)
+    except FileNotFoundError:
+        pass
+
+    if (Path(run.path) / ARCHIVE_FILE).exists():
+        return read_archive(Path(run.path) / ARCHIVE_FILE)
+    return load_run_tables(run.path)
+
+
+def load_run_columns(run, table, columns):
+    '''
+    Some columns of a table of a run, found as in load_run: the archive only
+    decompresses them and the processed file is parsed for them only.
+    '''
+    try:
+        return attach_run(run.id)[table][columns]
+    except FileNotFoundError:
+        pass
+
+    if (Path(run.path) / ARCHIVE_FILE).exists():
+        return read_archive_table(Path(run.path) / ARCHIVE_FILE, table,
+                                  columns)
+    if table == 'meteo':
+        return read_weather_records(table_file(run.path, table))[columns]
+    return pd.read_csv(table_file(run.path, table),
+                       index_col=False,
+                       usecols=columns)[columns]
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.option('--query', default=None, help='Filter on the run parameters.')
+def main(processed_filepath, query):
+    """ Loads the runs processed below PROCESSED_FILEPATH once and publishes
+        their tables in shared memory, until interrupted. Other processes
+        attach them by run id with attach_run or load_run.
+    """
+    logger = logging.getLogger(__name__)
+
+    runs = query_runs(build_catalog(processed_filepath), query)
+
+    # a single server at a time, a stale registry is replaced
+    _unlink_stale(REGISTRY_BLOCK)
+    blocks = []
+    try:
+        for run in runs:
+            blocks += publish_run(run.id, load_run_tables(run.path))
+        blocks.append(
+            _write_json(REGISTRY_BLOCK, {
+                'pid': os.getpid(),
+                'runs': [run.id for run in runs]
+            }))
+
+        logger.info('%d runs published, %.1f MB of shared memory', len(runs),
+                    sum(block.size for block in blocks) / 1e6)
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        logger.info('shutting down')
+    finally:
+        unlink_blocks(blocks)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
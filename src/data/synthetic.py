@@ -0,0 +1,605 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from pathlib import Path
+import yaml
+
+from src.data.epw import EPW_COLUMNS
+from src.data.schema import DEFAULT_SCHEMA
+from src.features.psychrometrics import (humidity_ratio_from_rel_hum,
+                                         saturation_vapor_pressure,
+                                         standard_pressure)
+
+# synthetic runs with the raw files of src/data/schema.yaml, to load-test
+# make_dataset and the charts at production scale: a run is a building with
+# one air node per zone driven by a synthetic weather file, the same seed
+# always writes the same files
+
+HOURS_IN_A_YEAR = 8760
+# hours simulated before the year, the skip and rotate of schema.yaml
+WARMUP_HOURS = 745
+DAYS_IN_MONTH = [31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
+# raw file names, as matched by schema.yaml
+RUN_FILES = {
+    'energy_zones': 'Energy_zone.BAL',
+    'summary': 'SUMMARY.BAL',
+    'cultural-e': 'Cultural-e_output.out',
+    'cultural-e-input': 'Cultural-e_input.out',
+}
+# hourly balance terms of each zone, in the order of TRNSYS
+BAL_TERMS = ['QBAL', 'DQAIRdT', 'QHEAT', 'QCOOL', 'QINF', 'QVENT', 'QCOUP',
+             'QTRANS', 'QGINT', 'QWGAIN', 'QSOL', 'QSOLAIR']
+SUMMARY_COLUMNS = ['Zonenr', 'Rel_BAL', 'BAL_ENERGY=', '-DQAIRdt', '+QHEAT',
+                   '-QCOOL', '+QINF', '+QVENT', '+QCOUPL', '+QTRANS',
+                   '+QGAININT', '+QWGAIN', '+QSOLGAIN', '+QSOLAIR']
+# label columns closing the rows of the printers
+LABEL_COLUMNS = 4
+
+# model of the zones: heat capacity of air and furniture [kJ/(m2 K)], height
+# [m], air heat capacity [kJ/(m3 K)], heat gains of a person [W], coupling of
+# adjacent zones [kJ/(h K)] and setpoints [C]
+ZONE_CAPACITY = 120.0
+ZONE_HEIGHT = 2.7
+AIR_CAPACITY = 1.2
+PERSON_GAIN = 80.0
+COUPLING = 36.0
+HEATING_SETPOINT = 20.0
+COOLING_SETPOINT = 26.0
+# air changes per hour of the open windows, opening fraction and the
+# temperature [C] above which the occupants open them
+WINDOW_ACH = 10.0
+WINDOW_OPENING = 0.2
+WINDOW_TEMPERATURE = 24.0
+# CO2 of the outdoor air [ppm] and emitted by a person [m3/h]
+OUTDOOR_CO2 = 420.0
+PERSON_CO2 = 0.018
+# moisture released by a person [kg/h]
+PERSON_MOISTURE = 0.05
+# global horizontal irradiance [W/m2] closing the shadings, and their
+# fraction when closed and open
+SHADING_IRRADIANCE = 300.0
+SHADING_CLOSED = 0.7
+SHADING_OPEN = 0.15
+# efficiency of the heat pump, heating and cooling, and of the PV system
+HEATING_COP = 3.0
+COOLING_EER = 3.5
+PV_EFFICIENCY = 0.85
+
+# a synthetic climate, the weather file of some of the runs
+Climate = namedtuple('Climate', ['name', 'latitude', 'longitude', 'altitude',
+                                 'mean_temperature', 'yearly_swing',
+                                 'daily_swing'])
+
+
+def _random(seed, stream, n):
+    '''
+    Generator of the n-th climate or run of a stream, independent of how
+    many climates and runs are generated.
+    '''
+    return np.random.default_rng([seed, stream, n])
+
+
+def _letters(n):
+    '''
+    Positive number in bijective base 9 (digits 1 to 9), as make_dataset
+    drops the zeros of the names in the headers of the outputs.
+    '''
+    digits = ''
+    while n > 0:
+        n, digit = divmod(n - 1, 9)
+        digits = str(digit + 1) + digits
+    return digits
+
+
+def zone_names(zones):
+    '''
+    Names of the zones of a run, alternating day zones and bedrooms (night)
+    on floors of four zones.
+    '''
+    return [
+        'F{}{}A{}'.format(_letters(n // 4 + 1), ('day', 'night')[n % 2],
+                          _letters(n % 4 + 1))
+        for n in range(zones)
+    ]
+
+
+def random_climate(seed, n):
+    '''
+    Climate of the n-th weather file.
+    '''
+    rng = _random(seed, 0, n)
+    return Climate(name='Synthetic-{}'.format(_letters(n + 1)),
+                   latitude=rng.uniform(35, 55),
+                   longitude=rng.uniform(-5, 25),
+                   altitude=rng.uniform(0, 1200),
+                   mean_temperature=rng.uniform(6, 16),
+                   yearly_swing=rng.uniform(7, 12),
+                   daily_swing=rng.uniform(3, 6))
+
+
+def _autoregressive(rng, n, sigma, phi):
+    '''
+    Red noise with the given standard deviation and lag-one correlation.
+    '''
+    noise = rng.normal(0, sigma * np.sqrt(1 - phi**2), n)
+    for k in range(1, n):
+        noise[k] += phi * noise[k - 1]
+    return noise
+
+
+def weather_records(climate, seed, n):
+    '''
+    Hourly data records of the weather file of the n-th climate: yearly and
+    daily cycles of temperature and humidity with red noise, solar
+    irradiance of a sun path with random daily clearness.
+    '''
+    rng = _random(seed, 1, n)
+    hours = np.arange(HOURS_IN_A_YEAR)
+    day, hour = hours // 24, hours % 24
+
+    # clearness index of each day, the cloudy days are cooler and more humid
+    clearness = np.repeat(rng.beta(4, 2, 365), 24)
+
+    daily = -np.cos(2 * np.pi * (hour - 4) / 24) * (0.4 + clearness)
+    temp_air = (climate.mean_temperature -
+                climate.yearly_swing * np.cos(2 * np.pi * (day - 15) / 365) +
+                climate.daily_swing * daily +
+                _autoregressive(rng, HOURS_IN_A_YEAR, 2.0, 0.97))
+    relative_humidity = np.clip(
+        75 - 15 * daily - 20 * (clearness - 0.65) +
+        _autoregressive(rng, HOURS_IN_A_YEAR, 6.0, 0.9), 20, 100)
+
+    # sun path, at the middle of each hour
+    latitude = np.radians(climate.latitude)
+    declination = np.radians(23.45) * np.sin(2 * np.pi * (284 + day) / 365)
+    hour_angle = np.radians(15 * (hour + 0.5 - 12))
+    cos_zenith = np.maximum(
+        np.sin(latitude) * np.sin(declination) +
+        np.cos(latitude) * np.cos(declination) * np.cos(hour_angle), 0)
+
+    etr = 1367 * cos_zenith
+    ghi = etr * clearness * 0.8
+    dhi = ghi * (1 - 0.8 * clearness)
+    dni = np.divide(ghi - dhi, cos_zenith, out=np.zeros(HOURS_IN_A_YEAR),
+                    where=cos_zenith > 0.1)
+
+    pressure = standard_pressure(climate.altitude)
+    p_vap = saturation_vapor_pressure(temp_air) * relative_humidity / 100
+    temp_dew = 243.04 * np.log(p_vap / 611.2) / (17.625 - np.log(p_vap /
+                                                                 611.2))
+
+    months = np.repeat(np.arange(1, 13), DAYS_IN_MONTH)
+    days = np.concatenate([np.arange(1, d + 1) for d in DAYS_IN_MONTH])
+    records = pd.DataFrame({
+        'year': 2005,
+        'month': np.repeat(months, 24),
+        'day': np.repeat(days, 24),
+        'hour': hour + 1,
+        'minute': 60,
+        'data_source_unct': '*',
+        'temp_air': temp_air.round(1),
+        'temp_dew': temp_dew.round(1),
+        'relative_humidity': relative_humidity.round(),
+        'atmospheric_pressure': round(pressure),
+        'etr': etr.round(),
+        'etrn': np.where(etr > 0, 1367, 0),
+        'ghi_infrared': (300 + 4 * temp_air).round(),
+        'ghi': ghi.round(),
+        'dni': dni.round(),
+        'dhi': dhi.round(),
+        'global_hor_illum': (110 * ghi).round(),
+        'direct_normal_illum': (100 * dni).round(),
+        'diffuse_horizontal_illum': (120 * dhi).round(),
+        'zenith_luminance': 9999,
+        'wind_direction': rng.uniform(0, 360, HOURS_IN_A_YEAR).round(),
+        'wind_speed': (3 * rng.weibull(2, HOURS_IN_A_YEAR)).round(1),
+        'total_sky_cover': (10 * (1 - clearness)).round(),
+        'opaque_sky_cover': (8 * (1 - clearness)).round(),
+        'visibility': 9999,
+        'ceiling_height': 99999,
+        'present_weather_observation': 9,
+        'present_weather_codes': 999999999,
+        'precipitable_water': 10,
+        'aerosol_optical_depth': 0.1,
+        'snow_depth': 0,
+        'days_since_last_snowfall': 88,
+        'albedo': 0.2,
+        'liquid_precipitation_depth': 0.0,
+        'liquid_precipitation_quantity': 1.0,
+    })
+
+    return records[EPW_COLUMNS]
+
+
+def write_epw(climate, records, filepath, seed):
+    '''
+    Writes the records of a climate in an EPW file.
+    '''
+    header = [
+        'LOCATION,{},-,-,SYN,999999,{:.3f},{:.3f},1,{:.0f}'.format(
+            climate.name, climate.latitude, climate.longitude,
+            climate.altitude),
+        'DESIGN CONDITIONS,0',
+        'TYPICAL/EXTREME PERIODS,0',
+        'GROUND TEMPERATURES,0',
+        'HOLIDAYS/DAYLIGHT SAVINGS,No,0,0,0',
+        'COMMENTS 1,Synthetic weather of src.data.synthetic, seed {}'.format(
+            seed),
+        'COMMENTS 2,',
+        'DATA PERIODS,1,1,Data,Sunday,1/1,12/31',
+    ]
+    with open(filepath, 'w', newline='\r\n') as f:
+        f.write('\n'.join(header) + '\n')
+        records.to_csv(f, header=False, index=False)
+
+
+def random_inputs(seed, n, zones):
+    '''
+    Input parameters of the n-th run, named after the ones of the sample
+    Cultural-e_input.out.
+    '''
+    rng = _random(seed, 2, n)
+    gfa = rng.uniform(40, 120) * zones
+
+    return pd.Series({
+        'IN_GFA': gfa,
+        'IN_NIA': 0.85 * gfa,
+        'IN_SV': rng.uniform(0.3, 0.9),
+        'IN_kWp': rng.integers(0, 11),
+        'IN_PV_bat': rng.choice([0, 5, 10]),
+        'IN_PV_Tilt': rng.choice([15, 30, 45]),
+        'IN_WWR': rng.uniform(0.1, 0.5),
+        'IN_ACH': rng.uniform(0.1, 0.6),
+        'IN_U_EXT_WALL': rng.uniform(0.15, 1.2),
+        'IN_U_ROOF': rng.uniform(0.12, 1.0),
+        'IN_U_FLOOR': rng.uniform(0.15, 1.0),
+        'IN_U_WIN': rng.uniform(0.8, 3.0),
+        'IN_G_VALUE': rng.uniform(0.3, 0.7),
+        'IN_IG_APL': rng.uniform(1, 4),
+        'IN_IG_LGT': rng.uniform(2, 6),
+    })
+
+
+def _occupancy(rng, zones):
+    '''
+    Hourly number of persons in each zone: the day zones are occupied in the
+    morning and evening of workdays and all day on weekends, the bedrooms at
+    night; each occupant is at home with some probability every hour.
+    '''
+    hours = np.arange(HOURS_IN_A_YEAR)
+    hour = hours % 24
+    # the year starts on Sunday, as in the weather files
+    workday = ((hours // 24 + 6) % 7 < 5)
+
+    day_zone = np.arange(zones) % 2 == 0
+    day_hours = np.where(workday, ((hour >= 7) & (hour < 9)) | (hour >= 18),
+                         hour >= 8) & (hour < 23)
+    night_hours = (hour >= 22) | (hour < 7)
+
+    scheduled = np.where(day_zone, day_hours[:, np.newaxis],
+                         night_hours[:, np.newaxis])
+    persons = rng.integers(1, 4, zones)
+    present = rng.random((HOURS_IN_A_YEAR, zones)) < 0.85
+
+    return scheduled * present * persons
+
+
+def _at_steps(hourly, steps, timestep):
+    '''
+    Hourly values of the year interpolated at the simulation steps, the year
+    repeats itself.
+    '''
+    time = (np.arange(steps) * timestep) % HOURS_IN_A_YEAR
+    hours = np.arange(HOURS_IN_A_YEAR + 1)
+    return np.interp(time, hours, np.r_[hourly, hourly[:1]])
+
+
+def simulate(inputs, records, zones, timestep=1, years=1, seed=0, n=0):
+    '''
+    Simulates a run from the start of the warm-up for the given years. Every
+    zone is an air node with ideal heating and cooling, exchanging heat with
+    the outdoors and the adjacent zones, the heat stored in the node closes
+    the balance exactly. Returns the balance terms of every zone [kJ/h], with
+    shape (terms of BAL_TERMS, steps, zones), and the zone outputs and
+    totals by name.
+    '''
+    rng = _random(seed, 3, n)
+    steps = int(round((WARMUP_HOURS + years * HOURS_IN_A_YEAR) / timestep))
+    hour = (np.floor(np.arange(steps) * timestep).astype(int) %
+            HOURS_IN_A_YEAR)
+
+    # geometry of the zones: floor area and an exposed perimeter
+    area = inputs['IN_GFA'] * rng.dirichlet(np.full(zones, 4.0))
+    volume = area * ZONE_HEIGHT
+    wall = 2 * np.sqrt(area) * ZONE_HEIGHT
+    window = inputs['IN_WWR'] * wall
+    exposure = rng.uniform(0.3, 1.0, zones)
+
+    # conductances [kJ/(h K)] and capacity [kJ/K] of the zones
+    h_trans = 3.6 * (inputs['IN_U_EXT_WALL'] * (wall - window) +
+                     inputs['IN_U_WIN'] * window +
+                     (inputs['IN_U_ROOF'] + inputs['IN_U_FLOOR']) * area / 2)
+    h_inf = AIR_CAPACITY * inputs['IN_ACH'] * volume
+    h_window = AIR_CAPACITY * WINDOW_ACH * volume
+    capacity = ZONE_CAPACITY * area
+    coupling = COUPLING * (np.eye(zones, k=1) + np.eye(zones, k=-1))
+    coupling -= np.diag(coupling.sum(axis=1))
+
+    t_out = _at_steps(records['temp_air'].to_numpy(dtype=float), steps,
+                      timestep)
+    ghi = _at_steps(records['ghi'].to_numpy(dtype=float), steps, timestep)
+    persons = _occupancy(rng, zones)[hour]
+    occupied = persons > 0
+
+    shading = np.where((ghi > SHADING_IRRADIANCE)[:, np.newaxis],
+                       SHADING_CLOSED, SHADING_OPEN) * np.ones(zones)
+    q_sol = 3.6 * (inputs['IN_G_VALUE'] * window * exposure *
+                   ghi[:, np.newaxis] * (1 - shading))
+    q_apl = 3.6 * inputs['IN_IG_APL'] * area * (0.3 + occupied)
+    q_lgt = 3.6 * inputs['IN_IG_LGT'] * area * (
+        occupied & (ghi[:, np.newaxis] < 100))
+    q_gint = 3.6 * PERSON_GAIN * persons + q_apl + q_lgt
+
+    terms = np.zeros((len(BAL_TERMS), steps, zones))
+    t_air = np.empty((steps, zones))
+    co2 = np.empty((steps, zones))
+    win_of = np.empty((steps, zones))
+
+    t = np.full(zones, HEATING_SETPOINT)
+    c = np.full(zones, OUTDOOR_CO2)
+    for k in range(steps):
+        # the occupants open the windows when the zone is warm and the
+        # outdoor air cooler
+        opened = occupied[k] & (t > WINDOW_TEMPERATURE) & (t_out[k] < t - 1)
+        win_of[k] = WINDOW_OPENING * opened
+
+        q_inf = h_inf * (t_out[k] - t)
+        q_vent = h_window * win_of[k] / WINDOW_OPENING * (t_out[k] - t)
+        q_coup = coupling @ t
+        q_trans = h_trans * (t_out[k] - t)
+        gains = q_inf + q_vent + q_coup + q_trans + q_gint[k] + q_sol[k]
+
+        t_free = t + timestep * gains / capacity
+        t_next = np.clip(t_free, HEATING_SETPOINT, COOLING_SETPOINT)
+
+        terms[1:9, k] = [
+            capacity * (t_next - t) / timestep,
+            capacity * np.maximum(t_next - t_free, 0) / timestep,
+            capacity * np.maximum(t_free - t_next, 0) / timestep,
+            q_inf, q_vent, q_coup, q_trans, q_gint[k],
+        ]
+        terms[10, k] = q_sol[k]
+
+        # CO2 of the zone air, exact for a constant air change over the step
+        ach = inputs['IN_ACH'] + WINDOW_ACH * win_of[k] / WINDOW_OPENING
+        c_eq = OUTDOOR_CO2 + 1e6 * PERSON_CO2 * persons[k] / (ach * volume)
+        c = c_eq + (c - c_eq) * np.exp(-ach * timestep)
+
+        t = t_next
+        t_air[k], co2[k] = t, c
+
+    # humidity of the zones, from the outdoor air and the occupants
+    pressure = float(records['atmospheric_pressure'].iloc[0])
+    w_out = _at_steps(humidity_ratio_from_rel_hum(
+        records['temp_air'].to_numpy(dtype=float),
+        records['relative_humidity'].to_numpy(dtype=float), pressure),
+                      steps, timestep)
+    ach = inputs['IN_ACH'] + WINDOW_ACH * win_of / WINDOW_OPENING
+    w_air = w_out[:, np.newaxis] + PERSON_MOISTURE * persons / (
+        AIR_CAPACITY * ach * volume)
+    w_air = np.minimum(
+        w_air, humidity_ratio_from_rel_hum(t_air, 90, pressure))
+
+    t_op = t_air + np.clip(q_sol / (2 * (h_trans + h_inf)), 0, 2) - \
+        0.02 * (t_air - t_out[:, np.newaxis])
+
+    heating, cooling = terms[2].sum(axis=1), terms[3].sum(axis=1)
+    consumptions = {
+        'QHEAT_TOT': heating / HEATING_COP,
+        'QCOOL_TOT': cooling / COOLING_EER,
+        'QVMC_TOT': np.full(steps, 0.36 * volume.sum()),
+        'QAPL_TOT': q_apl.sum(axis=1),
+        'QLGT_TOT': q_lgt.sum(axis=1),
+    }
+    consumption = sum(consumptions.values())
+    pv = 3.6 * inputs['IN_kWp'] * ghi * PV_EFFICIENCY
+
+    outputs = {
+        'SQHEAT_1': heating,
+        'SQCOOL_1': cooling,
+        'TAIR_': t_air,
+        'TOP_': t_op,
+        'ABSHUM_': w_air,
+        'CO2_': co2,
+        'OCC_': persons,
+        'SHD_': shading,
+        'WIN_OF_': win_of,
+        **consumptions,
+        'QEL_TOT': consumption,
+        'PV_selfC': np.minimum(pv, consumption),
+        'PV_p': pv,
+    }
+
+    return terms, outputs
+
+
+def write_bal(terms, filepath, timestep=1):
+    '''
+    Writes the hourly balance of the zones in a .BAL file, pipes between the
+    columns and the units in the second row.
+    '''
+    _, steps, zones = terms.shape
+    columns = ['TIME', 'REL_BAL_ENERGY'] + [
+        '{}{}B4_{}'.format(z, '' if term == 'QCOUP' else '_', term)
+        for z in range(1, zones + 1) for term in BAL_TERMS
+    ]
+    units = ['h', '%'] + ['kJ/h'] * (len(columns) - 2)
+
+    values = np.empty((steps, len(columns)))
+    values[:, 0] = np.arange(steps) * timestep
+    values[:, 1] = 0
+    values[:, 2:] = terms.transpose(1, 2, 0).reshape(steps, -1)
+
+    with open(filepath, 'w') as f:
+        f.write(' ' + ' | '.join(columns) + '\n')
+        f.write(' ' + ' | '.join(units) + '\n')
+        np.savetxt(f, values, fmt=' ' + ' | '.join(
+            ['%.4f'] + ['%.4E'] * (len(columns) - 1)))
+
+
+def write_summary(terms, filepath, timestep=1):
+    '''
+    Writes the totals [kJ] of the balance terms of every zone and of the
+    whole building over the simulation in a SUMMARY.BAL file.
+    '''
+    totals = terms.sum(axis=1).T * timestep
+    totals = np.vstack([totals, totals.sum(axis=0)])
+    zones = len(totals) - 1
+
+    rows = np.column_stack([np.r_[1:zones + 1, 0], np.zeros(zones + 1),
+                            totals])
+    fmt = ['%4d', '%10.2f'] + ['%10.3E'] * len(BAL_TERMS)
+
+    with open(filepath, 'w') as f:
+        f.write(' Energy balance per zone\n \n')
+        f.write('  ' + ' '.join(SUMMARY_COLUMNS) + '\n')
+        f.write('   ' + ' '.join(['-', '%'] + ['kJ'] * len(BAL_TERMS)) + '\n')
+        np.savetxt(f, rows[:-1], fmt=fmt)
+        f.write(' Energy balance for sum of all zone\n')
+        np.savetxt(f, rows[-1:], fmt=fmt)
+
+
+def write_out(columns, values, filepath, time_format='%.4f'):
+    '''
+    Writes a printer .out file: a header of space separated names and rows
+    of tab separated values, TIME first.
+    '''
+    with open(filepath, 'w') as f:
+        f.write(' ' + ' '.join(columns) + ' \n')
+        np.savetxt(f, values,
+                   fmt=' ' + '\t'.join([time_format] +
+                                       ['%.4E'] * (len(columns) - 1)),
+                   newline='\t \n')
+
+
+def write_outputs(outputs, zones, filepath, timestep=1):
+    '''
+    Writes the outputs of the simulation after the warm-up in
+    Cultural-e_output.out, with the label columns of the sample.
+    '''
+    names = zone_names(zones)
+    columns, values = ['TIME'], []
+    for name, value in outputs.items():
+        if value.ndim == 2:
+            columns.extend(name + zone for zone in names)
+            values.extend(value.T)
+        else:
+            columns.append(name)
+            values.append(value)
+
+    start = int(round(WARMUP_HOURS / timestep))
+    steps = len(values[0])
+    table = np.zeros((steps - start, len(columns) + LABEL_COLUMNS))
+    table[:, 0] = np.arange(start, steps) * timestep
+    table[:, 1:len(columns)] = np.column_stack(values)[start:]
+
+    write_out(columns + ['label'] * LABEL_COLUMNS, table, filepath)
+
+
+def write_inputs(inputs, filepath):
+    '''
+    Writes the input parameters of a run in Cultural-e_input.out.
+    '''
+    columns = ['TIME'] + list(inputs.index) + ['label'] * LABEL_COLUMNS
+    row = np.r_[1, inputs.to_numpy(dtype=float), np.zeros(LABEL_COLUMNS)]
+    write_out(columns, row[np.newaxis], filepath, '%.4E')
+
+
+def write_schema(folder, timestep=1):
+    '''
+    Writes the schema of the synthetic runs, the default one with the
+    timestep and the warm-up rows of the generated files.
+    '''
+    with open(DEFAULT_SCHEMA, 'r') as f:
+        schema = yaml.safe_load(f)
+
+    rows = int(round(WARMUP_HOURS / timestep))
+    schema['timestep'] = timestep
+    for table in schema['tables'].values():
+        for field in ['skip', 'rotate']:
+            if field in table:
+                table[field] = rows
+
+    with open(Path(folder) / 'schema.yaml', 'w') as f:
+        f.write('# schema of the runs written by src.data.synthetic\n')
+        yaml.safe_dump(schema, f, sort_keys=False)
+
+
+def generate_runs(folder, runs=1, zones=5, timestep=1, years=1, climates=1,
+                  seed=0):
+    '''
+    Writes the raw files of synthetic runs in run_<n> folders, and the
+    schema to process them, yielding the folder of each run once written.
+    The runs share the weather files of the given number of climates.
+    '''
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    write_schema(folder, timestep)
+
+    weather = []
+    for n in range(min(climates, runs)):
+        climate = random_climate(seed, n)
+        weather.append((climate, weather_records(climate, seed, n)))
+
+    for n in range(runs):
+        run = folder / 'run_{}'.format(_letters(n + 1))
+        run.mkdir(exist_ok=True)
+
+        climate, records = weather[n % len(weather)]
+        write_epw(climate, records, run / (climate.name + '.epw'), seed)
+
+        inputs = random_inputs(seed, n, zones)
+        terms, outputs = simulate(inputs, records, zones, timestep, years,
+                                  seed, n)
+
+        write_bal(terms, run / RUN_FILES['energy_zones'], timestep)
+        write_summary(terms, run / RUN_FILES['summary'], timestep)
+        write_outputs(outputs, zones, run / RUN_FILES['cultural-e'], timestep)
+        write_inputs(inputs, run / RUN_FILES['cultural-e-input'])
+
+        yield run
+
+
+@click.command()
+@click.argument('output_filepath', type=click.Path())
+@click.option('--runs', default=1, show_default=True)
+@click.option('--zones', default=5, show_default=True)
+@click.option('--timestep', default=1.0, show_default=True,
+              help='Hours between two rows, a fraction of an hour.')
+@click.option('--years', default=1, show_default=True,
+              help='Years simulated after the warm-up.')
+@click.option('--climates', default=1, show_default=True,
+              help='Weather files shared by the runs.')
+@click.option('--seed', default=0, show_default=True)
+def main(output_filepath, runs, zones, timestep, years, climates, seed):
+    """ Writes the raw files of synthetic runs in OUTPUT_FILEPATH, with the
+        schema.yaml to process them with make_dataset --schema.
+    """
+    logger = logging.getLogger(__name__)
+
+    if abs(1 / timestep - round(1 / timestep)) > 1e-9:
+        raise click.BadParameter('must divide an hour', param_hint='timestep')
+
+    for run in generate_runs(output_filepath, runs, zones, timestep, years,
+                             climates, seed):
+        logger.info('synthetic run written to %s', run)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
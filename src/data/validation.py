@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import re
+
+from src.features.calendar import time_step
+
+# terms of the hourly zone balances (e.g. 1_B4_QHEAT) with the matching
+# column of the summary and their sign in the balance equation
+BALANCE_TERMS = {
+    'DQAIRdT': ('DQAIRdt', -1),
+    'QHEAT': ('QHEAT', 1),
+    'QCOOL': ('QCOOL', -1),
+    'QINF': ('QINF', 1),
+    'QVENT': ('QVENT', 1),
+    'QCOUP': ('QCOUPL', 1),
+    'QTRANS': ('QTRANS', 1),
+    'QGINT': ('QGAININT', 1),
+    'QWGAIN': ('QWGAIN', 1),
+    'QSOL': ('QSOLGAIN', 1),
+    'QSOLAIR': ('QSOLAIR', 1),
+}
+# balance reported for each zone, hourly and in the summary
+BALANCE = ('QBAL', 'BAL_ENERGY')
+ZONE_BALANCE_COLUMN = re.compile(r'^(\d+)_?B4_(\w+)$')
+
+# relative balances reported by TRNSYS [%], hourly and in the summary
+RELATIVE_BALANCES = {'energy_zones': 'REL_BAL_ENERGY', 'summary': 'Rel_BAL'}
+RELATIVE_BALANCE_LIMIT = 1.0
+
+# the outputs are printed with 4 significant digits, residuals are relative
+# to the sum of the absolute terms of the hour (of the zone for the totals)
+CLOSURE_RTOL = 1e-3
+CLOSURE_ATOL = 1e-2
+TOTALS_RTOL = 1e-2
+
+REPORT_COLUMNS = ['check', 'table', 'checked', 'failed', 'worst', 'limit',
+                  'worst_item']
+
+
+def zone_balance_columns(columns):
+    '''
+    Positions of the hourly balance columns in a table: a matrix with one row
+    per zone and one column per term of BALANCE_TERMS followed by the
+    reported balance, -1 where the term is missing. Returns the zones too.
+    '''
+    terms = list(BALANCE_TERMS) + [BALANCE[0]]
+    positions = dict()
+    for n, column in enumerate(columns):
+        match = ZONE_BALANCE_COLUMN.match(column)
+        if match and match.group(2) in terms:
+            zone = int(match.group(1))
+            positions.setdefault(zone, [-1] * len(terms))
+            positions[zone][terms.index(match.group(2))] = n
+
+    zones = sorted(positions)
+
+    return zones, np.array([positions[z] for z in zones], dtype=int)
+
+
+def _gather(values, positions):
+    '''
+    Values of the columns at the given positions as a (hours, zones, terms)
+    array, missing columns are zero.
+    '''
+    padded = np.column_stack([values, np.zeros(len(values))])
+    return padded[:, positions]
+
+
+def _report_row(check, table, failed, worst, limit, worst_item):
+    '''
+    Row of the validation report, failed is a boolean array over the checked
+    items.
+    '''
+    return dict(
+        zip(REPORT_COLUMNS, [
+            check, table,
+            np.size(failed),
+            int(np.sum(failed)), worst, limit, worst_item
+        ]))
+
+
+def balance_closure(energy, rtol=CLOSURE_RTOL, atol=CLOSURE_ATOL):
+    '''
+    Checks that the signed terms of every zone sum to the reported balance at
+    every hour, all zones together. Returns the largest residual of each
+    zone relative to the sum of the absolute terms, and whether any hour of
+    the zone is out of tolerance.
+    '''
+    zones, positions = zone_balance_columns(energy.columns)
+    values = _gather(energy.to_numpy(dtype=float), positions)
+
+    signs = np.array([sign for _, sign in BALANCE_TERMS.values()])
+    terms = values[:, :, :-1] * signs
+    residual = np.abs(terms.sum(axis=2) - values[:, :, -1])
+    scale = np.abs(terms).sum(axis=2)
+
+    failed = (residual > rtol * scale + atol).any(axis=0)
+    relative = residual / np.where(scale > 0, scale, 1)
+
+    return pd.DataFrame(
+        {
+            'residual': relative.max(axis=0) if len(relative) else np.nan,
+            'failed': failed,
+        },
+        index=pd.Index(zones, name='zone'))
+
+
+def summary_totals(energy, summary, timestep=None, rtol=TOTALS_RTOL):
+    '''
+    Checks that the hourly terms of every zone, integrated over the whole
+    simulation, match the totals of the summary. The timestep [h] of the rows
+    is derived from TIME unless given. Returns the deviation of each zone and
+    term relative to the largest term of the zone in the summary.
+    '''
+    if timestep is None:
+        timestep = time_step(energy['TIME'])
+    zones, positions = zone_balance_columns(energy.columns)
+    hourly = _gather(energy.to_numpy(dtype=float), positions)[:, :, :-1]
+    hourly = hourly.sum(axis=0) * timestep
+
+    names = [name for name, _ in BALANCE_TERMS.values()]
+    summary = summary.set_index('Zonenr').reindex(index=zones, columns=names)
+    totals = summary.to_numpy(dtype=float)
+
+    scale = np.nanmax(np.abs(totals), axis=1, initial=0)[:, np.newaxis]
+    deviation = np.abs(hourly - totals) / np.where(scale > 0, scale, 1)
+
+    return pd.DataFrame(deviation,
+                        index=pd.Index(zones, name='zone'),
+                        columns=list(BALANCE_TERMS))
+
+
+def seam_jumps(df, skip=0):
+    '''
+    Checks the seam left by fixing the year of a table, as parsed before
+    dropping its warm-up: after the rotation the last row is followed by the
+    first one after the warm-up. Returns, for every numeric column but TIME,
+    the change across the seam relative to the largest change between two
+    consecutive rows.
+    '''
+    numeric = df.select_dtypes('number').drop(columns='TIME', errors='ignore')
+    values = numeric.to_numpy(dtype=float)[skip:]
+    changes = np.abs(np.diff(values, axis=0))
+    seam = np.abs(values[0] - values[-1])
+
+    # the end of the rotated block is not a seam, it is the end of the year
+    largest = np.nanmax(changes, axis=0, initial=0)
+    ratio = seam / np.where(largest > 0, largest, 1)
+    ratio[(seam == 0) | ~np.isfinite(seam)] = 0
+
+    return pd.Series(ratio, index=numeric.columns)
+
+
+def validate_run(tables, schema):
+    '''
+    Validates the tables of a run as parsed by make_dataset, before fixing
+    their year, with the options of the schema they were parsed with. Every
+    check is computed in bulk over all the zones, terms or columns of a
+    table. Returns a compact report with one row per check and table.
+    '''
+    rows = []
+    options = schema['tables']
+
+    for name, df in tables.items():
+        counts = df.isna().sum()
+        rows.append(
+            _report_row('missing_values', name, counts > 0, counts.max(), 0,
+                        counts.idxmax() if counts.any() else ''))
+
+        table = options.get(name, dict())
+        if table.get('rotate'):
+            ratio = seam_jumps(df, table['skip'])
+            rows.append(
+                _report_row('seam_jump', name, ratio > 1, ratio.max(), 1.0,
+                            ratio.idxmax() if len(ratio) else ''))
+
+        if RELATIVE_BALANCES.get(name) in df:
+            relative = df[RELATIVE_BALANCES[name]].abs()
+            rows.append(
+                _report_row('relative_balance', name,
+                            relative > RELATIVE_BALANCE_LIMIT, relative.max(),
+                            RELATIVE_BALANCE_LIMIT, relative.idxmax()))
+
+    if 'energy_zones' in tables:
+        energy = tables['energy_zones']
+        closure = balance_closure(energy)
+        if len(closure):
+            rows.append(
+                _report_row('balance_closure', 'energy_zones',
+                            closure['failed'], closure['residual'].max(),
+                            CLOSURE_RTOL, closure['residual'].idxmax()))
+
+        if len(closure) and 'summary' in tables:
+            deviation = summary_totals(energy, tables['summary']).stack()
+            rows.append(
+                _report_row('summary_totals', 'energy_zones',
+                            deviation > TOTALS_RTOL, deviation.max(),
+                            TOTALS_RTOL,
+                            'zone {} {}'.format(*deviation.idxmax())))
+
+    return pd.DataFrame(rows, columns=REPORT_COLUMNS)
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import json
+import os
+import pandas as pd
+import shutil
+from functools import lru_cache
+from pathlib import Path
+
+from src.data.epw import read_epw
+from src.features.psychrometrics import weather_psychrometrics
+
+# processed runs reference their weather file by the hash of its content,
+# every unique file is kept once in the store together with its parsed
+# records (.csv), by default in this folder of the processed data
+WEATHER_STORE = 'weather'
+WEATHER_REFERENCE = 'meteo.ref'
+# weather files of the runs processed before the store, in their folder
+WEATHER_NAME = 'meteo'
+
+
+def file_digest(filepath):
+    '''
+    SHA-256 of the content of a file, read in chunks.
+    '''
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def store_weather(src, store_path):
+    '''
+    Adds a weather file to the store unless it is already there. Returns the
+    digest referencing it.
+    '''
+    digest = file_digest(src)
+    dst = Path(store_path) / (digest + '.epw')
+
+    if not dst.exists():
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        # other processes may be storing the same file at the same time
+        tmp = dst.with_suffix('.{}.tmp'.format(os.getpid()))
+        shutil.copyfile(src, tmp)
+        os.replace(tmp, dst)
+
+    return digest
+
+
+def write_reference(run_path, digest, store_path):
+    '''
+    References a stored weather file from the folder of a processed run, the
+    store is recorded relative to the run so that both can be moved.
+    '''
+    reference = {
+        'sha256': digest,
+        'store': Path(os.path.relpath(store_path, run_path)).as_posix(),
+    }
+    with open(Path(run_path) / WEATHER_REFERENCE, 'w') as f:
+        json.dump(reference, f)
+
+
+def weather_file(run_path, suffix='.epw'):
+    '''
+    Weather file of a processed run, or its parsed records with the .csv
+    suffix: the copy in the folder of the run if there is one, the stored
+    file referenced by the run otherwise.
+    '''
+    run_path = Path(run_path)
+    local = run_path / (WEATHER_NAME + suffix)
+    if local.exists() or not (run_path / WEATHER_REFERENCE).exists():
+        return local
+
+    with open(run_path / WEATHER_REFERENCE, 'r') as f:
+        reference = json.load(f)
+
+    return run_path / reference['store'] / (reference['sha256'] + suffix)
+
+
+def records_file(filepath):
+    '''
+    Parsed records (.csv) saved next to a weather file, or the weather file
+    itself for the runs processed before they were saved: read_weather_records
+    derives the records from it.
+    '''
+    records = Path(filepath).with_suffix('.csv')
+    return records if records.exists() else Path(filepath)
+
+
+def weather_reference(run_path, base_path):
+    '''
+    References the weather file of a processed run from another folder, e.g.
+    the one of an archive: its digest and its path relative to the folder.
+    '''
+    filepath = weather_file(run_path)
+    return {
+        'sha256': file_digest(filepath),
+        'path': Path(os.path.relpath(filepath, base_path)).as_posix(),
+    }
+
+
+def referenced_file(reference, base_path):
+    '''
+    Weather file of a reference written by weather_reference, from the folder
+    it was written for.
+    '''
+    filepath = Path(base_path) / reference['path']
+    if not filepath.exists():
+        raise FileNotFoundError(
+            'weather file {} not found in {}, it must be moved together with '
+            'the runs referencing it'.format(reference['sha256'], filepath))
+
+    return filepath
+
+
+@lru_cache(maxsize=32)
+def _read_epw(filepath, mtime):
+    return read_epw(filepath)
+
+
+@lru_cache(maxsize=32)
+def _read_records(filepath, mtime):
+    if filepath.suffix == '.epw':
+        # runs processed before the records were saved
+        return weather_psychrometrics(_read_epw(filepath, mtime)[0].copy())
+    return pd.read_csv(filepath, index_col=False)
+
+
+def read_weather(filepath):
+    '''
+    Reads a weather file as read_epw does, parsing each file only once per
+    process: the runs sharing it get the same records, which must not be
+    modified in place.
+    '''
+    filepath = Path(filepath).resolve()
+    data, metadata = _read_epw(filepath, filepath.stat().st_mtime)
+
+    return data.copy(deep=False), dict(metadata)
+
+
+def read_weather_records(filepath):
+    '''
+    Reads the parsed records of a weather file (meteo.csv) once per process,
+    shared as read_weather does. Given the weather file itself, the records
+    are derived from it as make_dataset does.
+    '''
+    filepath = Path(filepath).resolve()
+
+    return _read_records(filepath, filepath.stat().st_mtime).copy(deep=False)
+
+
+def read_run_weather(run_path):
+    '''
+    Weather of a processed run, as returned by read_epw, resolving its
+    reference to the store.
+    '''
+    return read_weather(weather_file(run_path))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+HOURS_IN_A_DAY = 24
+HOURS_IN_A_MONTH = 730
+MONTHS = [
+    'January', 'February', 'March', 'April', 'May', 'June', 'July',
+    'August', 'September', 'October', 'November', 'December'
+]
+# months belonging to each season, 0 is January
+SEASONS = {
+    'winter': [11, 0, 1],
+    'spring': [2, 3, 4],
+    'summer': [5, 6, 7],
+    'autumn': [8, 9, 10],
+}
+
+
+def time_step(time):
+    '''
+    Hours represented by each row of a table, from the spacing of its TIME
+    column, 1 for tables with a single row.
+    '''
+    time = np.asarray(time, dtype=float)
+    if len(time) < 2:
+        return 1.0
+    return float(time[1] - time[0])
+
+
+def month_of_hour(time):
+    '''
+    Maps the hours of the simulation to the month they belong to (0 is
+    January), assuming months of constant length.
+    '''
+    hours = np.asarray(time).astype(int)
+    return np.minimum(hours // HOURS_IN_A_MONTH, len(MONTHS) - 1)
+
+
+def day_of_hour(time):
+    '''
+    Maps the hours of the simulation to the day of the year they belong to.
+    '''
+    return np.asarray(time).astype(int) // HOURS_IN_A_DAY
+
+
+def hour_of_day(time):
+    '''
+    Maps the hours of the simulation to the hour of the day.
+    '''
+    return np.asarray(time).astype(int) % HOURS_IN_A_DAY
+
+
+def season_mask(time, season=None):
+    '''
+    Boolean mask of the hours of the simulation falling in the given season,
+    every hour is selected when the season is None.
+    '''
+    months = month_of_hour(time)
+    if season is None:
+        return np.ones(months.shape, dtype=bool)
+
+    return np.isin(months, SEASONS[season])
@@ -0,0 +1,503 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.data.catalog import build_catalog, query_runs
+from src.data.shared import load_run
+from src.features.calendar import MONTHS, day_of_hour, hour_of_day
+from src.features.calendar import month_of_hour, season_mask, time_step
+from src.features.comfort import occupancy_matrix, running_mean_at_time
+from src.features.comfort import zone_names
+from src.features.energy_flow import monthly_flows
+from src.features.psychrometrics import STANDARD_PRESSURE, humidity_ratio
+from src.features.psychrometrics import weather_humidity_ratio
+from src.features.sensitivity import join_inputs_kpis
+from src.features.units import ZONE_BALANCE_INFIX, convert_columns
+from src.features.units import integrated_units
+from src.features.windows import select_window, time_axis
+
+# datasets behind the charts of visualize.py, computed without matplotlib so
+# that they can be exported for other tools; the hourly ones take an optional
+# window (see windows.py) and only process its rows
+
+# terms of the energy balance in SUMMARY.BAL
+ENERGY_BALANCE_FIELDS = [
+    'QHEAT', 'QCOOL', 'QINF', 'QVENT', 'QCOUPL', 'QTRANS', 'QGAININT',
+    'QWGAIN', 'QSOLGAIN', 'QSOLAIR'
+]
+# terms of the energy balance of a zone in energy_zones.csv, after the zone
+ZONE_BALANCE_TERMS = [
+    '_B4_QBAL', '_B4_DQAIRdT', '_B4_QHEAT', '_B4_QCOOL', '_B4_QINF',
+    '_B4_QVENT', 'B4_QCOUP', '_B4_QTRANS', '_B4_QGINT', '_B4_QWGAIN',
+    '_B4_QSOL', '_B4_QSOLAIR'
+]
+CONSUMPTION_FIELDS = [
+    'QHEAT_TOT', 'QCOOL_TOT', 'QVMC_TOT', 'QAPL_TOT', 'QLGT_TOT'
+]
+
+# average outdoor CO2 concentration [ppm] and the limits of the categories
+# above it, zones used during the day have stricter limits than bedrooms
+OUTDOOR_CO2 = 400
+CO2_LIMITS_DAY = [550, 800, 1350]
+CO2_LIMITS_NIGHT = [380, 550, 950]
+IAQ_CATEGORIES = ['Category I', 'Category II', 'Category III', 'Category IV']
+RELH_CATEGORIES = ['Category I', 'Category II', 'Too humid', 'Too dry']
+# bedrooms are recognized by their name when exporting
+BEDROOM_MARK = 'night'
+
+# file formats of the export, by extension
+EXPORT_WRITERS = {
+    '.csv': lambda df, path: df.to_csv(path, index=False),
+    '.parquet': lambda df, path: df.to_parquet(path, index=False),
+}
+
+
+def histogram(values, bins):
+    '''
+    Hours falling in each bin (indexed by its left edge), together with
+    their cumulative frequency [%].
+    '''
+    counts, edges = np.histogram(values, bins)
+
+    return pd.DataFrame(
+        {
+            'hours': counts,
+            'cumulative': 100 * np.cumsum(counts) / max(counts.sum(), 1),
+        },
+        index=pd.Index(edges[:-1], name='bin'))
+
+
+def air_temperature(weather, window=None):
+    '''
+    Distribution of the outdoor dry bulb temperature, in 1 °C bins.
+    '''
+    weather = select_window(weather, window)
+    return histogram(weather['temp_air'], np.arange(-20, 40))
+
+
+def relative_humidity(weather, window=None):
+    '''
+    Distribution of the outdoor relative humidity, in 10 % bins.
+    '''
+    weather = select_window(weather, window)
+    return histogram(weather['relative_humidity'], np.arange(0, 100, 10))
+
+
+def horizontal_irradiance(weather, window=None):
+    '''
+    Distribution of the global horizontal irradiance of the hours with sun,
+    in 25 W/m² bins from 0 up to the sunniest hour of the year: every window
+    gets the same bins, empty ones for the windows without sun.
+    '''
+    # at least two bins for a weather file without any sun
+    bins = np.arange(0, max(weather['ghi'].max(), 50) + 25, 25)
+    ghi = select_window(weather, window)['ghi'].to_numpy()
+
+    return histogram(ghi[ghi > 0], bins)
+
+
+def load_duration(data, column, window=None):
+    '''
+    Load duration curve [kW] of an output in kJ/h, indexed by rank.
+    '''
+    power = convert_columns(select_window(data, window), [column], 'kW')[:, 0]
+
+    return pd.DataFrame({column: -np.sort(-power)},
+                        index=pd.RangeIndex(len(power), name='rank'))
+
+
+def heating_loads(cultural_e, window=None):
+    '''
+    Load duration curve of the heating system.
+    '''
+    return load_duration(cultural_e, 'SQHEAT_1', window)
+
+
+def cooling_loads(cultural_e, window=None):
+    '''
+    Load duration curve of the cooling system.
+    '''
+    return load_duration(cultural_e, 'SQCOOL_1', window)
+
+
+def energy_balance(balance, total=None, units=None):
+    '''
+    Yearly energy balance [kWh] of each zone, indexed by zone number. The
+    balance of the whole building is appended if given. Units default to kJ,
+    as written in SUMMARY.BAL.
+    '''
+    if total is not None:
+        balance = pd.concat([balance, total], ignore_index=True)
+    if units is None:
+        units = dict.fromkeys(ENERGY_BALANCE_FIELDS, 'kJ')
+
+    return pd.DataFrame(convert_columns(balance, ENERGY_BALANCE_FIELDS, 'kWh',
+                                        units),
+                        index=pd.Index(balance['Zonenr'], name='zone'),
+                        columns=ENERGY_BALANCE_FIELDS)
+
+
+def monthly_sums(data, columns, window=None):
+    '''
+    Monthly sums [kWh] of powers, integrated over the timestep of the rows
+    and indexed by month (0 is January). With a window only the months it
+    overlaps are kept, summing its hours.
+    '''
+    data = select_window(data, window)
+    months = month_of_hour(data['TIME'])
+    values = convert_columns(data, columns, 'kWh', integrated_units(columns))
+    values = values * time_step(data['TIME'])
+    sums = np.zeros((len(MONTHS), len(columns)))
+    np.add.at(sums, months, values)
+
+    sums = pd.DataFrame(sums,
+                        index=pd.RangeIndex(len(MONTHS), name='month'),
+                        columns=columns)
+    if window is None:
+        return sums
+    return sums.loc[np.unique(months)]
+
+
+def zone_energy_balance(energy, zone=None, window=None):
+    '''
+    Monthly energy balance [kWh] of a zone, or of all the zones if None.
+    '''
+    if zone is None:
+        columns = [c for c in energy.columns if ZONE_BALANCE_INFIX in c]
+    else:
+        columns = [zone + term for term in ZONE_BALANCE_TERMS]
+
+    return monthly_sums(energy, columns, window)
+
+
+def monthly_consumption(energy, window=None):
+    '''
+    Monthly consumptions [kWh] of the systems.
+    '''
+    return monthly_sums(energy, CONSUMPTION_FIELDS, window)
+
+
+def self_production_consumption(energy):
+    '''
+    Monthly self-sufficiency and self-consumption ratios [%].
+    '''
+    flows = monthly_flows(energy)
+
+    return flows[['self_sufficiency_ratio', 'self_consumption_ratio']]
+
+
+def adaptive_thermal_comfort(data, weather, zones=None, alpha=0.8,
+                             season=None, window=None):
+    '''
+    Operative temperature of each zone against the running mean outdoor
+    temperature (the index). Hours that are not occupied or outside of the
+    season are missing. The running mean is computed on the whole weather
+    file, as it depends on the days before the window.
+    '''
+    data = select_window(data, window)
+    if zones is None:
+        zones = zone_names(data)
+
+    t_rm = running_mean_at_time(weather, data['TIME'], alpha)
+    t_op = data[['TOP_' + zone for zone in zones]].to_numpy(dtype=float)
+    occupied = occupancy_matrix(data, zones)
+    occupied &= season_mask(data['TIME'], season)[:, np.newaxis]
+
+    return pd.DataFrame(np.where(occupied, t_op, np.nan),
+                        index=pd.Index(t_rm, name='t_rm'),
+                        columns=zones)
+
+
+def psychrochart(data,
+                 weather,
+                 zones=None,
+                 occupied_only=False,
+                 season=None,
+                 pressure=STANDARD_PRESSURE,
+                 window=None):
+    '''
+    Humidity ratio [g/kg] of the zones and of the outdoor air ('outdoor'),
+    indexed by dry bulb temperature. Each column only has the hours of its
+    zone.
+    '''
+    data = select_window(data, window)
+    weather = select_window(weather, window)
+    if zones is None:
+        zones = zone_names(data, prefix='TAIR_')
+
+    zone_mask = season_mask(data['TIME'], season)
+    outdoor_mask = season_mask(time_axis(weather), season)
+
+    points = []
+    for zone in zones:
+        mask = zone_mask.copy()
+        if occupied_only:
+            mask &= occupancy_matrix(data, [zone])[:, 0]
+        points.append(
+            pd.DataFrame({zone: 1000 * humidity_ratio(data, zone,
+                                                      pressure)[mask]},
+                         index=data['TAIR_' + zone].to_numpy()[mask]))
+    points.append(
+        pd.DataFrame(
+            {'outdoor': 1000 * weather_humidity_ratio(weather)[outdoor_mask]},
+            index=weather['temp_air'].to_numpy()[outdoor_mask]))
+
+    return pd.concat(points).rename_axis('t_dry')
+
+
+def _category_shares(counts, zones, categories):
+    '''
+    Share [%] of the hours of every zone (rows) in every category (columns).
+    '''
+    totals = counts.sum(axis=1, keepdims=True)
+    shares = 100 * counts / np.where(totals > 0, totals, 1)
+
+    return pd.DataFrame(shares,
+                        index=pd.Index(zones, name='zone'),
+                        columns=categories)
+
+
+def _co2_counts(data, zones, limits):
+    '''
+    Occupied hours of the zones in each CO2 category, a category is reached
+    when the concentration is above its lower limit.
+    '''
+    co2 = data[['CO2_' + zone for zone in zones]].to_numpy(dtype=float)
+    occupied = data[['OCC_' + zone for zone in zones]].to_numpy() > 0
+    occupied &= ~np.isnan(co2)
+    category = np.searchsorted(OUTDOOR_CO2 + np.asarray(limits), co2)
+
+    return np.stack([(occupied & (category == n)).sum(axis=0)
+                     for n in range(len(IAQ_CATEGORIES))],
+                    axis=1)
+
+
+def iaq_co2(data, living_rooms, bedrooms):
+    '''
+    Share of the occupied hours of each zone in the CO2 categories, indexed
+    by CO2 column.
+    '''
+    counts = np.concatenate([
+        _co2_counts(data, living_rooms, CO2_LIMITS_DAY),
+        _co2_counts(data, bedrooms, CO2_LIMITS_NIGHT)
+    ])
+
+    return _category_shares(counts,
+                            ['CO2_' + z for z in living_rooms + bedrooms],
+                            IAQ_CATEGORIES)
+
+
+def relh(data, zone_names, occupancy):
+    '''
+    Share of the occupied hours of each relative humidity column in the
+    humidity categories, the categories are checked in order.
+    '''
+    rh = data[zone_names].to_numpy(dtype=float)
+    occupied = data[occupancy].to_numpy() > 0
+
+    category_1 = (rh > 30) & (rh < 50)
+    category_2 = (rh > 20) & (rh < 70) & ~category_1
+    counts = np.stack([(occupied & mask).sum(axis=0)
+                       for mask in (category_1, category_2, rh > 70, rh < 20)],
+                      axis=1)
+
+    return _category_shares(counts, zone_names, RELH_CATEGORIES)
+
+
+def hourly_map(data, columns, window=None):
+    '''
+    Values of the columns indexed by day of the year and hour of the day,
+    averaged over each hour for sub-hourly timesteps.
+    '''
+    data = select_window(data, window)
+    index = pd.MultiIndex.from_arrays(
+        [day_of_hour(data['TIME']), hour_of_day(data['TIME'])],
+        names=['day', 'hour'])
+    values = pd.DataFrame(data[columns].to_numpy(), index=index,
+                          columns=columns)
+
+    if index.has_duplicates:
+        values = values.groupby(level=['day', 'hour'], sort=False).mean()
+    return values
+
+
+def tornado(coefficients, kpi):
+    '''
+    Sensitivity coefficients of the parameters on a KPI, sorted by
+    magnitude.
+    '''
+    values = coefficients[kpi].dropna()
+    values = values.reindex(values.abs().sort_values().index)
+
+    return values.rename_axis('parameter').to_frame(kpi)
+
+
+def overheating_ranking(summary, metric, top=None):
+    '''
+    Zones (or runs and zones) of an overheating summary sorted by a metric,
+    the worst last, keeping only the top ones if given. The index is joined
+    into a single label and the TM52 outcome is kept next to the metric.
+    '''
+    values = summary.sort_values(metric)
+    if top is not None:
+        values = values.iloc[-top:]
+
+    labels = [
+        ' / '.join(map(str, label)) if isinstance(label, tuple) else label
+        for label in values.index
+    ]
+
+    return pd.DataFrame(
+        {
+            metric: values[metric].to_numpy(),
+            'tm52_fail': values['tm52_fail'].to_numpy(),
+        },
+        index=pd.Index(labels, name='zone'))
+
+
+def parallel_coordinates(inputs, kpis, kpi):
+    '''
+    Varying parameters and KPI of every run, each scaled between its minimum
+    and maximum.
+    '''
+    x, y = join_inputs_kpis(inputs, kpis)
+    values = pd.concat([x, y[[kpi]]], axis=1).astype(float)
+
+    low, high = values.min(), values.max()
+
+    return (values - low) / (high - low).where(high > low, 1)
+
+
+def run_chart_data(tables):
+    '''
+    Datasets of all the charts of a run, computed for every zone, from the
+    tables returned by load_run_tables. Charts whose tables are missing are
+    skipped.
+    '''
+    datasets = dict()
+
+    if 'meteo' in tables:
+        weather = tables['meteo']
+        datasets['air_temperature'] = air_temperature(weather)
+        datasets['relative_humidity'] = relative_humidity(weather)
+        datasets['horizontal_irradiance'] = horizontal_irradiance(weather)
+
+    if 'summary' in tables:
+        datasets['energy_balance'] = energy_balance(
+            tables['summary'], tables.get('summary-total'))
+
+    if 'energy_zones' in tables:
+        datasets['zone_energy_balance'] = zone_energy_balance(
+            tables['energy_zones'])
+
+    if 'cultural-e' in tables:
+        data = tables['cultural-e']
+        cols = set(data.columns)
+        zones = zone_names(data)
+        # comfort charts need the occupancy of the zones
+        co2_zones = [z for z in zones if {'CO2_' + z, 'OCC_' + z} <= cols]
+        rh_zones = [z for z in zones if {'RELHUM_' + z, 'OCC_' + z} <= cols]
+        datasets['heating_loads'] = heating_loads(data)
+        datasets['cooling_loads'] = cooling_loads(data)
+        datasets['monthly_consumption'] = monthly_consumption(data)
+        datasets['self_production_consumption'] = \
+            self_production_consumption(data)
+        datasets['iaq_co2'] = iaq_co2(
+            data, [z for z in co2_zones if BEDROOM_MARK not in z],
+            [z for z in co2_zones if BEDROOM_MARK in z])
+        datasets['relh'] = relh(data, ['RELHUM_' + z for z in rh_zones],
+                                ['OCC_' + z for z in rh_zones])
+        for prefix, chart in (('TAIR_', 'airt_heatmap'),
+                              ('SHD_', 'shd_heatmap'),
+                              ('WIN_OF_', 'win_heatmap')):
+            datasets[chart] = hourly_map(
+                data, [c for c in data.columns if c.startswith(prefix)])
+
+        if 'meteo' in tables:
+            datasets['adaptive_thermal_comfort'] = adaptive_thermal_comfort(
+                data, tables['meteo'])
+            datasets['psychrochart'] = psychrochart(
+                data, tables['meteo'],
+                [z for z in zones if {'ABSHUM_' + z, 'RELHUM_' + z} & cols])
+
+    return datasets
+
+
+def tidy(dataset):
+    '''
+    Reshapes a dataset in long format with the columns series, x, y, label
+    and value. Numeric index levels fill x and y in order, a textual level
+    fills label.
+    '''
+    levels = list(dataset.index.names)
+    long = dataset.reset_index().melt(id_vars=levels,
+                                      var_name='series',
+                                      value_name='value')
+    long = long.dropna(subset=['value'])
+
+    keys = {'x': np.nan, 'y': np.nan, 'label': None}
+    free = ['x', 'y']
+    for level in levels:
+        if pd.api.types.is_numeric_dtype(long[level]):
+            keys[free.pop(0)] = long[level].astype(float)
+        else:
+            keys['label'] = long[level].astype(str)
+
+    return pd.DataFrame({
+        'series': long['series'].astype(str),
+        **keys, 'value': long['value'].astype(float)
+    })
+
+
+def export_chart_data(runs, filepath):
+    '''
+    Writes the datasets of the charts of the given runs (as returned by
+    query_runs) to a single file in long format, with a run and a chart
+    column. The format follows the extension of the file, CSV or Parquet.
+    '''
+    suffix = Path(filepath).suffix
+    if suffix not in EXPORT_WRITERS:
+        raise ValueError('Unsupported export format {}'.format(suffix))
+
+    frames = []
+    for run in runs:
+        datasets = run_chart_data(load_run(run))
+        for chart, dataset in datasets.items():
+            frame = tidy(dataset)
+            frame.insert(0, 'chart', chart)
+            frame.insert(0, 'run', run.id)
+            frames.append(frame)
+
+    export = pd.concat(frames, ignore_index=True)
+    EXPORT_WRITERS[suffix](export, filepath)
+
+    return export
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.argument('output_filepath', type=click.Path())
+@click.option('--query', default=None, help='Filter on the run parameters.')
+def main(processed_filepath, output_filepath, query):
+    """ Exports the datasets of the charts of the runs processed below
+        PROCESSED_FILEPATH in OUTPUT_FILEPATH (.csv or .parquet).
+    """
+    logger = logging.getLogger(__name__)
+
+    catalog = build_catalog(processed_filepath)
+    runs = query_runs(catalog, query)
+
+    export = export_chart_data(runs, output_filepath)
+
+    logger.info('%d rows of %d runs exported to %s', len(export), len(runs),
+                output_filepath)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
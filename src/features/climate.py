@@ -0,0 +1,210 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from src.data.epw import read_epw
+from src.features.calendar import HOURS_IN_A_DAY
+
+# base temperatures [°C] of the degree-days, on daily mean temperatures
+HEATING_BASE_TEMPERATURE = 18.0
+COOLING_BASE_TEMPERATURE = 18.0
+# annual percentiles of the dry bulb temperature used as design conditions,
+# as in the ASHRAE Handbook climatic design tables
+HEATING_DESIGN_PERCENTILES = [99.6, 99.0]
+COOLING_DESIGN_PERCENTILES = [0.4, 1.0, 2.0]
+# default width of the shared bins of each weather variable
+BIN_WIDTHS = {
+    'temp_air': 1.0,
+    'relative_humidity': 5.0,
+    'ghi': 25.0,
+    'wind_speed': 0.5,
+}
+
+
+def read_climates(filepaths, max_workers=None):
+    '''
+    Reads many EPW files in parallel threads. Returns the weather data and
+    the metadata of each file, both keyed by the name of the file without
+    extension and in the order given.
+    '''
+    filepaths = [Path(f) for f in filepaths]
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(read_epw, filepaths))
+
+    names = [f.stem for f in filepaths]
+    weathers = {name: data for name, (data, _) in zip(names, results)}
+    metadata = {name: meta for name, (_, meta) in zip(names, results)}
+
+    return weathers, metadata
+
+
+def climate_matrix(weathers, column):
+    '''
+    Stacks a column of every weather in a 2D array with one row per file,
+    shorter files are padded with NaN.
+    '''
+    length = max(len(w) for w in weathers.values())
+    values = np.full((len(weathers), length), np.nan)
+    for n, weather in enumerate(weathers.values()):
+        values[n, :len(weather)] = weather[column].to_numpy(dtype=float)
+
+    return values
+
+
+def shared_bins(values, width):
+    '''
+    Bin edges of the given width covering all the values, aligned on
+    multiples of the width.
+    '''
+    low = np.floor(np.nanmin(values) / width) * width
+    high = np.ceil(np.nanmax(values) / width) * width
+
+    return np.arange(low, high + width, width)
+
+
+def histograms(values, edges):
+    '''
+    Number of values of every row falling in each bin, computed for all the
+    rows with a single bincount. Missing values and values outside of the
+    edges are not counted.
+    '''
+    n_rows, n_bins = values.shape[0], len(edges) - 1
+    index = np.searchsorted(edges, values, side='right') - 1
+    # the last edge closes the last bin
+    index[values == edges[-1]] = n_bins - 1
+    valid = (index >= 0) & (index < n_bins) & ~np.isnan(values)
+
+    rows = np.broadcast_to(np.arange(n_rows)[:, np.newaxis], values.shape)
+    counts = np.bincount((rows * n_bins + index)[valid],
+                         minlength=n_rows * n_bins)
+
+    return counts.reshape(n_rows, n_bins)
+
+
+def cumulative_frequency(counts):
+    '''
+    Cumulative frequency [%] of histograms, one per row.
+    '''
+    totals = counts.sum(axis=1, keepdims=True)
+    return 100 * np.cumsum(counts, axis=1) / np.where(totals > 0, totals, 1)
+
+
+def climate_histograms(weathers, column, width=None, positive_only=False):
+    '''
+    Histograms of a weather variable of every file over shared bins, as a
+    table indexed by the left edge of the bins with one column per file.
+    With positive_only, e.g. for the irradiance, only the hours with a
+    positive value are counted.
+    '''
+    values = climate_matrix(weathers, column)
+    if positive_only:
+        values[values <= 0] = np.nan
+
+    edges = shared_bins(values, width or BIN_WIDTHS[column])
+    counts = histograms(values, edges)
+
+    return pd.DataFrame(counts.T,
+                        index=pd.Index(edges[:-1], name='bin'),
+                        columns=list(weathers))
+
+
+def daily_mean(values):
+    '''
+    Daily means of hourly values, one row per file.
+    '''
+    n_days = values.shape[1] // HOURS_IN_A_DAY
+    days = values[:, :n_days * HOURS_IN_A_DAY]
+
+    return np.nanmean(days.reshape(len(values), n_days, HOURS_IN_A_DAY),
+                      axis=2)
+
+
+def degree_days(temp_air,
+                heating_base=HEATING_BASE_TEMPERATURE,
+                cooling_base=COOLING_BASE_TEMPERATURE):
+    '''
+    Heating and cooling degree-days [K·d] of every row of hourly dry bulb
+    temperatures, from the daily means.
+    '''
+    daily = daily_mean(temp_air)
+    heating = np.nansum(np.maximum(heating_base - daily, 0), axis=1)
+    cooling = np.nansum(np.maximum(daily - cooling_base, 0), axis=1)
+
+    return heating, cooling
+
+
+def design_conditions(temp_air):
+    '''
+    Heating and cooling design dry bulb temperatures [°C] of every row, the
+    temperatures exceeded for the given percentages of the hours of the
+    year. Returns a dictionary of arrays named e.g. heating_99.6.
+    '''
+    percentiles = HEATING_DESIGN_PERCENTILES + COOLING_DESIGN_PERCENTILES
+    # a temperature exceeded by p % of the hours is the (100 - p) percentile
+    values = np.nanpercentile(temp_air, [100 - p for p in percentiles],
+                              axis=1)
+    names = ['heating_{:g}'.format(p) for p in HEATING_DESIGN_PERCENTILES]
+    names += ['cooling_{:g}'.format(p) for p in COOLING_DESIGN_PERCENTILES]
+
+    return dict(zip(names, values))
+
+
+def climate_statistics(weathers, metadata=None):
+    '''
+    Summary of every weather file, one row per file: location, mean and
+    extreme temperatures, degree-days, design conditions, mean relative
+    humidity and yearly global horizontal irradiation [kWh/m²].
+    '''
+    temp_air = climate_matrix(weathers, 'temp_air')
+    heating, cooling = degree_days(temp_air)
+
+    stats = pd.DataFrame(
+        {
+            'temp_air_mean': np.nanmean(temp_air, axis=1),
+            'temp_air_min': np.nanmin(temp_air, axis=1),
+            'temp_air_max': np.nanmax(temp_air, axis=1),
+            'heating_degree_days': heating,
+            'cooling_degree_days': cooling,
+            **design_conditions(temp_air),
+            'relative_humidity_mean': np.nanmean(
+                climate_matrix(weathers, 'relative_humidity'), axis=1),
+            'ghi_yearly': np.nansum(climate_matrix(weathers, 'ghi'), axis=1) /
+            1000,
+        },
+        index=pd.Index(list(weathers), name='climate'))
+
+    if metadata is not None:
+        location = pd.DataFrame.from_dict(metadata, orient='index')
+        stats = location.join(stats, how='right')
+
+    return stats
+
+
+@click.command()
+@click.argument('input_filepath', type=click.Path(exists=True))
+@click.argument('output_filepath', type=click.Path())
+def main(input_filepath, output_filepath):
+    """ Computes the statistics of all the EPW files found in INPUT_FILEPATH
+        and saves them in OUTPUT_FILEPATH (.csv).
+    """
+    logger = logging.getLogger(__name__)
+
+    filepaths = sorted(Path(input_filepath).glob('*.epw'))
+    weathers, metadata = read_climates(filepaths)
+
+    stats = climate_statistics(weathers, metadata)
+    stats.to_csv(output_filepath)
+
+    logger.info('statistics of %d weather files saved to %s', len(stats),
+                output_filepath)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from src.features.calendar import time_step
+
+# EN 16798-1 adaptive model: limits of the categories with respect to the
+# comfort temperature, from the narrowest to the widest
+ADAPTIVE_CATEGORIES = ['I', 'II', 'III']
+# category of the hours the adaptive model does not classify
+NOT_CLASSIFIED = 0
+ADAPTIVE_UPPER_LIMITS = np.array([2.0, 3.0, 4.0])
+ADAPTIVE_LOWER_LIMITS = np.array([-3.0, -4.0, -5.0])
+# range of running mean temperatures where the adaptive model applies
+ADAPTIVE_RUNNING_MEAN_RANGE = (10.0, 30.0)
+
+
+def running_mean_outdoor_temperature(temp_array, alpha=0.8):
+    r""" Estimates the running mean temperature
+
+    Parameters
+    ----------
+    temp_array: list
+        array containing the mean daily temperature in descending order (i.e.
+        from newest/yesterday to oldest) :math:`[\Theta_{day-1},
+        \Theta_{day-2}, \dots , \Theta_{day-n}]`.
+        Where :math:`\Theta_{day-1}` is yesterday's daily mean temperature. The
+        EN 16798-1 2019 [3]_ states that n should be equal to 7
+    alpha : float
+        constant between 0 and 1. The EN 16798-1 2019 [3]_ recommends a value
+        of 0.8, while the ASHRAE 55 2017 recommends to choose values between
+        0.9 and 0.6, corresponding to a slow- and fast- response running mean,
+        respectively. Adaptive comfort theory suggests that a slow-response
+        running mean (alpha = 0.9) could be more appropriate for climates in
+        which synoptic-scale (day-to-day) temperature dynamics are relatively
+        minor, such as the humid tropics.
+
+    Returns
+    -------
+    t_rm  : float
+        running mean outdoor temperature
+    """
+    coeff = [alpha**ix for ix, x in enumerate(temp_array)]
+    t_rm = sum([a * b for a, b in zip(coeff, temp_array)]) / sum(coeff)
+
+    return round(t_rm, 1)
+
+
+def daily_mean_temperature(temp_air, steps_per_day=24):
+    """ Computes the daily mean temperatures of a time series
+
+    Parameters
+    ----------
+    temp_air: array_like
+        air temperature sampled at a constant timestep, starting at midnight
+    steps_per_day: int
+        number of samples per day, 24 for hourly data
+
+    Returns
+    -------
+    t_dm  : numpy.ndarray
+        daily mean temperatures, an incomplete last day is averaged over the
+        samples available
+    """
+    values = np.asarray(temp_air, dtype=float)
+    n_days = -(-len(values) // steps_per_day)
+
+    padded = np.full(n_days * steps_per_day, np.nan)
+    padded[:len(values)] = values
+
+    return np.nanmean(padded.reshape(n_days, steps_per_day), axis=1)
+
+
+def running_mean_outdoor_temperature_series(temp_air,
+                                            alpha=0.8,
+                                            steps_per_day=24,
+                                            cyclic=True):
+    r""" Estimates the running mean temperature at every step of a time series
+
+    The daily running mean of the EN 16798-1 2019 is evaluated for every day
+    at once through its recursive form
+    :math:`\Theta_{rm} = (1 - \alpha) \Theta_{day-1} + \alpha
+    \Theta_{rm-1}`, which is equivalent to
+    `running_mean_outdoor_temperature` over an unbounded history.
+
+    Parameters
+    ----------
+    temp_air: array_like
+        outdoor air temperature sampled at a constant timestep, starting at
+        midnight of the first day (e.g. the `temp_air` column of the weather)
+    alpha : float
+        constant between 0 and 1, see `running_mean_outdoor_temperature`
+    steps_per_day: int
+        number of samples per day, 24 for hourly data
+    cyclic: bool
+        weather files describe a typical year, so by default the days before
+        the first one are taken from the end of the series. If False, the
+        running mean of the first day is its own daily mean.
+
+    Returns
+    -------
+    t_rm  : numpy.ndarray
+        running mean outdoor temperature, same length as `temp_air`
+    """
+    from scipy.signal import lfilter
+
+    t_dm = daily_mean_temperature(temp_air, steps_per_day)
+
+    if cyclic:
+        # closed form of the recursion over a periodic history
+        coeff = alpha**np.arange(len(t_dm))
+        first = np.dot(coeff, t_dm[::-1]) / coeff.sum()
+    else:
+        first = t_dm[0]
+
+    # every other day depends on yesterday's mean and running mean
+    t_rm = np.empty_like(t_dm)
+    t_rm[0] = first
+    t_rm[1:], _ = lfilter([1 - alpha], [1, -alpha],
+                          t_dm[:-1],
+                          zi=[alpha * first])
+
+    return np.repeat(t_rm, steps_per_day)[:len(np.asarray(temp_air))]
+
+
+def adaptive_comfort_temperature(t_rm):
+    '''
+    Optimal operative temperature of the EN 16798-1 adaptive model, missing
+    where the running mean is outside the range where the model applies.
+    '''
+    t_rm = np.asarray(t_rm, dtype=float)
+    low, high = ADAPTIVE_RUNNING_MEAN_RANGE
+    return np.where((t_rm >= low) & (t_rm <= high), 0.33 * t_rm + 18.8,
+                    np.nan)
+
+
+def adaptive_comfort_deviation(t_op, t_rm):
+    '''
+    Difference between operative and comfort temperature. The operative
+    temperature can be a matrix with one column per zone, the running mean
+    is broadcast along its rows.
+    '''
+    t_op = np.asarray(t_op, dtype=float)
+    t_comf = adaptive_comfort_temperature(np.asarray(t_rm, dtype=float))
+    return t_op - t_comf.reshape((-1, ) + (1, ) * (t_op.ndim - 1))
+
+
+def adaptive_comfort_category(t_op, t_rm):
+    '''
+    Classifies operative temperatures in the EN 16798-1 categories: 1 to 3
+    for categories I to III, 4 when outside of category III. Missing
+    temperatures and running means outside the range of the model are not
+    classified (NOT_CLASSIFIED).
+    '''
+    delta = adaptive_comfort_deviation(t_op, t_rm)[..., np.newaxis]
+    inside = ((delta >= ADAPTIVE_LOWER_LIMITS) &
+              (delta <= ADAPTIVE_UPPER_LIMITS))
+
+    # the categories are nested, count the ones the temperature falls out of
+    category = 1 + np.count_nonzero(~inside, axis=-1)
+    return np.where(np.isnan(delta[..., 0]), NOT_CLASSIFIED, category)
+
+
+def running_mean_at_time(weather, time, alpha=0.8):
+    '''
+    Running mean outdoor temperature of an hourly weather file sampled at the
+    TIME column (in hours) of the simulation output.
+    '''
+    t_rm = running_mean_outdoor_temperature_series(weather['temp_air'], alpha)
+    hours = np.asarray(time).astype(int)
+
+    return t_rm[np.clip(hours, 0, len(t_rm) - 1)]
+
+
+def zone_names(data, prefix='TOP_'):
+    '''
+    Names of the zones having a column with the given prefix.
+    '''
+    return [c[len(prefix):] for c in data.columns if c.startswith(prefix)]
+
+
+def occupancy_matrix(data, zones):
+    '''
+    Boolean matrix of the occupied timesteps, one column per zone. Zones
+    without an OCC_ column are considered always occupied.
+    '''
+    occupied = np.ones((len(data), len(zones)), dtype=bool)
+    for n, zone in enumerate(zones):
+        if 'OCC_' + zone in data:
+            occupied[:, n] = data['OCC_' + zone].to_numpy() > 0
+
+    return occupied
+
+
+def adaptive_thermal_comfort_summary(data,
+                                     weather,
+                                     zones=None,
+                                     category='II',
+                                     alpha=0.8):
+    '''
+    Classifies every occupied hour of every zone in the EN 16798-1 adaptive
+    categories, based on the TOP_ operative temperatures of the simulation.
+
+    Returns a table with one row per zone containing the occupied hours, the
+    hours spent in each category (IV meaning outside of category III), the
+    occupied hours that are not classified (running mean outside the range
+    of the model or missing temperature) and the hours and degree-hours
+    above and below the limits of the chosen category.
+    '''
+    if zones is None:
+        zones = zone_names(data)
+
+    # hours represented by each row, for sub-hourly outputs
+    time = data['TIME'].to_numpy()
+    step = time_step(time)
+
+    t_op = data[['TOP_' + zone for zone in zones]].to_numpy(dtype=float)
+    t_rm = running_mean_at_time(weather, time, alpha)
+    occupied = occupancy_matrix(data, zones)
+
+    delta = adaptive_comfort_deviation(t_op, t_rm)
+    cat = adaptive_comfort_category(t_op, t_rm)
+
+    summary = pd.DataFrame(index=pd.Index(zones, name='zone'))
+    summary['occupied_hours'] = occupied.sum(axis=0) * step
+    for n, name in enumerate(ADAPTIVE_CATEGORIES + ['IV']):
+        summary['hours_cat_' + name] = ((cat == n + 1) & occupied).sum(
+            axis=0) * step
+    summary['hours_not_classified'] = (
+        (cat == NOT_CLASSIFIED) & occupied).sum(axis=0) * step
+
+    # exceedances with respect to the chosen category
+    idx = ADAPTIVE_CATEGORIES.index(category)
+    classified = occupied & (cat != NOT_CLASSIFIED)
+    above = np.where(classified, delta - ADAPTIVE_UPPER_LIMITS[idx], 0)
+    below = np.where(classified, ADAPTIVE_LOWER_LIMITS[idx] - delta, 0)
+
+    summary['hours_above'] = (above > 0).sum(axis=0) * step
+    summary['hours_below'] = (below > 0).sum(axis=0) * step
+    summary['degree_hours_above'] = np.clip(above, 0, None).sum(axis=0) * step
+    summary['degree_hours_below'] = np.clip(below, 0, None).sum(axis=0) * step
+
+    return summary
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+DOWNSAMPLING_METHODS = ('lttb', 'minmax')
+
+
+def viewport(x, start=None, stop=None):
+    '''
+    Slice of the sorted array x falling between start and stop (both
+    included), found by bisection.
+    '''
+    i0 = 0 if start is None else np.searchsorted(x, start, side='left')
+    i1 = len(x) if stop is None else np.searchsorted(x, stop, side='right')
+
+    return slice(int(i0), int(i1))
+
+
+def lttb(x, y, n_out):
+    '''
+    Largest-Triangle-Three-Buckets downsampling. Returns the indices of the
+    n_out points that best preserve the visual shape of the series: the first
+    and last points are always kept, and from every bucket in between the
+    point forming the largest triangle with the previously selected point and
+    the average of the next bucket is chosen.
+    '''
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+
+    # averages of every bucket, the last point acts as the bucket after the
+    # last one
+    sums_x = np.add.reduceat(x[:n - 1], edges[:-1])
+    sums_y = np.add.reduceat(np.nan_to_num(y[:n - 1]), edges[:-1])
+    sizes = np.diff(edges)
+    avg_x = np.append(sums_x / sizes, x[-1])
+    avg_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - avg_x[i + 1]) * (y[lo:hi] - y[a]) -
+                      (x[a] - x[lo:hi]) * (avg_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax(x, y, n_out):
+    '''
+    Min-max downsampling. Returns the indices of the smallest and largest
+    values of n_out / 2 buckets of equal size, in order, so that no peak of
+    the series is lost.
+    '''
+    n = len(x)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    # sorting by bucket then value puts the minimum of every bucket at its
+    # first position and the maximum at the last one, missing values last
+    order = np.lexsort((np.asarray(y, dtype=float), bucket))
+    first = order[edges[:-1]]
+    last = order[edges[1:] - 1]
+
+    return np.unique(np.concatenate([first, last]))
+
+
+def downsample(x, y, n_out, method='lttb'):
+    '''
+    Downsamples the series to at most n_out points with the given method,
+    returns the selected x and y values.
+    '''
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError('Unknown downsampling method {}'.format(method))
+    idx = lttb(x, y, n_out) if method == 'lttb' else minmax(x, y, n_out)
+
+    return np.asarray(x)[idx], np.asarray(y)[idx]
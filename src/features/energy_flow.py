@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.data.catalog import INPUT_FILE, read_input_parameters
+from src.features.calendar import MONTHS, month_of_hour, time_step
+from src.features.units import convert_columns
+
+# columns of cultural-e.csv with the electric demand, the PV production and
+# the share of the production consumed on site
+LOAD = 'QEL_TOT'
+PRODUCTION = 'PV_p'
+SELF_CONSUMPTION = 'PV_selfC'
+FLOWS = [
+    'load', 'production', 'self_consumption', 'grid_import', 'grid_export'
+]
+
+# battery capacity [kWh] and PV peak power [kWp] among the input parameters
+BATTERY_CAPACITY = 'IN_PV_bat'
+PEAK_POWER = 'IN_kWp'
+
+# round trip efficiency of the battery, split evenly between charge and
+# discharge
+BATTERY_EFFICIENCY = 0.9
+
+
+def _ratio(numerator, denominator):
+    '''
+    Element-wise ratio [%], NaN where the denominator is zero.
+    '''
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    ratio = np.full(np.broadcast(numerator, denominator).shape, np.nan)
+    np.divide(100 * numerator, denominator, out=ratio, where=denominator != 0)
+
+    return ratio
+
+
+def hourly_flows(data):
+    '''
+    Electric flows of each row of a run [kWh]: demand, PV production, the
+    part of the production consumed on site, and the energy imported from
+    and exported to the grid. The self-consumption is the one simulated if
+    available, the smallest between demand and production otherwise.
+    '''
+    columns = [LOAD, PRODUCTION] + [c for c in [SELF_CONSUMPTION] if c in data]
+    # powers in kW times the hours of each row are energies in kWh
+    values = convert_columns(data, columns, 'kW') * time_step(data['TIME'])
+    load, production = values[:, 0], values[:, 1]
+    if SELF_CONSUMPTION in data:
+        self_consumption = values[:, 2]
+    else:
+        self_consumption = np.minimum(load, production)
+
+    return pd.DataFrame(
+        {
+            'load': load,
+            'production': production,
+            'self_consumption': self_consumption,
+            'grid_import': np.maximum(load - self_consumption, 0),
+            'grid_export': np.maximum(production - self_consumption, 0),
+        },
+        index=data.index)
+
+
+def flow_ratios(flows):
+    '''
+    Adds the self-consumption (share of the production not exported) and
+    self-sufficiency (share of the demand not imported) ratios [%] to a table
+    of flows, NaN where there is no production or demand.
+    '''
+    flows = flows.copy()
+    flows['self_consumption_ratio'] = _ratio(
+        flows['production'] - flows['grid_export'], flows['production'])
+    flows['self_sufficiency_ratio'] = _ratio(
+        flows['load'] - flows['grid_import'], flows['load'])
+
+    return flows
+
+
+def monthly_flows(data):
+    '''
+    Electric flows of a run [kWh] summed by month (0 is January), with their
+    ratios.
+    '''
+    flows = hourly_flows(data)
+    months = month_of_hour(data['TIME'])
+
+    sums = {
+        name: np.bincount(months, weights=flows[name], minlength=len(MONTHS))
+        for name in FLOWS
+    }
+
+    return flow_ratios(
+        pd.DataFrame(sums, index=pd.RangeIndex(len(MONTHS), name='month')))
+
+
+def yearly_flows(data):
+    '''
+    Electric flows of a run [kWh] summed over the simulation, with their
+    ratios.
+    '''
+    return flow_ratios(hourly_flows(data)[FLOWS].sum().to_frame().T).iloc[0]
+
+
+def battery_sweep(load,
+                  production,
+                  capacities,
+                  pv_scales=1.0,
+                  efficiency=BATTERY_EFFICIENCY):
+    '''
+    Simulates a battery storing the PV surplus for every combination of
+    capacity [kWh] and scale factor of the PV production, all together in a
+    single pass over the hours. The battery starts empty, charges with the
+    surplus and discharges to cover the demand, without power limits.
+
+    Returns a table indexed by (pv_scale, capacity) with the yearly flows
+    [kWh], the ratios [%] and the number of equivalent full cycles.
+    '''
+    load = np.asarray(load, dtype=float)
+    production = np.asarray(production, dtype=float)
+    capacities = np.atleast_1d(np.asarray(capacities, dtype=float))
+    pv_scales = np.atleast_1d(np.asarray(pv_scales, dtype=float))
+    eta = np.sqrt(efficiency)
+
+    # one row per scale of the PV, one column per capacity
+    shape = (len(pv_scales), len(capacities))
+    soc = np.zeros(shape)
+    stored = np.zeros(shape)
+    released = np.zeros(shape)
+
+    # surplus of the production over the demand of each row, for every scale
+    surplus = production[:, np.newaxis] * pv_scales - load[:, np.newaxis]
+    for s in surplus:
+        s = s[:, np.newaxis]
+        charge = np.minimum(np.maximum(s, 0) * eta, capacities - soc)
+        discharge = np.minimum(np.maximum(-s, 0) / eta, soc)
+        soc += charge - discharge
+        stored += charge
+        released += discharge
+
+    # production consumed when produced, the battery takes part of the
+    # export and covers part of the import, with losses both ways
+    direct = np.minimum(load[:, np.newaxis],
+                        production[:, np.newaxis] * pv_scales).sum(axis=0)
+    total_load = np.full(shape, load.sum())
+    total_production = np.broadcast_to(
+        production.sum() * pv_scales[:, np.newaxis], shape)
+    grid_export = total_production - direct[:, np.newaxis] - stored / eta
+    grid_import = total_load - direct[:, np.newaxis] - released * eta
+
+    index = pd.MultiIndex.from_product([pv_scales, capacities],
+                                       names=['pv_scale', 'capacity'])
+    sweep = pd.DataFrame(
+        {
+            'load': total_load.ravel(),
+            'production': total_production.ravel(),
+            'self_consumption': (total_production - grid_export).ravel(),
+            'grid_import': grid_import.ravel(),
+            'grid_export': grid_export.ravel(),
+            'cycles': (_ratio(stored, capacities) / 100).ravel(),
+        },
+        index=index)
+
+    return flow_ratios(sweep)
+
+
+def run_battery_sweep(run_path,
+                      capacities=None,
+                      kwp=None,
+                      efficiency=BATTERY_EFFICIENCY):
+    '''
+    Battery sweep of a processed run. Capacities [kWh] and PV peak powers
+    [kWp] default to the ones of the run, other peak powers scale the
+    simulated production. The table is indexed by (kwp, capacity).
+    '''
+    run_path = Path(run_path)
+    inputs = read_input_parameters(run_path / INPUT_FILE)
+    flows = hourly_flows(
+        pd.read_csv(run_path / 'cultural-e.csv', index_col=False))
+
+    if capacities is None:
+        capacities = [inputs[BATTERY_CAPACITY]]
+    if kwp is None:
+        kwp = [inputs[PEAK_POWER]]
+    kwp = np.atleast_1d(np.asarray(kwp, dtype=float))
+
+    if inputs[PEAK_POWER] > 0:
+        pv_scales = kwp / inputs[PEAK_POWER]
+    elif np.all(kwp == inputs[PEAK_POWER]):
+        pv_scales = np.ones_like(kwp)
+    else:
+        raise ValueError('Cannot scale the PV of {}, its {} is {}'.format(
+            run_path, PEAK_POWER, inputs[PEAK_POWER]))
+
+    sweep = battery_sweep(flows['load'], flows['production'], capacities,
+                          pv_scales, efficiency)
+    sweep.index = sweep.index.set_levels(kwp, level='pv_scale')
+
+    return sweep.rename_axis(index={'pv_scale': 'kwp'})
+
+
+def collect_battery_sweeps(runs, capacities=None, kwp=None):
+    '''
+    Battery sweeps of the given runs (as returned by query_runs) in a single
+    table indexed by (run, kwp, capacity).
+    '''
+    sweeps = [run_battery_sweep(run.path, capacities, kwp) for run in runs]
+
+    return pd.concat(sweeps, keys=[run.id for run in runs], names=['run'])
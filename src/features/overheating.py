@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.data.loader import stream_runs
+from src.data.weather_store import read_run_weather
+from src.features.calendar import day_of_hour, month_of_hour, time_step
+from src.features.comfort import (ADAPTIVE_CATEGORIES, ADAPTIVE_UPPER_LIMITS,
+                                  adaptive_comfort_deviation,
+                                  occupancy_matrix, running_mean_at_time,
+                                  zone_names)
+
+# fixed operative temperature thresholds [°C] of the exceedance metrics
+OVERHEATING_THRESHOLDS = [25.0, 26.0, 28.0]
+
+# CIBSE TM52 criteria, evaluated on the occupied hours from May to September
+# (0 is January) against the upper limit of an adaptive category
+TM52_MONTHS = [4, 5, 6, 7, 8]
+# criterion 1: share [%] of the hours exceeding the limit by 1 K or more
+TM52_HOURS_OF_EXCEEDANCE = 3.0
+# criterion 2: daily weighted exceedance [K·h]
+TM52_DAILY_WEIGHTED_EXCEEDANCE = 6.0
+# criterion 3: largest exceedance of the limit [K]
+TM52_UPPER_LIMIT = 4.0
+# a zone fails when it fails this number of criteria
+TM52_FAILED_CRITERIA = 2
+
+
+def threshold_exceedance(t_op, occupied, thresholds, step=1.0):
+    '''
+    Occupied hours above each threshold and the degree-hours above it, for
+    all zones (columns of t_op) and thresholds at once. Returns two arrays
+    with one row per zone and one column per threshold.
+    '''
+    excess = t_op[:, :, np.newaxis] - np.asarray(thresholds, dtype=float)
+    excess = np.where(occupied[:, :, np.newaxis], excess, 0)
+
+    hours = (excess > 0).sum(axis=0) * step
+    degree_hours = np.clip(excess, 0, None).sum(axis=0) * step
+
+    return hours, degree_hours
+
+
+def tm52_exceedance(t_op, t_rm, category='II'):
+    '''
+    Exceedance of the operative temperature over the upper limit of the
+    adaptive category, rounded to the nearest whole degree as in TM52.
+    '''
+    limit = ADAPTIVE_UPPER_LIMITS[ADAPTIVE_CATEGORIES.index(category)]
+
+    return np.round(adaptive_comfort_deviation(t_op, t_rm) - limit)
+
+
+def tm52_criteria(delta, occupied, days, step=1.0):
+    '''
+    The three TM52 criteria for every zone, given the rounded exceedances of
+    the hours to evaluate, their occupancy and the day they belong to (in
+    increasing order). Returns the share of the hours of exceedance [%], the
+    largest daily weighted exceedance [K·h] and the largest exceedance [K].
+    '''
+    delta = np.where(occupied, delta, np.nan)
+
+    occupied_hours = occupied.sum(axis=0) * step
+    exceedance_hours = (delta >= 1).sum(axis=0) * step
+    share = 100 * exceedance_hours / np.where(occupied_hours > 0,
+                                              occupied_hours, 1)
+
+    # the hours of each day are contiguous, sum them by slices
+    weighted = np.where(delta > 0, delta, 0) * step
+    if len(days):
+        starts = np.flatnonzero(np.diff(days, prepend=days[0] - 1))
+        daily = np.add.reduceat(weighted, starts, axis=0).max(axis=0)
+    else:
+        daily = np.zeros(delta.shape[1])
+
+    largest = np.nanmax(np.where(occupied, delta, -np.inf), axis=0)
+    largest = np.where(np.isfinite(largest), largest, np.nan)
+
+    return share, daily, largest
+
+
+def overheating_summary(data,
+                        weather,
+                        zones=None,
+                        thresholds=OVERHEATING_THRESHOLDS,
+                        category='II',
+                        alpha=0.8):
+    '''
+    Overheating metrics of every zone, based on the TOP_ operative
+    temperatures of the simulation: occupied hours and degree-hours above
+    the fixed thresholds, and the CIBSE TM52 criteria with the upper limit
+    of the given adaptive category. All zones are evaluated together as a
+    matrix.
+
+    Returns a table with one row per zone.
+    '''
+    if zones is None:
+        zones = zone_names(data)
+
+    # hours represented by each row, for sub-hourly outputs
+    time = data['TIME'].to_numpy()
+    step = time_step(time)
+
+    t_op = data[['TOP_' + zone for zone in zones]].to_numpy(dtype=float)
+    occupied = occupancy_matrix(data, zones)
+
+    summary = pd.DataFrame(index=pd.Index(zones, name='zone'))
+    summary['occupied_hours'] = occupied.sum(axis=0) * step
+
+    hours, degree_hours = threshold_exceedance(t_op, occupied, thresholds,
+                                               step)
+    for n, threshold in enumerate(thresholds):
+        summary['hours_above_{:g}'.format(threshold)] = hours[:, n]
+    for n, threshold in enumerate(thresholds):
+        summary['degree_hours_above_{:g}'.format(threshold)] = \
+            degree_hours[:, n]
+
+    # TM52 only looks at the warm season
+    season = np.isin(month_of_hour(time), TM52_MONTHS)
+    t_rm = running_mean_at_time(weather, time, alpha)
+    delta = tm52_exceedance(t_op[season], t_rm[season], category)
+    share, daily, largest = tm52_criteria(delta, occupied[season],
+                                          day_of_hour(time[season]), step)
+
+    summary['tm52_hours_of_exceedance'] = share
+    summary['tm52_daily_weighted_exceedance'] = daily
+    summary['tm52_upper_limit_exceedance'] = largest
+
+    failed = np.stack([
+        share > TM52_HOURS_OF_EXCEEDANCE,
+        daily > TM52_DAILY_WEIGHTED_EXCEEDANCE,
+        largest >= TM52_UPPER_LIMIT,
+    ])
+    summary['tm52_failed_criteria'] = failed.sum(axis=0)
+    summary['tm52_fail'] = summary['tm52_failed_criteria'] >= \
+        TM52_FAILED_CRITERIA
+
+    return summary
+
+
+def run_overheating(run_path, **kwargs):
+    '''
+    Overheating summary of a processed run, the keyword arguments are the
+    same of overheating_summary.
+    '''
+    run_path = Path(run_path)
+    data = pd.read_csv(run_path / 'cultural-e.csv', index_col=False)
+    weather, _ = read_run_weather(run_path)
+
+    return overheating_summary(data, weather, **kwargs)
+
+
+def collect_overheating(runs, **kwargs):
+    '''
+    Overheating summaries of the given runs (as returned by query_runs) in a
+    single table indexed by (run, zone). The files of the runs are read
+    concurrently and each run is evaluated as soon as it is loaded.
+    '''
+    summaries = {
+        run.id: overheating_summary(tables['cultural-e'], tables['weather'],
+                                    **kwargs)
+        for run, tables in stream_runs(runs, ['cultural-e', 'weather'])
+    }
+
+    return pd.concat([summaries[run.id] for run in runs],
+                     keys=[run.id for run in runs],
+                     names=['run'])
@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+import click
+import logging
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import PurePosixPath
+
+from src.data.catalog import Run, build_catalog
+from src.data.loader import MAX_CONCURRENT_READS
+from src.data.shared import load_run_columns
+from src.features.calendar import month_of_hour
+from src.features.chart_data import CONSUMPTION_FIELDS, ENERGY_BALANCE_FIELDS
+from src.features.units import convert_columns
+
+# a portfolio groups the processed runs by building, the first folder of
+# their id: the runs of a building are processed below
+# data/processed/<building>
+
+HOURS_IN_A_YEAR = 8760
+# hourly loads of cultural-e.csv aggregated over the buildings
+PORTFOLIO_LOADS = ['SQHEAT_1', 'SQCOOL_1'] + CONSUMPTION_FIELDS
+
+# hourly loads [kW] of the buildings of a portfolio on a common time axis,
+# the values have shape (buildings, hours, columns)
+PortfolioLoads = namedtuple('PortfolioLoads',
+                            ['buildings', 'columns', 'values'])
+
+
+def building_of_run(run_id):
+    '''
+    Building of a run, the first folder of its id.
+    '''
+    return PurePosixPath(run_id).parts[0]
+
+
+def build_portfolio(catalog):
+    '''
+    Catalog of the runs (see build_catalog) with the building of each run in
+    the first column.
+    '''
+    portfolio = catalog.copy()
+    portfolio.insert(0, 'building',
+                     [building_of_run(run) for run in catalog.index])
+
+    return portfolio
+
+
+def portfolio_runs(portfolio, expr=None):
+    '''
+    Handles of the runs satisfying the expression (see query_runs), by
+    building. The expression must leave a single run per building, e.g. the
+    variant of each building to aggregate.
+    '''
+    selected = portfolio.query(expr) if expr else portfolio
+
+    counts = selected['building'].value_counts()
+    if (counts > 1).any():
+        raise ValueError('Several runs selected for the buildings {}'.format(
+            ', '.join(counts.index[counts > 1])))
+
+    return {
+        building: Run(run, path)
+        for run, building, path in zip(selected.index, selected['building'],
+                                       selected['path'])
+    }
+
+
+def hourly_loads(time, loads, hours=HOURS_IN_A_YEAR):
+    '''
+    Mean of the loads over each hour of the year, from their timesteps of any
+    length; timesteps after the first year are left out. The loads of all
+    the columns are binned by a single bincount.
+    '''
+    hour = np.floor(np.asarray(time, dtype=float)).astype(int)
+    rows = (hour >= 0) & (hour < hours)
+    hour, loads = hour[rows], loads[rows]
+
+    columns = loads.shape[1]
+    bins = (hour[:, np.newaxis] * columns + np.arange(columns)).ravel()
+    sums = np.bincount(bins, weights=loads.ravel(), minlength=hours * columns)
+    counts = np.bincount(hour, minlength=hours)
+
+    with np.errstate(invalid='ignore'):
+        return sums.reshape(hours, columns) / counts[:, np.newaxis]
+
+
+def _read_loads(run, columns):
+    data = load_run_columns(run, 'cultural-e', ['TIME'] + list(columns))
+    return hourly_loads(data['TIME'], convert_columns(data, columns, 'kW'))
+
+
+def stack_loads(runs, columns=PORTFOLIO_LOADS,
+                max_reads=MAX_CONCURRENT_READS):
+    '''
+    Hourly loads [kW] of the runs of a portfolio (as returned by
+    portfolio_runs) stacked on a common time axis. Only the time and the
+    given columns of cultural-e.csv are read, a few runs at a time, so that
+    the hourly tables are never loaded all together.
+    '''
+    columns = list(columns)
+    values = np.empty((len(runs), HOURS_IN_A_YEAR, len(columns)))
+
+    with ThreadPoolExecutor(max_reads) as executor:
+        loads = executor.map(lambda run: _read_loads(run, columns),
+                             runs.values())
+        for n, building_loads in enumerate(loads):
+            values[n] = building_loads
+
+    return PortfolioLoads(list(runs), columns, values)
+
+
+def portfolio_peaks(loads):
+    '''
+    Peaks of the loads of a portfolio, one row per column: the coincident
+    peak [kW] of the summed loads and its hour, the sum of the peaks of the
+    buildings [kW] and the diversity factor, their ratio.
+    '''
+    total = np.nansum(loads.values, axis=0)
+    coincident = total.max(axis=0)
+    peaks = np.nanmax(loads.values, axis=1).sum(axis=0)
+
+    diversity = np.full(coincident.shape, np.nan)
+    np.divide(peaks, coincident, out=diversity, where=coincident > 0)
+
+    return pd.DataFrame(
+        {
+            'coincident_peak': coincident,
+            'peak_hour': total.argmax(axis=0),
+            'sum_of_peaks': peaks,
+            'diversity_factor': diversity,
+        },
+        index=pd.Index(loads.columns, name='load'))
+
+
+def portfolio_monthly(loads, columns=CONSUMPTION_FIELDS):
+    '''
+    Monthly totals [kWh] of some loads summed over the buildings, by default
+    the consumptions, indexed by month (0 is January).
+    '''
+    values = loads.values[:, :, [loads.columns.index(c) for c in columns]]
+    total = np.nansum(values, axis=0)
+    months = month_of_hour(np.arange(HOURS_IN_A_YEAR))
+    starts = np.flatnonzero(np.diff(months, prepend=-1))
+
+    return pd.DataFrame(np.add.reduceat(total, starts, axis=0),
+                        index=pd.Index(months[starts], name='month'),
+                        columns=columns)
+
+
+def portfolio_duration(loads, column):
+    '''
+    Load duration curves [kW] of a column, of the whole portfolio and of each
+    building, indexed by rank.
+    '''
+    n = loads.columns.index(column)
+    values = loads.values[:, :, n]
+
+    curves = pd.DataFrame(-np.sort(-values, axis=1).T,
+                          columns=loads.buildings,
+                          index=pd.RangeIndex(HOURS_IN_A_YEAR, name='rank'))
+    curves.insert(0, 'Portfolio', -np.sort(-np.nansum(values, axis=0)))
+
+    return curves
+
+
+def _building_balance(run):
+    '''
+    Balance of the whole building of a run, from its summary-total.csv or,
+    for the runs processed before it was written, summed over the zones of
+    its summary.csv.
+    '''
+    try:
+        return load_run_columns(run, 'summary-total', ENERGY_BALANCE_FIELDS)
+    except (FileNotFoundError, KeyError):
+        zones = load_run_columns(run, 'summary', ENERGY_BALANCE_FIELDS)
+        return zones.sum().to_frame().T
+
+
+def portfolio_balance(runs, units=None):
+    '''
+    Yearly energy balance [kWh] of each building of a portfolio (as returned
+    by portfolio_runs), from the summary of its run. Units default to kJ, as
+    written in SUMMARY.BAL.
+    '''
+    if units is None:
+        units = dict.fromkeys(ENERGY_BALANCE_FIELDS, 'kJ')
+
+    totals = pd.concat([_building_balance(run) for run in runs.values()],
+                       ignore_index=True)
+
+    return pd.DataFrame(convert_columns(totals, ENERGY_BALANCE_FIELDS, 'kWh',
+                                        units),
+                        index=pd.Index(list(runs), name='building'),
+                        columns=ENERGY_BALANCE_FIELDS)
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.argument('output_filepath', type=click.Path())
+@click.option('--query', default=None,
+              help='Filter selecting a run per building.')
+def main(processed_filepath, output_filepath, query):
+    """ Aggregates the hourly loads of the buildings processed below
+        PROCESSED_FILEPATH and writes their peaks and diversity factors in
+        OUTPUT_FILEPATH (.csv).
+    """
+    logger = logging.getLogger(__name__)
+
+    runs = portfolio_runs(build_portfolio(build_catalog(processed_filepath)),
+                          query)
+    peaks = portfolio_peaks(stack_loads(runs))
+    peaks.to_csv(output_filepath)
+
+    for load, row in peaks.iterrows():
+        logger.info('%-10s coincident peak %9.1f kW, diversity factor %.2f',
+                    load, row['coincident_peak'], row['diversity_factor'])
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+# vectorized versions of the ASHRAE Handbook 2017 equations used by
+# PsychroLib (SI units), so that whole columns are converted at once
+TRIPLE_POINT_WATER = 0.01
+ZERO_CELSIUS_AS_KELVIN = 273.15
+RATIO_MOLECULAR_WEIGHT_WATER_AIR = 0.621945
+STANDARD_PRESSURE = 101325.0
+DEW_POINT_TOLERANCE = 1e-3
+DEW_POINT_MAX_ITERATIONS = 20
+
+# column prefixes of the zone variables
+TAIR = 'TAIR_'
+RELHUM = 'RELHUM_'
+ABSHUM = 'ABSHUM_'
+TDEW = 'TDEW_'
+ENTH = 'ENTH_'
+
+
+def standard_pressure(altitude):
+    '''
+    Atmospheric pressure [Pa] of the standard atmosphere at the given
+    altitude [m].
+    '''
+    return STANDARD_PRESSURE * (1 - 2.25577e-05 * altitude)**5.2559
+
+
+def _ln_saturation_vapor_pressure(t_dry):
+    '''
+    Natural logarithm of the saturation vapor pressure [Pa] over ice (below
+    the triple point) or liquid water, together with its derivative with
+    respect to the temperature [°C].
+    '''
+    t_dry = np.asarray(t_dry, dtype=float)
+    tk = t_dry + ZERO_CELSIUS_AS_KELVIN
+    ice = t_dry <= TRIPLE_POINT_WATER
+
+    ln_ice = (-5.6745359e+03 / tk + 6.3925247 - 9.677843e-03 * tk +
+              6.2215701e-07 * tk**2 + 2.0747825e-09 * tk**3 -
+              9.484024e-13 * tk**4 + 4.1635019 * np.log(tk))
+    d_ice = (5.6745359e+03 / tk**2 - 9.677843e-03 + 2 * 6.2215701e-07 * tk +
+             3 * 2.0747825e-09 * tk**2 - 4 * 9.484024e-13 * tk**3 +
+             4.1635019 / tk)
+
+    ln_water = (-5.8002206e+03 / tk + 1.3914993 - 4.8640239e-02 * tk +
+                4.1764768e-05 * tk**2 - 1.4452093e-08 * tk**3 +
+                6.5459673 * np.log(tk))
+    d_water = (5.8002206e+03 / tk**2 - 4.8640239e-02 +
+               2 * 4.1764768e-05 * tk - 3 * 1.4452093e-08 * tk**2 +
+               6.5459673 / tk)
+
+    return np.where(ice, ln_ice, ln_water), np.where(ice, d_ice, d_water)
+
+
+def saturation_vapor_pressure(t_dry):
+    '''
+    Saturation vapor pressure [Pa] at the dry bulb temperature [°C].
+    '''
+    return np.exp(_ln_saturation_vapor_pressure(t_dry)[0])
+
+
+def humidity_ratio_from_vapor_pressure(p_vap, pressure=STANDARD_PRESSURE):
+    '''
+    Humidity ratio [kg/kg] of moist air from the partial pressure of water
+    vapor [Pa].
+    '''
+    p_vap = np.asarray(p_vap, dtype=float)
+    return RATIO_MOLECULAR_WEIGHT_WATER_AIR * p_vap / (pressure - p_vap)
+
+
+def vapor_pressure_from_humidity_ratio(hum_ratio, pressure=STANDARD_PRESSURE):
+    '''
+    Partial pressure of water vapor [Pa] from the humidity ratio [kg/kg].
+    '''
+    hum_ratio = np.asarray(hum_ratio, dtype=float)
+    return pressure * hum_ratio / (RATIO_MOLECULAR_WEIGHT_WATER_AIR +
+                                   hum_ratio)
+
+
+def humidity_ratio_from_rel_hum(t_dry, rel_hum, pressure=STANDARD_PRESSURE):
+    '''
+    Humidity ratio [kg/kg] from dry bulb temperature [°C] and relative
+    humidity [%].
+    '''
+    p_vap = saturation_vapor_pressure(t_dry) * np.asarray(rel_hum) / 100
+    return humidity_ratio_from_vapor_pressure(p_vap, pressure)
+
+
+def rel_hum_from_humidity_ratio(t_dry, hum_ratio, pressure=STANDARD_PRESSURE):
+    '''
+    Relative humidity [%] from dry bulb temperature [°C] and humidity ratio
+    [kg/kg].
+    '''
+    p_vap = vapor_pressure_from_humidity_ratio(hum_ratio, pressure)
+    return np.clip(100 * p_vap / saturation_vapor_pressure(t_dry), 0, 100)
+
+
+def dew_point_from_vapor_pressure(p_vap):
+    '''
+    Dew point temperature [°C] from the partial pressure of water vapor [Pa],
+    found with Newton iterations on all the values at once.
+    '''
+    ln_p_vap = np.log(np.maximum(np.asarray(p_vap, dtype=float), 1e-06))
+
+    # Magnus formula as first guess
+    gamma = ln_p_vap - np.log(610.94)
+    t_dew = 243.04 * gamma / (17.625 - gamma)
+
+    for _ in range(DEW_POINT_MAX_ITERATIONS):
+        ln_p_sat, derivative = _ln_saturation_vapor_pressure(t_dew)
+        step = (ln_p_sat - ln_p_vap) / derivative
+        t_dew = np.clip(t_dew - step, -100, 200)
+        if np.all(np.abs(step) < DEW_POINT_TOLERANCE):
+            break
+
+    return t_dew
+
+
+def moist_air_enthalpy(t_dry, hum_ratio):
+    '''
+    Specific enthalpy of moist air [kJ/kg of dry air] from dry bulb
+    temperature [°C] and humidity ratio [kg/kg].
+    '''
+    t_dry = np.asarray(t_dry, dtype=float)
+    return 1.006 * t_dry + np.asarray(hum_ratio) * (2501 + 1.86 * t_dry)
+
+
+def zone_psychrometrics(data, pressure=STANDARD_PRESSURE):
+    '''
+    Completes the psychrometric state of every zone having an air temperature
+    and at least one of ABSHUM_ or RELHUM_. Missing relative humidity [%] and
+    humidity ratio [kg/kg] columns are derived from each other, and dew point
+    [°C] and enthalpy [kJ/kg] columns are added. All zones are computed
+    together as matrices, a new data frame is returned.
+    '''
+    zones = [
+        c[len(TAIR):] for c in data.columns if c.startswith(TAIR) and (
+            ABSHUM + c[len(TAIR):] in data or RELHUM + c[len(TAIR):] in data)
+    ]
+    if not zones:
+        return data
+
+    t_dry = data[[TAIR + z for z in zones]].to_numpy(dtype=float)
+
+    # fill the humidity ratio where only the relative humidity is known
+    hum_ratio = np.empty_like(t_dry)
+    has_w = np.array([ABSHUM + z in data for z in zones])
+    if has_w.any():
+        hum_ratio[:, has_w] = data[[
+            ABSHUM + z for z, w in zip(zones, has_w) if w
+        ]].to_numpy(dtype=float)
+    if not has_w.all():
+        rel_hum = data[[RELHUM + z for z, w in zip(zones, has_w) if not w]]
+        hum_ratio[:, ~has_w] = humidity_ratio_from_rel_hum(
+            t_dry[:, ~has_w], rel_hum.to_numpy(dtype=float), pressure)
+
+    p_vap = vapor_pressure_from_humidity_ratio(hum_ratio, pressure)
+    rel_hum = rel_hum_from_humidity_ratio(t_dry, hum_ratio, pressure)
+    t_dew = dew_point_from_vapor_pressure(p_vap)
+    enthalpy = moist_air_enthalpy(t_dry, hum_ratio)
+
+    columns = dict()
+    for n, zone in enumerate(zones):
+        if not has_w[n]:
+            columns[ABSHUM + zone] = hum_ratio[:, n]
+        if RELHUM + zone not in data:
+            columns[RELHUM + zone] = rel_hum[:, n]
+        columns[TDEW + zone] = t_dew[:, n]
+        columns[ENTH + zone] = enthalpy[:, n]
+
+    data = data.drop(columns=[c for c in columns if c in data])
+    return pd.concat([data, pd.DataFrame(columns, index=data.index)], axis=1)
+
+
+def weather_psychrometrics(weather):
+    '''
+    Adds humidity ratio [kg/kg] and enthalpy [kJ/kg] columns to a weather
+    data frame read from an EPW file, the data frame is modified in place and
+    returned.
+    '''
+    pressure = weather['atmospheric_pressure'].to_numpy(dtype=float)
+    t_dry = weather['temp_air'].to_numpy(dtype=float)
+    hum_ratio = humidity_ratio_from_rel_hum(
+        t_dry, weather['relative_humidity'].to_numpy(dtype=float), pressure)
+
+    weather['humidity_ratio'] = hum_ratio
+    weather['enthalpy'] = moist_air_enthalpy(t_dry, hum_ratio)
+
+    return weather
+
+
+def humidity_ratio(data, zone, pressure=STANDARD_PRESSURE):
+    '''
+    Humidity ratio [kg/kg] of a zone, as computed by make_dataset or derived
+    from its relative humidity for older processed data.
+    '''
+    if ABSHUM + zone in data:
+        return data[ABSHUM + zone].to_numpy(dtype=float)
+    return humidity_ratio_from_rel_hum(data[TAIR + zone],
+                                       data[RELHUM + zone], pressure)
+
+
+def weather_humidity_ratio(weather):
+    '''
+    Humidity ratio [kg/kg] of the outdoor air.
+    '''
+    if 'humidity_ratio' not in weather:
+        weather = weather_psychrometrics(weather.copy())
+    return weather['humidity_ratio'].to_numpy(dtype=float)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+from src.data.loader import stream_runs
+from src.data.weather_store import read_run_weather, weather_file
+from src.features.calendar import time_step
+from src.features.comfort import adaptive_thermal_comfort_summary
+
+# yearly sums of these columns of cultural-e.csv are used as KPIs
+DEMAND_COLUMNS = ['SQHEAT_1', 'SQCOOL_1', 'QHEAT_TOT', 'QCOOL_TOT', 'QEL_TOT']
+
+
+def compute_kpis(data, weather=None):
+    '''
+    Computes the KPIs of a run from its cultural-e table: the yearly energy
+    demands [kJ] and peak loads [kJ/h] of the main systems, and, given the
+    weather, the occupied hours spent outside of the adaptive comfort
+    category II, summed over all zones.
+    '''
+    demand = data[[c for c in DEMAND_COLUMNS if c in data]]
+    energy = demand.sum() * time_step(data['TIME'])
+    values = pd.concat([energy, demand.max().add_prefix('PEAK_')])
+
+    if weather is not None:
+        comfort = adaptive_thermal_comfort_summary(data, weather)
+        values['DISCOMFORT_HOURS'] = (comfort['hours_above'].sum() +
+                                      comfort['hours_below'].sum())
+
+    return values
+
+
+def run_kpis(run_path):
+    '''
+    Computes the KPIs of a processed run, the comfort ones only if it has
+    its weather file.
+    '''
+    run_path = Path(run_path)
+    data = pd.read_csv(run_path / 'cultural-e.csv', index_col=False)
+
+    weather = None
+    if weather_file(run_path).exists():
+        weather, _ = read_run_weather(run_path)
+
+    return compute_kpis(data, weather)
+
+
+def collect_kpis(runs):
+    '''
+    Table of the KPIs of the given runs (as returned by query_runs), indexed
+    by run id. The files of the runs are read concurrently and the KPIs of
+    each run are computed as soon as it is loaded.
+    '''
+    values = {
+        run.id: compute_kpis(tables['cultural-e'], tables.get('weather'))
+        for run, tables in stream_runs(runs, ['cultural-e', 'weather'])
+    }
+
+    return pd.DataFrame([values[r.id] for r in runs],
+                        index=pd.Index([r.id for r in runs], name='run'))
+
+
+def join_inputs_kpis(inputs, kpis):
+    '''
+    Joins parameters and KPIs on the run id, dropping the parameters that do
+    not vary across the runs.
+    '''
+    inputs = inputs.select_dtypes('number')
+    inputs = inputs.loc[:, inputs.nunique() > 1]
+    data = inputs.join(kpis, how='inner')
+
+    return data[inputs.columns], data[kpis.columns]
+
+
+def _standardize(values):
+    '''
+    Scales every column to zero mean and unit variance.
+    '''
+    std = values.std(axis=0)
+    return (values - values.mean(axis=0)) / np.where(std > 0, std, 1)
+
+
+def correlation(inputs, kpis):
+    '''
+    Pearson correlation between every input parameter and every KPI, computed
+    as a single matrix product.
+    '''
+    x, y = join_inputs_kpis(inputs, kpis)
+    xs = _standardize(x.to_numpy(dtype=float))
+    ys = _standardize(y.to_numpy(dtype=float))
+
+    return pd.DataFrame(xs.T @ ys / len(xs),
+                        index=x.columns,
+                        columns=y.columns)
+
+
+def standardized_regression_coefficients(inputs, kpis):
+    '''
+    Standardized regression coefficients of a linear model of every KPI with
+    respect to all the input parameters, fitted at once by least squares.
+    '''
+    x, y = join_inputs_kpis(inputs, kpis)
+    xs = _standardize(x.to_numpy(dtype=float))
+    ys = _standardize(y.to_numpy(dtype=float))
+
+    src, _, _, _ = np.linalg.lstsq(xs, ys, rcond=None)
+
+    return pd.DataFrame(src, index=x.columns, columns=y.columns)
+
+
+def elementary_effects(inputs, kpis):
+    '''
+    Morris-style elementary effects, estimated from the pairs of runs that
+    differ in a single parameter. The effects are scaled by the range of the
+    parameter, so that they are comparable with each other.
+
+    Returns two tables, the mean of the absolute effects (mu*) and their
+    standard deviation (sigma), with one row per parameter and one column per
+    KPI.
+    '''
+    x, y = join_inputs_kpis(inputs, kpis)
+    xv = x.to_numpy(dtype=float)
+    yv = y.to_numpy(dtype=float)
+
+    mu_star = np.full((xv.shape[1], yv.shape[1]), np.nan)
+    sigma = np.full_like(mu_star, np.nan)
+    for j in range(xv.shape[1]):
+        # runs sharing all the other parameters form a group
+        _, group = np.unique(np.delete(xv, j, axis=1),
+                             axis=0,
+                             return_inverse=True)
+        group = group.ravel()
+        order = np.lexsort((xv[:, j], group))
+
+        # consecutive runs of the same group differ only in parameter j
+        g, xj, yj = group[order], xv[order, j], yv[order]
+        dx = np.diff(xj)
+        pairs = (g[1:] == g[:-1]) & (dx != 0)
+        if not pairs.any():
+            continue
+
+        span = xv[:, j].max() - xv[:, j].min()
+        effects = np.diff(yj, axis=0)[pairs] / dx[pairs, np.newaxis] * span
+
+        mu_star[j] = np.abs(effects).mean(axis=0)
+        sigma[j] = effects.std(axis=0)
+
+    return (pd.DataFrame(mu_star, index=x.columns, columns=y.columns),
+            pd.DataFrame(sigma, index=x.columns, columns=y.columns))
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+# factors converting a value from the first unit to the second
+CONVERSION_FACTORS = {
+    ('kJ/h', 'W'): 1 / 3.6,
+    ('kJ/h', 'kW'): 1 / 3600,
+    ('kJ', 'Wh'): 1 / 3.6,
+    ('kJ', 'kWh'): 1 / 3600,
+    ('kJ', 'MWh'): 1 / 3.6e+06,
+    ('kJ', 'MJ'): 1e-03,
+    ('W', 'kW'): 1e-03,
+    ('Wh', 'kWh'): 1e-03,
+    ('kWh', 'MWh'): 1e-03,
+    ('kg/kg', 'g/kg'): 1e+03,
+}
+# unit of the energy obtained integrating a power over hours
+ENERGY_OF_POWER = {'kJ/h': 'kJ', 'W': 'Wh', 'kW': 'kWh'}
+# units of the outputs of the simulation without a units row, by prefix
+UNITS_BY_PREFIX = [
+    ('TIME', 'h'),
+    ('TAIR_', 'C'),
+    ('TOP_', 'C'),
+    ('TDEW_', 'C'),
+    ('ABSHUM_', 'kg/kg'),
+    ('RELHUM_', '%'),
+    ('ENTH_', 'kJ/kg'),
+    ('CO2_', 'ppm'),
+    ('OCC_', '-'),
+    ('SHD_', '-'),
+    ('WIN_OF_', '-'),
+    ('SQHEAT_', 'kJ/h'),
+    ('SQCOOL_', 'kJ/h'),
+    ('Q', 'kJ/h'),
+    ('PV_', 'kJ/h'),
+    ('REL_BAL', '%'),
+]
+# terms of the zone balances in the hourly .BAL files, e.g. 1_B4_QBAL
+ZONE_BALANCE_INFIX = 'B4_'
+
+# floor areas of a run among its input parameters
+AREA_PARAMETERS = {'GFA': 'IN_GFA', 'NIA': 'IN_NIA'}
+
+
+def conversion_factor(from_unit, to_unit):
+    '''
+    Factor converting a value from a unit to another one.
+    '''
+    if from_unit == to_unit:
+        return 1.0
+    if (from_unit, to_unit) in CONVERSION_FACTORS:
+        return CONVERSION_FACTORS[(from_unit, to_unit)]
+    if (to_unit, from_unit) in CONVERSION_FACTORS:
+        return 1 / CONVERSION_FACTORS[(to_unit, from_unit)]
+
+    raise ValueError('Cannot convert {} to {}'.format(from_unit, to_unit))
+
+
+def infer_unit(column):
+    '''
+    Unit of an output of the simulation, guessed from its name.
+    '''
+    for prefix, unit in UNITS_BY_PREFIX:
+        if column.startswith(prefix):
+            return unit
+    if ZONE_BALANCE_INFIX in column:
+        return 'kJ/h'
+    return '-'
+
+
+def read_units(filepath, table):
+    '''
+    Units of the columns of a table from the metadata saved by make_dataset.
+    '''
+    metadata = pd.read_csv(filepath)
+    metadata = metadata[metadata['table'] == table]
+
+    return dict(zip(metadata['column'], metadata['unit']))
+
+
+def integrated_units(columns, units=None):
+    '''
+    Units of the columns once integrated over time in hours, e.g. kJ for a
+    power in kJ/h: the values must be multiplied by the timestep of the rows
+    (see calendar.time_step) before summing them.
+    '''
+    units = units if units is not None else dict()
+    integrated = dict()
+    for c in columns:
+        unit = units.get(c, infer_unit(c))
+        integrated[c] = ENERGY_OF_POWER.get(unit, unit)
+
+    return integrated
+
+
+def convert_columns(data, columns, to_unit, units=None):
+    '''
+    Converts a block of columns to the same unit with a single vectorized
+    product. Units are taken from the given dictionary, or guessed from the
+    names of the columns.
+    '''
+    units = units if units is not None else dict()
+    factors = np.array([
+        conversion_factor(units.get(c, infer_unit(c)), to_unit)
+        for c in columns
+    ])
+
+    return data[columns].to_numpy(dtype=float) * factors
+
+
+class UnitTable:
+    '''
+    Table of the outputs of a run that returns blocks of columns in the
+    requested unit, optionally normalized by one of the floor areas of the
+    run. Conversions are cached, so that the charts sharing a table never
+    convert the same block twice.
+    '''
+
+    def __init__(self, data, units=None, parameters=None):
+        self.data = data
+        self.units = {c: infer_unit(c) for c in data.columns}
+        self.units.update(units or dict())
+        self.parameters = parameters if parameters is not None else dict()
+        self._cache = dict()
+
+    def get(self, columns, unit, per_area=None):
+        '''
+        Returns a 2D array with the columns in the given unit. If per_area is
+        'GFA' or 'NIA' the values are divided by the gross or net floor area.
+        '''
+        key = (tuple(columns), unit, per_area)
+        if key not in self._cache:
+            values = convert_columns(self.data, list(columns), unit,
+                                     self.units)
+            if per_area is not None:
+                values = values / self.parameters[AREA_PARAMETERS[per_area]]
+            values.flags.writeable = False
+            self._cache[key] = values
+
+        return self._cache[key]
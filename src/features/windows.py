@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+from collections import namedtuple
+
+from src.features.calendar import HOURS_IN_A_DAY, HOURS_IN_A_MONTH, MONTHS
+from src.features.calendar import day_of_hour
+from src.features.comfort import occupancy_matrix, zone_names
+
+# period of the simulation in hours, from start (included) to stop (excluded,
+# None for the end of the simulation), with a label for the chart titles
+Window = namedtuple('Window', ['start', 'stop', 'label'])
+
+DAYS_IN_A_WEEK = 7
+# operative temperature [°C] above which the hours of a zone count towards
+# the overheating day
+OVERHEATING_DAY_THRESHOLD = 26
+
+
+def hour_window(start, stop=None, label=None):
+    '''
+    Window between two hours of the simulation.
+    '''
+    if label is None:
+        label = 'Hours {:g}-{}'.format(start,
+                                       '' if stop is None else
+                                       '{:g}'.format(stop))
+    return Window(start, stop, label)
+
+
+def day_window(day, days=1, label=None):
+    '''
+    Window of the given number of days, starting from a day of the year (0 is
+    the first day).
+    '''
+    if label is None:
+        label = 'Day {}'.format(day + 1) if days == 1 else \
+            'Days {}-{}'.format(day + 1, day + days)
+    return Window(day * HOURS_IN_A_DAY, (day + days) * HOURS_IN_A_DAY, label)
+
+
+def month_window(month):
+    '''
+    Window of a month, by name or number (0 is January), with months of
+    constant length as in month_of_hour.
+    '''
+    if isinstance(month, str):
+        month = [m.lower() for m in MONTHS].index(month.lower())
+
+    # the last month takes the remaining hours
+    stop = None if month == len(MONTHS) - 1 else \
+        (month + 1) * HOURS_IN_A_MONTH
+    return Window(month * HOURS_IN_A_MONTH, stop, MONTHS[month])
+
+
+def time_axis(table):
+    '''
+    Hours of the rows of a table, from its TIME column if any.
+    '''
+    if 'TIME' in table:
+        return table['TIME'].to_numpy(dtype=float)
+    return np.arange(len(table), dtype=float)
+
+
+def window_rows(time, window):
+    '''
+    Slice of the rows of a table falling in the window, found by bisection
+    of its sorted time axis.
+    '''
+    i0 = np.searchsorted(time, window.start, side='left')
+    i1 = len(time) if window.stop is None else \
+        np.searchsorted(time, window.stop, side='left')
+
+    return slice(int(i0), int(i1))
+
+
+def select_window(table, window=None):
+    '''
+    Rows of a table (an hourly processed table or a weather file) in the
+    window, the whole table when the window is None. The rows are a view,
+    nothing is copied.
+    '''
+    if window is None:
+        return table
+    return table.iloc[window_rows(time_axis(table), window)]
+
+
+def rolling_sums(values, n):
+    '''
+    Sums of every n consecutive values, from cumulative sums.
+    '''
+    sums = np.concatenate([[0], np.cumsum(values, dtype=float)])
+    return sums[n:] - sums[:-n]
+
+
+def peak_window(time, values, days, label):
+    '''
+    Window of the given number of whole days with the largest sum of the
+    values.
+    '''
+    daily = np.bincount(day_of_hour(time), weights=values)
+    sums = rolling_sums(daily, min(days, len(daily)))
+
+    return day_window(int(np.argmax(sums)), days, label)
+
+
+def peak_heating_week(data, column='SQHEAT_1'):
+    '''
+    Week with the largest heating demand, the system of heating_loads.
+    '''
+    return peak_window(data['TIME'], data[column].to_numpy(dtype=float),
+                       DAYS_IN_A_WEEK, 'Peak heating week')
+
+
+def peak_cooling_week(data, column='SQCOOL_1'):
+    '''
+    Week with the largest cooling demand, the system of cooling_loads.
+    '''
+    return peak_window(data['TIME'], data[column].to_numpy(dtype=float),
+                       DAYS_IN_A_WEEK, 'Peak cooling week')
+
+
+def max_overheating_day(data, zones=None,
+                        threshold=OVERHEATING_DAY_THRESHOLD):
+    '''
+    Day with the most degree hours above the threshold, summed over the
+    occupied hours of all the zones.
+    '''
+    if zones is None:
+        zones = zone_names(data)
+
+    t_op = data[['TOP_' + zone for zone in zones]].to_numpy(dtype=float)
+    excess = np.where(occupancy_matrix(data, zones),
+                      np.maximum(t_op - threshold, 0), 0)
+
+    return peak_window(data['TIME'], np.nansum(excess, axis=1), 1,
+                       'Max overheating day')
+
+
+# events found in cultural-e.csv, by name
+EVENTS = {
+    'peak_heating_week': peak_heating_week,
+    'peak_cooling_week': peak_cooling_week,
+    'max_overheating_day': max_overheating_day,
+}
+
+
+def detect_events(data):
+    '''
+    Windows of all the events of a run, found in its cultural-e.csv.
+    '''
+    return {name: find(data) for name, find in EVENTS.items()}
+
+
+def parse_window(spec, data=None):
+    '''
+    Window described by a string: a month name, an event name (found in the
+    given cultural-e.csv) or a range of hours as START-STOP. None stays None.
+    '''
+    if spec is None:
+        return None
+    if spec.lower() in [m.lower() for m in MONTHS]:
+        return month_window(spec)
+    if spec in EVENTS:
+        if data is None:
+            raise ValueError('Event {} needs the data of the run'.format(spec))
+        return EVENTS[spec](data)
+
+    start, _, stop = spec.partition('-')
+    try:
+        return hour_window(float(start), float(stop) if stop else None)
+    except ValueError:
+        raise ValueError('Unrecognized window: {}'.format(spec)) from None
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+import importlib
+
+
+class LazyModule:
+    '''
+    Stand-in for a module that is only imported the first time one of its
+    attributes is accessed, so that heavy plotting libraries do not slow down
+    processes that never draw a chart.
+    '''
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return '<lazy module {!r} ({})>'.format(self._name, state)
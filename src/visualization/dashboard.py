@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+import click
+import io
+import json
+import logging
+import threading
+import numpy as np
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from src.data.catalog import Run, build_catalog
+from src.data.shared import load_run
+from src.features.calendar import MONTHS
+from src.features.downsample import DOWNSAMPLING_METHODS, downsample, viewport
+from src.features.windows import detect_events, month_window, parse_window
+from src.features.windows import time_axis
+from src.lazy import LazyModule
+from src.visualization import visualize
+
+mpl = LazyModule('matplotlib')
+plt = LazyModule('matplotlib.pyplot')
+
+# processed tables served as time series, the meteo has no TIME column and
+# is indexed by hour of the year
+SERIES_TABLES = ['cultural-e', 'energy_zones', 'meteo']
+DEFAULT_POINTS = 1000
+MAX_POINTS = 10000
+CHART_DPI = 60
+PAGE_FILE = Path(__file__).parent / 'dashboard.html'
+
+
+def _window(t, q):
+    '''
+    Time window of a chart from the 'window' query parameter, see
+    parse_window.
+    '''
+    return parse_window(q.get('window'), t['cultural-e'])
+
+
+# charts of visualize.py served as images, each takes the tables of a run
+# and the query parameters
+CHARTS = {
+    'air_temperature':
+    lambda t, q: visualize.air_temperature(t['meteo'], _window(t, q)),
+    'relative_humidity':
+    lambda t, q: visualize.relative_humidity(t['meteo'], _window(t, q)),
+    'horizontal_irradiance':
+    lambda t, q: visualize.horizontal_irradiance(t['meteo'], _window(t, q)),
+    'heating_loads':
+    lambda t, q: visualize.heating_loads(t['cultural-e'], _window(t, q)),
+    'cooling_loads':
+    lambda t, q: visualize.cooling_loads(t['cultural-e'], _window(t, q)),
+    'energy_balance':
+    lambda t, q: visualize.energy_balance(t['summary'],
+                                          t.get('summary-total')),
+    'zone_energy_balance':
+    lambda t, q: visualize.zone_energy_balance(
+        t['energy_zones'].copy(), q.get('zone', '1'), _window(t, q)),
+    'monthly_consumption':
+    lambda t, q: visualize.monthly_consumption(t['cultural-e'].copy(),
+                                               _window(t, q)),
+    'self_production_consumption':
+    lambda t, q: visualize.self_production_consumption(t['cultural-e']),
+    'adaptive_thermal_comfort':
+    lambda t, q: visualize.adaptive_thermal_comfort(
+        t['cultural-e'], t['meteo'], mode=q.get('mode', 'scatter'),
+        window=_window(t, q)),
+}
+# tables drawn by each chart, the time windows are read from cultural-e
+CHART_TABLES = {
+    'air_temperature': ['meteo'],
+    'relative_humidity': ['meteo'],
+    'horizontal_irradiance': ['meteo'],
+    'heating_loads': ['cultural-e'],
+    'cooling_loads': ['cultural-e'],
+    'energy_balance': ['summary'],
+    'zone_energy_balance': ['energy_zones'],
+    'monthly_consumption': ['cultural-e'],
+    'self_production_consumption': ['cultural-e'],
+    'adaptive_thermal_comfort': ['meteo'],
+}
+
+
+def available_charts(tables):
+    '''
+    Charts of CHARTS that can be drawn from the tables of a run, the ones
+    missing a table are left out (e.g. the weather charts of runs without
+    weather).
+    '''
+    return [
+        name for name in CHARTS
+        if {'cultural-e', *CHART_TABLES[name]} <= set(tables)
+    ]
+
+
+def _to_json(values):
+    '''
+    Converts an array to a list, missing values become null.
+    '''
+    values = np.asarray(values, dtype=float)
+    return np.where(np.isnan(values), None, values).tolist()
+
+
+def _optional_float(query, key):
+    return float(query[key]) if key in query else None
+
+
+def series(table, columns, start=None, stop=None, points=DEFAULT_POINTS,
+           method='lttb'):
+    '''
+    Downsamples the columns of a table within the viewport [start, stop] to
+    at most the given number of points per column.
+    '''
+    x = time_axis(table)
+    window = viewport(x, start, stop)
+
+    result = dict()
+    for c in columns:
+        xs, ys = downsample(x[window],
+                            table[c].to_numpy(dtype=float)[window], points,
+                            method)
+        result[c] = {'x': _to_json(xs), 'y': _to_json(ys)}
+
+    return {'total': window.stop - window.start, 'series': result}
+
+
+def render_chart(name, tables, query):
+    '''
+    Draws one of the charts of visualize.py and returns it as a PNG. The
+    figure stays open, the next request of the chart reuses it.
+    '''
+    CHARTS[name](tables, query)
+
+    buffer = io.BytesIO()
+    plt.gcf().savefig(buffer, format='png', dpi=CHART_DPI)
+
+    return buffer.getvalue()
+
+
+class Dashboard:
+    '''
+    Processed runs found below a folder, loaded in memory on first request.
+    '''
+
+    def __init__(self, processed_filepath):
+        catalog = build_catalog(processed_filepath)
+        self.paths = catalog['path'].to_dict()
+        self._runs = dict()
+        self._load_lock = threading.Lock()
+        # pyplot keeps a global state, charts are drawn one at a time
+        self._chart_lock = threading.Lock()
+
+    def tables(self, run):
+        with self._load_lock:
+            if run not in self._runs:
+                self._runs[run] = load_run(Run(run, self.paths[run]))
+        return self._runs[run]
+
+    def index(self):
+        return {
+            'runs': list(self.paths),
+            'charts': list(CHARTS),
+            'methods': list(DOWNSAMPLING_METHODS),
+        }
+
+    def columns(self, run):
+        return {
+            name: [c for c in table.columns if c != 'TIME']
+            for name, table in self.tables(run).items()
+            if name in SERIES_TABLES
+        }
+
+    def windows(self, run):
+        '''
+        Named periods of a run, the months and its detected events.
+        '''
+        windows = [month_window(month) for month in range(len(MONTHS))]
+        windows = dict(zip(MONTHS, windows))
+        windows.update(detect_events(self.tables(run)['cultural-e']))
+
+        return {name: list(window) for name, window in windows.items()}
+
+    def series(self, run, table, columns, start, stop, points, method):
+        return series(self.tables(run)[table], columns, start, stop,
+                      min(points, MAX_POINTS), method)
+
+    def chart(self, run, name, query):
+        with self._chart_lock:
+            return render_chart(name, self.tables(run), query)
+
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    '''
+    Request handler serving the page, the JSON API and the charts of the
+    dashboard set as class attribute.
+    '''
+    dashboard = None
+
+    def _send(self, body, content_type, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, data, status=200):
+        self._send(json.dumps(data).encode(), 'application/json', status)
+
+    def _page(self, query):
+        self._send(PAGE_FILE.read_bytes(), 'text/html')
+
+    def _runs(self, query):
+        self._send_json(self.dashboard.index())
+
+    def _columns(self, query):
+        self._send_json(self.dashboard.columns(query['run']))
+
+    def _series(self, query):
+        self._send_json(
+            self.dashboard.series(query['run'], query['table'],
+                                  query['columns'].split(','),
+                                  _optional_float(query, 'start'),
+                                  _optional_float(query, 'stop'),
+                                  int(query.get('points', DEFAULT_POINTS)),
+                                  query.get('method', 'lttb')))
+
+    def _windows(self, query):
+        self._send_json(self.dashboard.windows(query['run']))
+
+    def _chart(self, query):
+        self._send(self.dashboard.chart(query['run'], query['name'], query),
+                   'image/png')
+
+    routes = {
+        '/': _page,
+        '/api/runs': _runs,
+        '/api/columns': _columns,
+        '/api/series': _series,
+        '/api/windows': _windows,
+        '/api/chart': _chart,
+    }
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path not in self.routes:
+            self._send_json({'error': 'not found'}, 404)
+            return
+        try:
+            self.routes[url.path](self, query)
+        except (KeyError, ValueError) as e:
+            self._send_json({'error': repr(e)}, 400)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug(format, *args)
+
+
+def make_handler(dashboard):
+    '''
+    Handler class bound to the given dashboard.
+    '''
+    return type('Handler', (DashboardHandler, ), {'dashboard': dashboard})
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.option('--host', default='127.0.0.1', show_default=True)
+@click.option('--port', default=8050, show_default=True)
+def main(processed_filepath, host, port):
+    """ Serves a dashboard of the runs processed below PROCESSED_FILEPATH,
+        the time series are downsampled by the server to the zoomed window.
+    """
+    logger = logging.getLogger(__name__)
+
+    # charts are rendered off-screen
+    mpl.use('Agg')
+
+    dashboard = Dashboard(processed_filepath)
+    server = ThreadingHTTPServer((host, port), make_handler(dashboard))
+
+    logger.info('serving %d runs on http://%s:%d', len(dashboard.paths), host,
+                port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
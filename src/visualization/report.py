@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+import click
+import io
+import logging
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+from src.data.catalog import build_catalog, query_runs
+from src.data.shared import load_run
+from src.features.comfort import zone_names
+from src.lazy import LazyModule
+from src.visualization import visualize
+from src.visualization.dashboard import CHARTS, available_charts
+
+mpl = LazyModule('matplotlib')
+plt = LazyModule('matplotlib.pyplot')
+backend_pdf = LazyModule('matplotlib.backends.backend_pdf')
+Image = LazyModule('PIL.Image')
+
+# formats of the charts: vector ones are saved by matplotlib with their dense
+# layers rasterized, raster ones are encoded by Pillow
+VECTOR_FORMATS = ['pdf', 'svg']
+RASTER_FORMATS = ['png', 'webp']
+DEFAULT_DPI = 100
+WEBP_QUALITY = 80
+# artists drawing more points (markers, vertices, mesh cells) than this, and
+# the patches of axes drawing more bars than DENSE_PATCHES, are rasterized in
+# vector outputs
+DENSE_POINTS = 1000
+DENSE_PATCHES = 500
+
+
+def _artist_points(artist):
+    '''
+    Number of points drawn by an artist, 0 for the ones that are never dense.
+    '''
+    if isinstance(artist, mpl.lines.Line2D):
+        return len(artist.get_xdata())
+    if isinstance(artist, mpl.collections.Collection):
+        # the cells of meshes and hexbins, or the markers of scatter plots
+        if artist.get_array() is not None:
+            return artist.get_array().size
+        return max(len(artist.get_offsets()), len(artist.get_paths()))
+    return 0
+
+
+def _is_scatter(artist):
+    '''
+    Whether an artist draws the same marker at every point.
+    '''
+    return isinstance(artist, mpl.collections.PathCollection) and \
+        len(artist.get_paths()) == 1
+
+
+def dense_layers(figure, markers=True, threshold=DENSE_POINTS):
+    '''
+    Artists of a figure worth rasterizing in vector outputs, where each of
+    their points would be written as a separate vector path. PDF files write
+    the marker of a scatter plot once and reference it at every point, the
+    scatter plots are left out if markers is False.
+    '''
+    layers = []
+    for ax in figure.axes:
+        layers.extend(a for a in ax.get_children()
+                      if _artist_points(a) > threshold and
+                      (markers or not _is_scatter(a)))
+        if len(ax.patches) > DENSE_PATCHES:
+            layers.extend(ax.patches)
+    return layers
+
+
+@contextmanager
+def rasterized_layers(figure, rasterize=True, fmt='pdf'):
+    '''
+    Rasterizes the dense layers of a figure saved in the given format within
+    the block, the rest of the figure (axes, text, sparse lines) stays
+    vector. The layers are restored afterwards, as the figures of the charts
+    are reused.
+    '''
+    layers = dense_layers(figure, markers=fmt != 'pdf') if rasterize else []
+    layers = [a for a in layers if not a.get_rasterized()]
+
+    for artist in layers:
+        artist.set_rasterized(True)
+    try:
+        yield layers
+    finally:
+        for artist in layers:
+            artist.set_rasterized(False)
+
+
+def figure_image(figure, dpi=DEFAULT_DPI):
+    '''
+    Figure drawn by Agg as a Pillow image.
+    '''
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format='rgba', dpi=dpi)
+
+    # size of the canvas of Agg
+    width, height = (int(size * dpi) for size in figure.get_size_inches())
+    image = Image.frombuffer('RGBA', (width, height), buffer.getbuffer(),
+                             'raw', 'RGBA', 0, 1)
+
+    # the charts are opaque, the alpha channel is dropped
+    return image.convert('RGB')
+
+
+def save_chart(figure, filepath, dpi=DEFAULT_DPI, rasterize=True,
+               colors=None, quality=WEBP_QUALITY):
+    '''
+    Saves a figure in the format of the file extension. PNG files are
+    optimized, and reduced to a palette of the given number of colors if any;
+    WebP files are lossy with the given quality (100 for lossless).
+    '''
+    filepath = Path(filepath)
+    fmt = filepath.suffix[1:].lower()
+
+    if fmt in VECTOR_FORMATS:
+        with rasterized_layers(figure, rasterize, fmt):
+            figure.savefig(filepath, format=fmt, dpi=dpi)
+    elif fmt == 'png':
+        image = figure_image(figure, dpi)
+        if colors is not None:
+            image = image.quantize(colors)
+        image.save(filepath, 'PNG', optimize=True)
+    elif fmt == 'webp':
+        figure_image(figure, dpi).save(filepath, 'WEBP',
+                                       quality=quality,
+                                       lossless=quality >= 100,
+                                       method=6)
+    else:
+        raise ValueError('Unrecognized chart format: {}'.format(fmt))
+
+
+def _energy_zones(energy):
+    '''
+    Zones of energy_zones.csv, the prefixes of their balance terms.
+    '''
+    suffix = '_B4_QBAL'
+    return [c[:-len(suffix)] for c in energy.columns if c.endswith(suffix)]
+
+
+def report_charts(tables):
+    '''
+    Charts of the report of a run as (name, draw) pairs, each draw function
+    makes its chart the current figure: the charts of the dashboard for the
+    whole year, plus the balance, psychrometric chart and temperature map of
+    every zone. The charts of the tables missing from the run (e.g. its
+    weather) are left out.
+    '''
+    names = available_charts(tables)
+    data, weather = tables['cultural-e'], tables.get('meteo')
+
+    charts = [(name, partial(CHARTS[name], tables, dict()))
+              for name in names if name != 'zone_energy_balance']
+    if 'zone_energy_balance' in names:
+        for zone in _energy_zones(tables['energy_zones']):
+            charts.append(('zone_energy_balance_' + zone,
+                           partial(CHARTS['zone_energy_balance'], tables,
+                                   {'zone': zone})))
+    for zone in zone_names(data):
+        if weather is not None:
+            charts.append(('psychrochart_' + zone,
+                           partial(visualize.psychrochart, data, zone,
+                                   weather)))
+        charts.append(('airt_heatmap_' + zone,
+                       partial(visualize.airt_heatmap, data, zone)))
+
+    return charts
+
+
+def draw_chart(draw):
+    '''
+    Draws a chart and returns its figure.
+    '''
+    draw()
+    return plt.gcf()
+
+
+def write_report(tables, filepath, dpi=DEFAULT_DPI, rasterize=True,
+                 title=None):
+    '''
+    Writes all the charts of a run in a multi-page PDF, one chart per page.
+    '''
+    with backend_pdf.PdfPages(filepath, metadata={'Title': title}) as pdf:
+        for _, draw in report_charts(tables):
+            figure = draw_chart(draw)
+            with rasterized_layers(figure, rasterize):
+                pdf.savefig(figure, dpi=dpi)
+
+
+def write_charts(tables, folder, fmt='png', **kwargs):
+    '''
+    Saves every chart of the report of a run in its own file, the arguments
+    are the ones of save_chart.
+    '''
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+
+    for name, draw in report_charts(tables):
+        save_chart(draw_chart(draw), folder / '{}.{}'.format(name, fmt),
+                   **kwargs)
+
+
+@click.command()
+@click.argument('processed_filepath', type=click.Path(exists=True))
+@click.argument('output_filepath', type=click.Path())
+@click.option('--query', default=None, help='Filter on the run parameters.')
+@click.option('--format', 'fmt', default='pdf', show_default=True,
+              type=click.Choice(VECTOR_FORMATS + RASTER_FORMATS),
+              help='A PDF report per run, or a file per chart.')
+@click.option('--dpi', default=DEFAULT_DPI, show_default=True,
+              help='Resolution of the raster files and layers.')
+@click.option('--no-rasterize', is_flag=True,
+              help='Keep the dense layers of the vector files as vectors.')
+@click.option('--colors', default=None, type=int,
+              help='Palette size of the PNG files, full colors by default.')
+@click.option('--quality', default=WEBP_QUALITY, show_default=True,
+              help='Quality of the WebP files, 100 for lossless.')
+def main(processed_filepath, output_filepath, query, fmt, dpi, no_rasterize,
+         colors, quality):
+    """ Draws the charts of the runs processed below PROCESSED_FILEPATH in
+        OUTPUT_FILEPATH, in a folder per run.
+    """
+    logger = logging.getLogger(__name__)
+
+    # charts are rendered off-screen
+    mpl.use('Agg')
+
+    runs = query_runs(build_catalog(processed_filepath), query)
+    for run in runs:
+        folder = Path(output_filepath) / run.id
+        tables = load_run(run)
+
+        if fmt == 'pdf':
+            folder.mkdir(parents=True, exist_ok=True)
+            write_report(tables, folder / 'report.pdf', dpi,
+                         not no_rasterize, run.id)
+        else:
+            write_charts(tables, folder, fmt,
+                         dpi=dpi,
+                         rasterize=not no_rasterize,
+                         colors=colors,
+                         quality=quality)
+
+        logger.info('charts of %s written to %s', run.id, folder)
+
+
+if __name__ == '__main__':
+    log_fmt = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    logging.basicConfig(level=logging.INFO, format=log_fmt)
+
+    main()
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.lazy import LazyModule
+
+plt = LazyModule('matplotlib.pyplot')
+
+# style of the charts, replacing the font and grid settings of every chart
+STYLE_FILE = Path(__file__).parent / 'simviz.mplstyle'
+
+# templates built so far, by chart type
+_templates = dict()
+
+
+def style():
+    '''
+    Context applying the style of the charts, see STYLE_FILE.
+    '''
+    return plt.style.context(str(STYLE_FILE))
+
+
+def hide_spines(ax, *sides):
+    '''
+    Hides the given spines of an axes, all of them if none is given.
+    '''
+    for side in sides or list(ax.spines):
+        ax.spines[side].set_visible(False)
+
+
+def _rescale(ax):
+    '''
+    Fits the limits of an axes to its current data, after artists were
+    removed or updated in place. Relim alone ignores the collections (e.g.
+    scatter plots).
+    '''
+    ax.relim()
+    for collection in ax.collections:
+        ax.update_datalim(collection.get_datalim(ax.transData).get_points())
+    ax.autoscale_view()
+
+
+class ChartTemplate:
+    '''
+    Styled figure of a chart type, built once and reused by every render of
+    the chart. The setup function receives the template and draws what does
+    not depend on the data (axes, labels, spines, static layers); each render
+    only replaces the data artists, or updates them in place when drawn with
+    artist.
+    '''
+
+    def __init__(self, setup=None, nrows=1, ncols=1, **kwargs):
+        # axes cleared at every render, e.g. the ones of colorbars
+        self.scratch = []
+        self._artists = dict()
+        self._used = set()
+
+        # every chart type keeps its figure open, without warnings about the
+        # number of open figures
+        with style(), plt.rc_context({'figure.max_open_warning': 0}):
+            self.figure, self.axes = plt.subplots(nrows, ncols, **kwargs)
+            if setup is not None:
+                setup(self)
+
+        self._static = {
+            artist
+            for ax in self.figure.axes for artist in ax.get_children()
+        }
+
+    def is_open(self):
+        '''
+        Whether the figure is still managed by pyplot, closed figures cannot
+        be reused.
+        '''
+        return plt.fignum_exists(self.figure.number)
+
+    def _clear(self):
+        '''
+        Removes the artists added by the last render, except the ones that can
+        be updated in place, and its legends.
+        '''
+        kept = set()
+        for _, added in self._artists.values():
+            kept.update(added)
+            # containers (e.g. of bars) are tuples of their artists
+            kept.update(a for c in added if isinstance(c, tuple) for a in c)
+
+        for ax in self.figure.axes:
+            if ax in self.scratch:
+                ax.cla()
+                continue
+            if ax.get_legend() is not None:
+                ax.get_legend().remove()
+            for container in list(ax.containers):
+                if container not in kept:
+                    container.remove()
+            for artist in ax.get_children():
+                if artist not in self._static and artist not in kept:
+                    artist.remove()
+
+    @contextmanager
+    def render(self):
+        '''
+        Makes the figure current and clears the data of the last render, the
+        chart is drawn within the block, with the style applied.
+        '''
+        plt.figure(self.figure.number)
+        self._clear()
+        self._used.clear()
+
+        with style():
+            yield self
+
+        self.prune()
+        for ax in self.figure.axes:
+            if ax not in self.scratch:
+                _rescale(ax)
+
+    def prune(self):
+        '''
+        Removes the artists of the last render that were not drawn again.
+        '''
+        for key in set(self._artists) - self._used:
+            for artist in self._artists.pop(key)[1]:
+                artist.remove()
+
+    def legend(self, ax, *args, **kwargs):
+        '''
+        Legend of an axes, drawn once the data artists are, so that it leaves
+        out the ones of the last render.
+        '''
+        self.prune()
+        return ax.legend(*args, **kwargs)
+
+    def artist(self, key, create, update):
+        '''
+        Data artist drawn by create(), or updated in place by update(artist)
+        when the last render drew one with the same key. The key must change
+        with anything update cannot change (e.g. the number of bars). Create
+        returns the artist (or a container of them) and the list of the
+        artists it added to the axes.
+        '''
+        self._used.add(key)
+        if key in self._artists:
+            artist = self._artists[key][0]
+            update(artist)
+            return artist
+
+        artist, added = create()
+        self._artists[key] = (artist, list(added))
+        return artist
+
+
+def chart_template(name, setup=None, **kwargs):
+    '''
+    Template of a chart type, built on first use (or when its figure was
+    closed) with the setup function and the arguments of plt.subplots.
+    '''
+    if name not in _templates or not _templates[name].is_open():
+        _templates[name] = ChartTemplate(setup, **kwargs)
+    return _templates[name]
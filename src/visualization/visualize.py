@@ -1,586 +1,814 @@
 # -*- coding: utf-8 -*-
-from matplotlib import colors
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-from matplotlib.patches import Rectangle
 import numpy as np
-from psychrochart import PsychroChart, load_config
-import seaborn as sns
-
-# styling consants
-TITLE_FONTSIZE = 32
-LABELS_FONTSIZE = 20
-TICKS_FONTSIZE = 15
-LEGEND_FONTSIZE = 15
-# conversion factors
-JOULE_TO_WATT_FACTOR = 3.6
-JOULE_TO_KW_FACTOR = JOULE_TO_WATT_FACTOR * 1000
-HOURS_IN_A_MONTH = 730
+
+from src.data.balance import TOTAL_ZONE
+from src.features import chart_data
+from src.features.climate import climate_histograms, cumulative_frequency
+from src.features.calendar import HOURS_IN_A_MONTH  # noqa: F401
+from src.features.calendar import MONTHS, SEASONS
+from src.features.comfort import running_mean_outdoor_temperature  # noqa
+from src.features.comfort import (ADAPTIVE_CATEGORIES, ADAPTIVE_LOWER_LIMITS,
+                                  ADAPTIVE_RUNNING_MEAN_RANGE,
+                                  ADAPTIVE_UPPER_LIMITS,
+                                  adaptive_comfort_temperature)
+from src.lazy import LazyModule
+from src.visualization.templates import chart_template, hide_spines, style
+
+# plotting libraries are heavy to import, load them on first use only
+mpl = LazyModule('matplotlib')
+colors = LazyModule('matplotlib.colors')
+mcollections = LazyModule('matplotlib.collections')
+patches = LazyModule('matplotlib.patches')
+plt = LazyModule('matplotlib.pyplot')
+psychrochart_lib = LazyModule('psychrochart')
+sns = LazyModule('seaborn')
+ticker = LazyModule('matplotlib.ticker')
+
+# colors of the series, the rest of the style is in simviz.mplstyle
 COLOR_PALETTE = [
     '#e6194b', '#3cb44b', '#ffe119', '#4363d8', '#f58231', '#911eb4',
     '#46f0f0', '#f032e6', '#bcf60c', '#fabebe', '#008080', '#e6beff',
     '#9a6324', '#fffac8', '#800000', '#aaffc3', '#808000', '#ffd8b1',
-    '#000075', '#808080', '#ffffff', '#000000'
+    '#000075', '#808080', '#000000'
 ]
+# axis labels of the weather variables compared across climates
+CLIMATE_LABELS = {
+    'temp_air': 'Dry Bulb Temperature, T_out [°C]',
+    'relative_humidity': 'Relative humidity, RH [%]',
+    'ghi': 'Global horizontal irradiance, G_t [W/m²]',
+    'wind_speed': 'Wind speed [m/s]',
+}
+# resolution of the grid used by the density plots
+DENSITY_BINS = (80, 60)
+
+
+def _window_title(title, window):
+    '''
+    Title of a chart restricted to a time window, see features/windows.py.
+    '''
+    if window is None:
+        return title
+    return '{} - {}'.format(title.strip(), window.label)
 
 
-def air_temperature(weather):
+def _scatter(template, key, ax, x, y, **kwargs):
     '''
-    Prints an histogram of the temperatures in the area during the year, plus their cumulative
-    distribution.
+    Scatter layer of a chart, updated in place when the template drew the
+    same layer in its last render. Without a template it is simply drawn.
     '''
-    fig, ax1 = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
-    ax2 = ax1.twinx()
-
-    # add x, y gridlines
-    ax1.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
-
-    ax2.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
-
-    # temperatures' bins from -20°C to +50°C
-    bins = np.arange(-20, 40)
-    # the histogram of the air temperature
-    n, bins, patches = ax1.hist(weather['temp_air'],
-                                bins,
-                                alpha=0.6,
-                                edgecolor='black')
-
-    # setting the color gradient for temperatures
-    norm = colors.Normalize(bins.min(), bins.max())
-
-    for b, p in zip(bins, patches):
-        color = mpl.cm.inferno(norm(b))
-        p.set_facecolor(color)
-
-    # the cumulative distribution
-    ax2.plot(bins[1:], (np.cumsum(n) / np.sum(n)) * 100,
-             linewidth=3,
-             alpha=0.6)
-
-    # title
-    plt.title("Dry Bulb temperature distribution [C°] ",
-              fontsize=TITLE_FONTSIZE)
-
-    # style axes
-    ax1.tick_params(labelsize=TICKS_FONTSIZE)
-    ax2.tick_params(labelsize=TICKS_FONTSIZE)
-    plt.xticks(np.arange(-20, 41, 2))
-    ax1.set_xlabel("Dry Bulb Temperature, T_out [°C]",
-                   fontsize=LABELS_FONTSIZE)
-    ax1.set_ylabel("Hours [hr]", fontsize=LABELS_FONTSIZE)
-    ax2.set_ylabel("Cumulative frequency [%]", fontsize=LABELS_FONTSIZE)
-
-    # legend
-    handles = [
-        Rectangle((0, 0), 1, 1, color=mpl.cm.inferno(0.5), ec="k"),
-        Rectangle((0, 0), 1, 1, color='blue', alpha=0.6)
-    ]
-    labels = ["Dry bulb temperature", "Cumulative frequency"]
-    plt.legend(handles, labels, fontsize=LEGEND_FONTSIZE)
-
-    fig.tight_layout()
-    plt.show()
+    def create():
+        layer = ax.scatter(x, y, **kwargs)
+        return layer, [layer]
 
+    def update(layer):
+        layer.set_offsets(np.column_stack([x, y]))
+        layer.set_label(kwargs.get('label'))
 
-def relative_humidity(weather):
+    if template is None:
+        return create()[0]
+    return template.artist(key, create, update)
+
+
+def _line(template, key, ax, x, y, **kwargs):
     '''
-    Prints an histogram of the relative humidity in the area during the year, plus its cumulative
-    distribution.
+    Line of a chart, updated in place when the template drew the same line in
+    its last render.
     '''
-    fig, ax1 = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    def create():
+        line, = ax.plot(x, y, **kwargs)
+        return line, [line]
+
+    def update(line):
+        line.set_data(x, y)
+        line.set_label(kwargs.get('label'))
 
-    ax2 = ax1.twinx()
+    return template.artist(key, create, update)
 
-    # add x, y gridlines
-    ax1.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
 
-    ax2.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+def _bars(template, key, ax, positions, sizes, starts=0, horizontal=False,
+          **kwargs):
+    '''
+    Bars of a chart from the given starts, updated in place when the template
+    drew as many bars with the same key in its last render.
+    '''
+    sizes = np.asarray(sizes, dtype=float)
+    starts = np.broadcast_to(starts, sizes.shape)
+
+    def create():
+        if horizontal:
+            bars = ax.barh(positions, sizes, left=starts, **kwargs)
+        else:
+            bars = ax.bar(positions, sizes, bottom=starts, **kwargs)
+        return bars, [bars]
+
+    def update(bars):
+        for rect, size, start in zip(bars, sizes, starts):
+            if horizontal:
+                rect.set_width(size)
+                rect.set_x(start)
+            else:
+                rect.set_height(size)
+                rect.set_y(start)
+        bars.set_label(kwargs.get('label'))
+
+    return template.artist(key + (len(positions), ), create, update)
+
+
+def _stacked_bars(template, ax, labels, values, names, colors=None,
+                  negative=True, horizontal=False):
+    '''
+    One bar per label stacking the columns of values, the negative values
+    below zero (or ignored if negative is False). Only the positive bars are
+    labeled, so that each column has a single legend entry.
+    '''
+    positions = np.arange(len(labels))
+    parts = [np.maximum(values, 0)]
+    if negative:
+        parts.append(np.minimum(values, 0))
+
+    for part, part_values in enumerate(parts):
+        # bars start where the previous ones of the same sign end
+        ends = np.cumsum(part_values, axis=1)
+        starts = ends - part_values if part == 0 else ends
+
+        for n, name in enumerate(names):
+            _bars(template, ('bars', part, n),
+                  ax,
+                  positions,
+                  np.abs(part_values[:, n]),
+                  starts[:, n],
+                  horizontal,
+                  color=None if colors is None else colors[n],
+                  label=name if part == 0 else '_nolegend_')
+
+    if horizontal:
+        ax.set_yticks(positions)
+        ax.set_yticklabels(labels)
+    else:
+        ax.set_xticks(positions)
+        ax.set_xticklabels(labels)
+
+
+def _histogram_chart(name, data, cmap, title, xlabel, label, xticks):
+    '''
+    Prints a distribution computed by chart_data.histogram, plus its
+    cumulative frequency.
+    '''
+    def setup(template):
+        ax1 = template.axes
+        template.twin = ax2 = ax1.twinx()
+
+        # style axes
+        ax1.set_xlabel(xlabel)
+        ax1.set_ylabel("Hours [hr]")
+        ax2.set_ylabel("Cumulative frequency [%]")
+
+    template = chart_template(name, setup)
+    ax1, ax2 = template.axes, template.twin
+
+    # the bins are given by their left edge and have the same width
+    left = data.index.to_numpy(dtype=float)
+    bins = np.append(left, 2 * left[-1] - left[-2])
+
+    def create():
+        _, _, bars = ax1.hist(left,
+                              bins,
+                              weights=data['hours'],
+                              alpha=0.6,
+                              edgecolor='black')
+
+        # setting the color gradient
+        norm = colors.Normalize(bins.min(), bins.max())
+
+        for b, p in zip(bins, bars):
+            color = plt.get_cmap(cmap)(norm(b))
+            p.set_facecolor(color)
+
+        return bars, [bars]
+
+    def update(bars):
+        for p, hours in zip(bars, data['hours']):
+            p.set_height(hours)
+
+    with template.render():
+        template.artist(('hist', tuple(bins)), create, update)
+
+        # the cumulative distribution
+        _line(template, 'cumulative', ax2, bins[1:], data['cumulative'],
+              linewidth=3, alpha=0.6)
+
+        # title
+        ax2.set_title(title)
+        ax1.set_xticks(xticks)
+
+        # legend
+        handles = [
+            patches.Rectangle((0, 0), 1, 1, color=plt.get_cmap(cmap)(0.5),
+                              ec="k"),
+            patches.Rectangle((0, 0), 1, 1, color='blue', alpha=0.6)
+        ]
+        labels = [label, "Cumulative frequency"]
+        template.legend(ax2, handles, labels)
+
+    plt.show()
 
-    # temperatures' bins from -20°C to +50°C
-    bins = np.arange(0, 100, 10)
-    # the histogram of the air temperature
-    n, bins, patches = ax1.hist(weather['relative_humidity'],
-                                bins,
-                                alpha=0.6,
-                                edgecolor='black')
 
-    # setting the color gradient for temperatures
-    norm = colors.Normalize(bins.min(), bins.max())
+def air_temperature(weather, window=None):
+    '''
+    Prints an histogram of the temperatures in the area during the year, plus their cumulative
+    distribution.
+    '''
+    _histogram_chart('air_temperature',
+                     chart_data.air_temperature(weather, window), 'inferno',
+                     _window_title("Dry Bulb temperature distribution [C°] ",
+                                   window),
+                     "Dry Bulb Temperature, T_out [°C]",
+                     "Dry bulb temperature", np.arange(-20, 41, 2))
+
 
-    for b, p in zip(bins, patches):
-        color = mpl.cm.Blues(norm(b))
-        p.set_facecolor(color)
+def relative_humidity(weather, window=None):
+    '''
+    Prints an histogram of the relative humidity in the area during the year, plus its cumulative
+    distribution.
+    '''
+    _histogram_chart('relative_humidity',
+                     chart_data.relative_humidity(weather, window), 'Blues',
+                     _window_title("Relative humidity distribution", window),
+                     "Relative humidity, RH [%]", "Relative humidity",
+                     np.arange(0, 101, 10))
 
-    # the cumulative distribution
-    ax2.plot(bins[1:], (np.cumsum(n) / np.sum(n)) * 100,
-             linewidth=3,
-             alpha=0.6)
 
-    # title
-    plt.title("Relative humidity distribution", fontsize=TITLE_FONTSIZE)
+def horizontal_irradiance(weather, window=None):
+    '''
+    Prints an histogram of the horizontal radiation in the area during the year.
+    '''
+    data = chart_data.horizontal_irradiance(weather, window)
+    _histogram_chart('horizontal_irradiance', data, 'viridis',
+                     _window_title("Global horizontal radiation distribution",
+                                   window),
+                     "Global horizontal irradiance, G_t [W/m²]",
+                     "Global horizontal irradiance",
+                     np.arange(data.index.min(), data.index.max() + 25, 50))
 
-    # style axes
-    ax1.tick_params(labelsize=TICKS_FONTSIZE)
-    ax2.tick_params(labelsize=TICKS_FONTSIZE)
-    plt.xticks(np.arange(0, 101, 10))
-    ax1.set_xlabel("Relative humidity, RH [%]", fontsize=LABELS_FONTSIZE)
-    ax1.set_ylabel("Hours [hr]", fontsize=LABELS_FONTSIZE)
-    ax2.set_ylabel("Cumulative frequency [%]", fontsize=LABELS_FONTSIZE)
 
-    # legend
-    handles = [
-        Rectangle((0, 0), 1, 1, color=mpl.cm.Blues(0.5), ec="k"),
-        Rectangle((0, 0), 1, 1, color='blue', alpha=0.6)
-    ]
-    labels = ["Relative humidity", "Cumulative frequency"]
-    plt.legend(handles, labels, fontsize=LEGEND_FONTSIZE)
+def climate_distributions(weathers, column='temp_air', width=None,
+                          positive_only=False):
+    '''
+    Prints the distributions of a weather variable of many climates (as
+    read by src.features.climate.read_climates) over the same bins, plus
+    their cumulative frequencies.
+    '''
+    def setup(template):
+        template.twin = template.axes.twinx()
+        template.twin.grid(False)
+
+        # style axes
+        template.axes.set_ylabel("Hours [hr]")
+        template.twin.set_ylabel("Cumulative frequency [%]")
+
+    template = chart_template('climate_distributions', setup)
+    ax1, ax2 = template.axes, template.twin
+
+    counts = climate_histograms(weathers, column, width, positive_only)
+    cumulative = cumulative_frequency(counts.to_numpy().T)
+    left = counts.index.to_numpy()
+    right = np.append(left[1:], 2 * left[-1] - left[-2])
+
+    with template.render():
+        # one outline per climate, so that they can be overlaid
+        for n, name in enumerate(counts.columns):
+            color = COLOR_PALETTE[n % len(COLOR_PALETTE)]
+            ax1.hist(left,
+                     np.append(left, right[-1]),
+                     weights=counts[name],
+                     histtype='step',
+                     color=color,
+                     linewidth=2,
+                     label=name)
+            ax2.plot(right, cumulative[n], color=color, linestyle='--',
+                     alpha=0.6)
+
+        # title
+        ax2.set_title("Climates comparison")
+
+        ax1.set_xlabel(CLIMATE_LABELS.get(column, column))
+        template.legend(ax1)
 
-    fig.tight_layout()
     plt.show()
 
 
-def horizontal_irradiance(weather):
+def climate_degree_days(stats):
     '''
-    Prints an histogram of the horizontal radiation in the area during the year.
+    Prints the heating and cooling degree-days of many climates, as computed
+    by src.features.climate.climate_statistics.
     '''
-    fig, ax1 = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
-
-    ax2 = ax1.twinx()
-
-    # add x, y gridlines
-    ax1.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
-
-    ax2.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
-
-    # temperatures' bins from -20°C to +50°C
-    bins = np.arange(weather['ghi'].min(), weather['ghi'].max(), 25)
-    # the histogram of the air temperature
-    n, bins, patches = ax1.hist([i for i in weather['ghi'] if i > 0],
-                                bins,
-                                alpha=0.6,
-                                edgecolor='black')
-
-    # setting the color gradient for temperatures
-    norm = colors.Normalize(bins.min(), bins.max())
-
-    for b, p in zip(bins, patches):
-        color = mpl.cm.viridis(norm(b))
-        p.set_facecolor(color)
-
-    # the cumulative distribution
-    ax2.plot(bins[1:], (np.cumsum(n) / np.sum(n)) * 100,
-             linewidth=3,
-             alpha=0.6)
-
-    # title
-    plt.title("Global horizontal radiation distribution",
-              fontsize=TITLE_FONTSIZE)
-
-    # style axes
-    ax1.tick_params(labelsize=TICKS_FONTSIZE)
-    ax2.tick_params(labelsize=TICKS_FONTSIZE)
-    plt.xticks(np.arange(weather['ghi'].min(), weather['ghi'].max(), 50))
-    ax1.set_xlabel("Global horizontal irradiance, G_t [W/m²]",
-                   fontsize=LABELS_FONTSIZE)
-    ax1.set_ylabel("Hours [hr]", fontsize=LABELS_FONTSIZE)
-    ax2.set_ylabel("Cumulative frequency [%]", fontsize=LABELS_FONTSIZE)
-
-    # legend
-    handles = [
-        Rectangle((0, 0), 1, 1, color=mpl.cm.viridis(0.5), ec="k"),
-        Rectangle((0, 0), 1, 1, color='blue', alpha=0.6)
-    ]
-    labels = ["Global horizontal irradiance", "Cumulative frequency"]
-    plt.legend(handles, labels, fontsize=LEGEND_FONTSIZE)
-
-    fig.tight_layout()
+    def setup(template):
+        axs = template.axes
+
+        # remove spines
+        hide_spines(axs, 'right', 'top')
+
+        axs.set_title('Degree-days')
+        axs.set_ylabel('Degree-days [K·d]')
+
+    template = chart_template('climate_degree_days', setup)
+    axs = template.axes
+
+    # the width of our bars
+    bar_width = 0.4
+    x = np.arange(len(stats))
+
+    with template.render():
+        axs.bar(x - bar_width / 2,
+                stats['heating_degree_days'],
+                width=bar_width,
+                color=COLOR_PALETTE[3],
+                label='Heating')
+        axs.bar(x + bar_width / 2,
+                stats['cooling_degree_days'],
+                width=bar_width,
+                color=COLOR_PALETTE[0],
+                label='Cooling')
+
+        # style graph
+        axs.set_xticks(x)
+        axs.set_xticklabels(stats.index, rotation=45, ha='right')
+        template.legend(axs)
+
     plt.show()
 
 
-def heating_loads(cultural_e):
+def _load_duration_chart(name, data, title):
     '''
-    Prints the cumulative ideal loads of the heating system.
+    Prints a load duration curve computed by chart_data.load_duration.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    def setup(template):
+        template.axes.set_xlabel("Time [hr]")
+        template.axes.set_ylabel("Power [kW]")
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+    template = chart_template(name, setup)
+    axs = template.axes
 
-    power = cultural_e['SQHEAT_1'].to_numpy()
+    y = data.iloc[:, 0].to_numpy()
 
-    # convert from Joule to Watt
-    power = power / JOULE_TO_WATT_FACTOR
+    with template.render():
+        _line(template, 'load', axs, data.index, y, label="Supply Air Total")
 
-    # sort by decreasing load
-    y = -np.sort(-power)
+        # annotate max load
+        label = "{:.2f}".format(y[0])
+        axs.annotate(
+            label,  # this is the text
+            (0, y[0]),  # this is the point to label
+            textcoords="offset points",  # how to position the text
+            xytext=(0, 10),  # distance from text to points (x,y)
+            ha='center',  # horizontal alignment can be left, right or center
+            fontsize=mpl.rcParams['legend.fontsize'])
 
-    plt.plot(range(0, len(y)), y, label="Supply Air Total")
+        # title
+        axs.set_title(title)
 
-    # annotate max load
-    label = "{:.2f}".format(y[0])
-    plt.annotate(
-        label,  # this is the text
-        (0, y[0]),  # this is the point to label
-        textcoords="offset points",  # how to position the text
-        xytext=(0, 10),  # distance from text to points (x,y)
-        ha='center',  # horizontal alignment can be left, right or center
-        fontsize=LEGEND_FONTSIZE)
+        # hours of the year are ticked every 500
+        if len(y) > 1000:
+            axs.set_xticks(np.arange(0, 9500, 500))
+        else:
+            axs.xaxis.set_major_locator(ticker.AutoLocator())
 
-    # title
-    plt.title("Cumulative Ideal Loads Heating Rate", fontsize=TITLE_FONTSIZE)
+        template.legend(axs)
 
-    # style axes
-    plt.xticks(np.arange(0, 9500, 500))
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.set_xlabel("Time [hr]", fontsize=LABELS_FONTSIZE)
-    axs.set_ylabel("Power [kW]", fontsize=LABELS_FONTSIZE)
+    plt.show()
 
-    plt.legend(fontsize=LEGEND_FONTSIZE)
 
-    plt.show()
+def heating_loads(cultural_e, window=None):
+    '''
+    Prints the cumulative ideal loads of the heating system.
+    '''
+    _load_duration_chart(
+        'heating_loads', chart_data.heating_loads(cultural_e, window),
+        _window_title("Cumulative Ideal Loads Heating Rate", window))
 
 
-def cooling_loads(cultural_e):
+def cooling_loads(cultural_e, window=None):
     '''
     Prints the cumulative ideal loads of the cooling system.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    _load_duration_chart(
+        'cooling_loads', chart_data.cooling_loads(cultural_e, window),
+        _window_title("Cumulative Ideal Loads Cooling Rate", window))
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
 
-    power = cultural_e['SQCOOL_1'].to_numpy()
-    # convert from Joule to Watt
-    power = power / JOULE_TO_WATT_FACTOR
+def _setup_bars(ylabel, xlabel=None):
+    '''
+    Setup of the stacked bar charts, without spines.
+    '''
+    def setup(template):
+        hide_spines(template.axes)
+        template.axes.set_ylabel(ylabel)
+        if xlabel is not None:
+            template.axes.set_xlabel(xlabel)
 
-    # sort by decreasing load
-    y = -np.sort(-power)
+    return setup
 
-    plt.plot(range(0, len(y)), y, label="Supply Air Total")
 
-    # annotate max load
-    label = "{:.2f}".format(y[0])
-    plt.annotate(
-        label,  # this is the text
-        (0, y[0]),  # this is the point to label
-        textcoords="offset points",  # how to position the text
-        xytext=(0, 10),  # distance from text to points (x,y)
-        ha='center',  # horizontal alignment can be left, right or center
-        fontsize=LEGEND_FONTSIZE)
+def energy_balance(balance, total=None, units=None):
+    '''
+    Prints the energy balance of the whole simulation. If the balance of the
+    whole building (summary-total.csv) is given, it is shown as a last bar.
+    The units of the columns default to kJ, as written in SUMMARY.BAL.
+    '''
+    template = chart_template('energy_balance',
+                              _setup_bars('Energy Demand [kWh]', "Zone"))
+    axs = template.axes
+
+    data = chart_data.energy_balance(balance, total, units)
 
-    # title
-    plt.title("Cumulative Ideal Loads Cooling Rate", fontsize=TITLE_FONTSIZE)
+    # x axis contains the different zones simulated
+    x = ['Total' if zone == TOTAL_ZONE else str(zone) for zone in data.index]
 
-    # style axes
-    plt.xticks(np.arange(0, 9500, 500))
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.set_xlabel("Time [hr]", fontsize=LABELS_FONTSIZE)
-    axs.set_ylabel("Power [kW]", fontsize=LABELS_FONTSIZE)
+    with template.render():
+        # positive contributions above zero, negative ones below, with the
+        # same colors and a single legend entry
+        _stacked_bars(template, axs, x, data.to_numpy(), data.columns,
+                      COLOR_PALETTE)
 
-    plt.legend(fontsize=LEGEND_FONTSIZE)
+        # style graph
+        axs.set_title('Zone\'s Energy Balance')
+        template.legend(axs)
 
     plt.show()
 
 
-def energy_balance(balance):
+def zone_energy_balance(energy, zone='', window=None):
     '''
-    Prints the energy balance of the whole simulation.
+    Print the energy balance of a single zone simulated, over the months of
+    the window if given.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    template = chart_template('zone_energy_balance',
+                              _setup_bars('Energy Demand [kWh]'))
+    axs = template.axes
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+    # monthly sums of the hourly powers
+    data = chart_data.zone_energy_balance(energy, zone, window)
 
-    # fields accounting for the energy balance
-    fields = [
-        'QHEAT', 'QCOOL', 'QINF', 'QVENT', 'QCOUPL', 'QTRANS', 'QGAININT',
-        'QWGAIN', 'QSOLGAIN', 'QSOLAIR'
-    ]
+    # the months of the year
+    x = [MONTHS[month] for month in data.index]
 
-    # x axis contains the different zones simulated
-    x = balance['Zonenr'].to_list()
-
-    # first plot the positive contributions
-    bottom = len(balance['Zonenr']) * [0]
-    for n, name in enumerate(fields):
-        plt.bar(x, [max(0, i) / JOULE_TO_KW_FACTOR for i in balance[name]],
-                bottom=bottom,
-                label=name,
-                color=COLOR_PALETTE[n])
-        bottom = [
-            max(0, i) / JOULE_TO_KW_FACTOR + j
-            for i, j in zip(balance[name], bottom)
-        ]
+    with template.render():
+        _stacked_bars(template, axs, x, data.to_numpy(), data.columns,
+                      COLOR_PALETTE)
 
-    # now plot the negative contributions
-    bottom = len(balance['Zonenr']) * [0]
-    for n, name in enumerate(fields):
-        bottom = [
-            min(0, i) / JOULE_TO_KW_FACTOR + j
-            for i, j in zip(balance[name], bottom)
-        ]
-        plt.bar(x, [-min(0, i) / JOULE_TO_KW_FACTOR for i in balance[name]],
-                bottom=bottom,
-                label=name,
-                color=COLOR_PALETTE[n])
+        # style the graph
+        axs.set_title(
+            _window_title('Monthly Energy Balance Zone: {}'.format(zone),
+                          window))
+        template.legend(axs)
 
-    # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['left'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
+    plt.show()
 
-    # style graph
-    axs.set_title('Zone\'s Energy Balance', fontsize=TITLE_FONTSIZE)
-    axs.set_ylabel('Energy Demand [kWh]', fontsize=LABELS_FONTSIZE)
-    axs.set_xlabel("Zone", fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.legend(labels=fields, fontsize=LEGEND_FONTSIZE)
 
-    plt.show()
+def monthly_consumption(energy, window=None):
+    '''
+    Prints the consumpion in various categories, over the months of the
+    window if given.
+    '''
+    template = chart_template('monthly_consumption',
+                              _setup_bars('Energy Demand [kWh]'))
+    axs = template.axes
+
+    # aggregate monthly consumptions
+    data = chart_data.monthly_consumption(energy, window)
+
+    # months of the year
+    x = [MONTHS[month] for month in data.index]
+
+    with template.render():
+        # all the contributions should be positive, we currently ignore
+        # negative values
+        _stacked_bars(template, axs, x, data.to_numpy(), data.columns,
+                      negative=False)
 
+        # style graph
+        axs.set_title(_window_title('Monthly Energy Consumption', window))
+        template.legend(axs)
 
-import random
+    plt.show()
 
 
-def zone_energy_balance(energy, zone=''):
+def portfolio_balance(balance):
     '''
-    Print the energy balance of a single zone simulated.
+    Prints the yearly energy balance of each building of a portfolio, as
+    computed by portfolio.portfolio_balance.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    template = chart_template('portfolio_balance',
+                              _setup_bars('Energy Demand [kWh]', 'Building'))
+    axs = template.axes
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+    with template.render():
+        _stacked_bars(template, axs, balance.index, balance.to_numpy(),
+                      balance.columns, COLOR_PALETTE)
+        # dozens of buildings do not fit horizontally
+        plt.setp(axs.get_xticklabels(), rotation=45, ha='right')
 
-    labels = [
-        'January', 'February', 'March', 'April', 'May', 'June', 'July',
-        'August', 'September', 'October', 'November', 'December'
-    ]
+        axs.set_title('Portfolio\'s Energy Balance')
+        template.legend(axs)
 
-    # map hours to their month
-    def month_from_hr(hour):
-        return min(int(hour) // HOURS_IN_A_MONTH, len(labels) - 1)
+    plt.show()
 
-    energy['MONTH'] = energy['TIME'].apply(month_from_hr)
 
-    data = energy.groupby('MONTH').sum()
+def portfolio_monthly(monthly):
+    '''
+    Prints the monthly consumptions summed over the buildings of a portfolio,
+    as computed by portfolio.portfolio_monthly.
+    '''
+    template = chart_template('portfolio_monthly',
+                              _setup_bars('Energy Demand [kWh]'))
+    axs = template.axes
 
-    props = [
-        '_B4_QBAL', '_B4_DQAIRdT', '_B4_QHEAT', '_B4_QCOOL', '_B4_QINF',
-        '_B4_QVENT', 'B4_QCOUP', '_B4_QTRANS', '_B4_QGINT', '_B4_QWGAIN',
-        '_B4_QSOL', '_B4_QSOLAIR'
-    ]
+    x = [MONTHS[month] for month in monthly.index]
 
-    # fields accounting for the energy balance
-    fields = [zone + prop for prop in props]
+    with template.render():
+        _stacked_bars(template, axs, x, monthly.to_numpy(), monthly.columns,
+                      COLOR_PALETTE, negative=False)
 
-    # the months of the year
-    x = labels
-
-    # first plot the positive contributions
-    bottom = len(labels) * [0]
-    for n, name in enumerate(fields):
-        plt.bar(x, [max(0, i) / JOULE_TO_KW_FACTOR for i in data[name]],
-                bottom=bottom,
-                label=name,
-                color=COLOR_PALETTE[n])
-        bottom = [
-            max(0, i) / JOULE_TO_KW_FACTOR + j
-            for i, j in zip(data[name], bottom)
-        ]
+        axs.set_title('Monthly Portfolio Consumption')
+        template.legend(axs)
 
-    # now plot the negative contributions
-    bottom = len(labels) * [0]
-    for n, name in enumerate(fields):
-        bottom = [
-            min(0, i) / JOULE_TO_KW_FACTOR + j
-            for i, j in zip(data[name], bottom)
-        ]
-        plt.bar(x, [-min(0, i) / JOULE_TO_KW_FACTOR for i in data[name]],
-                bottom=bottom,
-                label=name,
-                color=COLOR_PALETTE[n])
+    plt.show()
 
-    # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['left'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
-
-    # style the graph
-    axs.set_title('Monthly Energy Balance Zone: {}'.format(zone),
-                  fontsize=TITLE_FONTSIZE)
-    axs.set_ylabel('Energy Demand [kWh]', fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.legend(labels=fields, fontsize=LEGEND_FONTSIZE)
+
+def portfolio_duration(curves, title='Portfolio Load Duration'):
+    '''
+    Prints the load duration curves of a portfolio computed by
+    portfolio.portfolio_duration: the curve of the whole portfolio, over the
+    thin curves of the buildings.
+    '''
+    def setup(template):
+        template.axes.set_xlabel("Time [hr]")
+        template.axes.set_ylabel("Power [kW]")
+
+    template = chart_template('portfolio_duration', setup)
+    axs = template.axes
+
+    with template.render():
+        for n, building in enumerate(curves.columns[1:]):
+            _line(template, ('building', n), axs, curves.index,
+                  curves[building].to_numpy(),
+                  color='grey',
+                  linewidth=0.5,
+                  label='Buildings' if n == 0 else '_nolegend_')
+        _line(template, 'portfolio', axs, curves.index,
+              curves.iloc[:, 0].to_numpy(),
+              color=COLOR_PALETTE[0],
+              linewidth=2,
+              label=curves.columns[0])
+
+        axs.set_title(title)
+        template.legend(axs)
 
     plt.show()
 
 
-def monthly_consumption(energy):
+def self_production_consumption(energy):
     '''
-    Prints the consumpion in various categories.
+    Prints the self-consumpion/self-production.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    # the width of our bars
+    bar_width = 0.3
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+    months = MONTHS
+    f_xpos = np.arange(len(months))
+    s_xpos = f_xpos + bar_width
+
+    def setup(template):
+        axs = template.axes
+
+        # we want to use months as our x-axis ticks, instead of numbers,
+        # and we want it centered between the two bars.
+        axs.set_xticks(f_xpos + bar_width)
+        axs.set_xticklabels(months)
+
+        hide_spines(axs)
+        axs.set_title('Self-Sufficiency/Self-Consumption')
+        axs.set_ylabel('Percentage [%]')
+
+    template = chart_template('self_production_consumption', setup)
+    axs = template.axes
+
+    # aggregate monthly flows, months without production have no ratio
+    data = chart_data.self_production_consumption(energy)
+
+    with template.render():
+        _bars(template, ('sufficiency', ),
+              axs,
+              f_xpos,
+              data['self_sufficiency_ratio'],
+              label='Self-Sufficiency',
+              width=bar_width)
+        _bars(template, ('consumption', ),
+              axs,
+              s_xpos,
+              data['self_consumption_ratio'],
+              label='Self-Consumption',
+              width=bar_width)
+        template.legend(axs)
 
-    labels = [
-        'January', 'February', 'March', 'April', 'May', 'June', 'July',
-        'August', 'September', 'October', 'November', 'December'
-    ]
+    plt.show()
 
-    # map hours to their month
-    def month_from_hr(hour):
-        return min(int(hour) // HOURS_IN_A_MONTH, len(labels) - 1)
 
-    energy['MONTH'] = energy['TIME'].apply(month_from_hr)
+def battery_sizing(sweep):
+    '''
+    Prints the self-sufficiency and self-consumption reached with each
+    battery capacity of a sweep, one line per PV size.
+    '''
+    ratios = ['self_sufficiency_ratio', 'self_consumption_ratio']
+    titles = ['Self-Sufficiency', 'Self-Consumption']
 
-    # aggregate monthly consumptions
-    data = energy.groupby('MONTH').sum()
+    def setup(template):
+        for ax, title in zip(template.axes, titles):
+            # remove spines
+            hide_spines(ax, 'right', 'top')
 
-    # fields accounting for the consumtions
-    fields = ['QHEAT_TOT', 'QCOOL_TOT', 'QVMC_TOT', 'QAPL_TOT', 'QLGT_TOT']
+            ax.set_title(title)
+            ax.set_xlabel('Battery Capacity [kWh]')
+            ax.set_ylabel('Percentage [%]')
 
-    # months of the year
-    x = labels
-
-    # al the contributions should be positive, we currently ignore negative values
-    bottom = len(labels) * [0]
-    for _idx, name in enumerate(fields):
-        plt.bar(x, [max(0, i) / JOULE_TO_KW_FACTOR for i in data[name]],
-                bottom=bottom,
-                label=name)
-        bottom = [
-            max(0, i) / JOULE_TO_KW_FACTOR + j
-            for i, j in zip(data[name], bottom)
-        ]
+    template = chart_template('battery_sizing', setup, ncols=2)
 
-    # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['left'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
+    level = sweep.index.names[0]
 
-    # style graph
-    axs.set_title('Monthly Energy Consumption', fontsize=TITLE_FONTSIZE)
-    axs.set_ylabel('Energy Demand [kWh]', fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.legend(fontsize=LEGEND_FONTSIZE)
+    with template.render():
+        for ax, ratio in zip(template.axes, ratios):
+            for n, (size, group) in enumerate(sweep.groupby(level=0)):
+                ax.plot(group.index.get_level_values('capacity'),
+                        group[ratio],
+                        marker='o',
+                        color=COLOR_PALETTE[n % len(COLOR_PALETTE)],
+                        label='{} {:g}'.format(level, size))
+            template.legend(ax)
 
     plt.show()
 
 
-def self_production_consumption(energy):
+def overheating_ranking(summary,
+                        metric='degree_hours_above_26',
+                        top=30):
     '''
-    Prints the self-consumpion/self-production.
+    Prints the zones of an overheating summary (of one run or of many, as
+    computed by src.features.overheating) ranked by a metric, the zones
+    failing TM52 highlighted.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    def setup(template):
+        # remove spines
+        hide_spines(template.axes, 'right', 'top')
+        template.axes.set_title('Overheating')
+
+    template = chart_template('overheating_ranking', setup)
+    axs = template.axes
+
+    values = chart_data.overheating_ranking(summary, metric, top)
+    positions = np.arange(len(values))
+
+    with template.render():
+        axs.barh(positions,
+                 values[metric],
+                 color=np.where(values['tm52_fail'], COLOR_PALETTE[0],
+                                COLOR_PALETTE[3]))
+
+        # style graph
+        axs.set_yticks(positions)
+        axs.set_yticklabels(values.index)
+        axs.set_xlabel(metric.replace('_', ' ').capitalize())
+        handles = [
+            patches.Patch(color=COLOR_PALETTE[0], label='Fails TM52'),
+            patches.Patch(color=COLOR_PALETTE[3], label='Passes TM52'),
+        ]
+        template.legend(axs, handles=handles)
+
+    plt.show()
 
-    # the width of our bars
-    bar_width = 0.3
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+def _density_layer(axs, x, y, extent, cmap, label):
+    '''
+    Draws the number of hours falling in each cell of a fixed grid as a single
+    image, so that drawing time and file size do not depend on the number of
+    hours plotted.
+    '''
+    (x_min, x_max), (y_min, y_max) = extent
+    counts, _, _ = np.histogram2d(x, y, bins=DENSITY_BINS, range=extent)
 
-    months = [
-        'January', 'February', 'March', 'April', 'May', 'June', 'July',
-        'August', 'September', 'October', 'November', 'December'
-    ]
+    image = axs.imshow(np.ma.masked_equal(counts.T, 0),
+                       origin='lower',
+                       extent=(x_min, x_max, y_min, y_max),
+                       aspect='auto',
+                       interpolation='nearest',
+                       cmap=cmap,
+                       alpha=0.8,
+                       zorder=3)
 
-    # map hours to their month
-    def month_from_hr(hour):
-        return min(int(hour) // HOURS_IN_A_MONTH, len(months) - 1)
+    # images do not show up in legends, add a placeholder
+    axs.scatter([], [],
+                marker='s',
+                color=plt.get_cmap(cmap)(0.7),
+                label=label)
 
-    energy['MONTH'] = energy['TIME'].apply(month_from_hr)
+    return image
 
-    # aggregate monthly consumptions
-    data = energy.groupby('MONTH').sum()
-
-    f_xpos = [i for i, _ in enumerate(months)]
-    s_xpos = [val + bar_width for val in f_xpos]
-
-    # we want to use months as our x-axis ticks, instead of numbers,
-    # and we want it centered between the two bars.
-    tick_pos = [val + bar_width for val in f_xpos]
-    plt.xticks(tick_pos, months)
-
-    #
-    plt.bar(f_xpos,
-            [100 * i / j for i, j in zip(data['PV_selfC'], data['QEL_TOT'])],
-            label='Self-Sufficiency',
-            width=bar_width)
-    plt.bar(s_xpos,
-            [100 * i / j for i, j in zip(data['PV_selfC'], data['PV_p'])],
-            label='Self-Consumption',
-            width=bar_width)
+
+def _setup_adaptive_comfort(template):
+    '''
+    Draws the EN 16798-1 adaptive comfort categories, the same for every
+    run.
+    '''
+    axs = template.axes
+
+    # category bands, from the widest to the narrowest
+    x = np.linspace(*ADAPTIVE_RUNNING_MEAN_RANGE, 50)
+    t_comf = adaptive_comfort_temperature(x)
+    bands = zip(ADAPTIVE_CATEGORIES[::-1], ADAPTIVE_LOWER_LIMITS[::-1],
+                ADAPTIVE_UPPER_LIMITS[::-1], ['#FAC748', '#8390FA', '#6EAF46'])
+    for name, lower, upper, color in bands:
+        axs.fill_between(x,
+                         t_comf + lower,
+                         t_comf + upper,
+                         color=color,
+                         alpha=0.4,
+                         label='Category ' + name)
+    axs.plot(x, t_comf, color='black', linewidth=2, label='Comfort')
 
     # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['left'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
+    hide_spines(axs, 'right', 'top')
 
     # style graph
-    axs.set_title('Self-Sufficiency/Self-Consumption', fontsize=TITLE_FONTSIZE)
-    axs.set_ylabel('Percentage [%]', fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    axs.legend(fontsize=LEGEND_FONTSIZE)
+    axs.set_xlabel('Running mean outdoor temperature, T_rm [°C]')
+    axs.set_ylabel('Operative temperature, T_op [°C]')
 
-    plt.show()
 
+def adaptive_thermal_comfort(data,
+                             weather,
+                             zones=None,
+                             alpha=0.8,
+                             mode='scatter',
+                             season=None,
+                             window=None):
+    '''
+    Prints the operative temperature of the occupied hours of each zone
+    against the running mean outdoor temperature, over the EN 16798-1
+    adaptive comfort categories. With mode='density' the hours of all the
+    zones are binned in a single image layer.
+    '''
+    if mode not in ('scatter', 'density'):
+        raise ValueError('Unrecognized plot mode: {}'.format(mode))
+
+    template = chart_template('adaptive_thermal_comfort',
+                              _setup_adaptive_comfort)
+    axs = template.axes
+
+    # occupied hours of the selected season
+    points = chart_data.adaptive_thermal_comfort(data, weather, zones, alpha,
+                                                 season, window)
+    t_rm = points.index.to_numpy()
+    t_op = points.to_numpy()
+    occupied = ~np.isnan(t_op)
+
+    with template.render():
+        if mode == 'density':
+            x = ADAPTIVE_RUNNING_MEAN_RANGE
+            t_rm = np.broadcast_to(t_rm[:, np.newaxis], t_op.shape)
+            if occupied.any():
+                extent = ((min(t_rm.min(), x[0]) - 1,
+                           max(t_rm.max(), x[-1]) + 1),
+                          (np.nanmin(t_op) - 1, np.nanmax(t_op) + 1))
+            else:
+                # no occupied hour in the window, an empty layer over the
+                # comfort categories
+                extent = (axs.get_xlim(), axs.get_ylim())
+            _density_layer(axs, t_rm[occupied], t_op[occupied], extent,
+                           'viridis', 'Occupied hours')
+        else:
+            # one scatter layer per zone with all its occupied hours
+            for n, zone in enumerate(points.columns):
+                mask = occupied[:, n]
+                _scatter(template, ('zone', n),
+                         axs,
+                         t_rm[mask],
+                         t_op[mask, n],
+                         s=4,
+                         alpha=0.3,
+                         color=COLOR_PALETTE[n % len(COLOR_PALETTE)],
+                         label=zone,
+                         rasterized=True)
+
+        axs.set_title(_window_title('Adaptive Thermal Comfort', window))
+        template.legend(axs, markerscale=4)
 
-def running_mean_outdoor_temperature(temp_array, alpha=0.8):
-    """ Estimates the running mean temperature
-
-    Parameters
-    ----------
-    temp_array: list
-        array containing the mean daily temperature in descending order (i.e. from
-        newest/yesterday to oldest) :math:`[\Theta_{day-1}, \Theta_{day-2}, \dots ,
-        \Theta_{day-n}]`.
-        Where :math:`\Theta_{day-1}` is yesterday's daily mean temperature. The EN
-        16798-1 2019 [3]_ states that n should be equal to 7
-    alpha : float
-        constant between 0 and 1. The EN 16798-1 2019 [3]_ recommends a value of 0.8,
-        while the ASHRAE 55 2017 recommends to choose values between 0.9 and 0.6,
-        corresponding to a slow- and fast- response running mean, respectively.
-        Adaptive comfort theory suggests that a slow-response running mean (alpha =
-        0.9) could be more appropriate for climates in which synoptic-scale (day-to-
-        day) temperature dynamics are relatively minor, such as the humid tropics.
-    units: str default="SI"
-        select the SI (International System of Units) or the IP (Imperial Units) system.
-
-    Returns
-    -------
-    t_rm  : float
-        running mean outdoor temperature
-    """
-    coeff = [alpha**ix for ix, x in enumerate(temp_array)]
-    t_rm = sum([a * b for a, b in zip(coeff, temp_array)]) / sum(coeff)
-
-    return round(t_rm, 1)
-
-
-def adaptive_thermal_comfort():
-    x = np.linspace(18, 30, 12)
-    print(x)
-
-    for c, l in [(-3, 'Cat III'), (-4, 'Cat II'), (-5, 'Cat I'), (2, 'Cat I'),
-                 (3, 'Cat II'), (4, 'Cat III')]:
-        y = 0.33 * x + 18.8 + c
-        plt.plot(x, y, label=l)
-
-    plt.legend()
     plt.show()
 
 
-def psychrochart(data, zone, weather):
+def _psychrochart_background(ax):
     '''
-    Prints the standard Ashrae psychrometric chart with data from a zone.
+    Draws the standard Ashrae psychrometric chart with the comfort zones on
+    the given axes, returns the chart.
     '''
-    chart = PsychroChart('ashrae')
+    chart = psychrochart_lib.PsychroChart('ashrae')
 
     # comfort zones
     zones_conf = {
@@ -645,269 +873,322 @@ def psychrochart(data, zone, weather):
     chart.append_zones(zones_conf)
 
     # plot the chart together with the comfort zones
-    ax = chart.plot()
-
-    # add labelled points from the simulated zone
-    points = dict()
-    for index, row in data[['TAIR_' + zone, 'RELHUM_' + zone]].iterrows():
-        key = 'interior_{}'.format(index)
-        points.update({
-            key: {
-                'style': {
-                    'color': [0.592, 0.745, 0.051, 1.0],
-                    'marker': 'o',
-                    'markersize': 8
-                },
-                'xy': (row['TAIR_' + zone], row['RELHUM_' + zone])
-            }
-        })
-
-    chart.plot_points_dbt_rh(points)
-
-    # add labelled points from outdoor conditions
-    points = dict()
-    for index, row in weather[['temp_air', 'relative_humidity']].iterrows():
-        key = 'interior_{}'.format(index)
-        points.update({
-            key: {
-                'style': {
-                    'color': [0.992, 0.145, 0.051, 1.0],
-                    'marker': 'x',
-                    'markersize': 8
-                },
-                'xy': (row['temp_air'], row['relative_humidity'])
-            }
-        })
-
-    chart.plot_points_dbt_rh(points)
-
-    # Add a legend
+    chart.plot(ax)
+
+    return chart
+
+
+def _psychrochart_points(template, ax, chart, data, zone, weather, mode,
+                         occupied_only, season, window):
+    '''
+    Draws the hours of a zone and of the outdoor air over a psychrometric
+    chart drawn by _psychrochart_background.
+    '''
+    # select the hours to show, the humidity ratio is precomputed by
+    # make_dataset
+    points = chart_data.psychrochart(data, weather, [zone], occupied_only,
+                                     season, chart.pressure, window)
+    zone_points = points[zone].dropna()
+    outdoor_points = points['outdoor'].dropna()
+
+    zone_x, zone_y = zone_points.index, zone_points.to_numpy()
+    outdoor_x, outdoor_y = outdoor_points.index, outdoor_points.to_numpy()
+
+    if mode == 'density':
+        extent = (ax.get_xlim(), ax.get_ylim())
+        _density_layer(ax, outdoor_x, outdoor_y, extent, 'Reds', 'Outdoor')
+        _density_layer(ax, zone_x, zone_y, extent, 'Greens',
+                       'Zone {}'.format(zone))
+    else:
+        # a single scatter layer for each set of points
+        _scatter(template, ('zone', id(ax)),
+                 ax,
+                 zone_x,
+                 zone_y,
+                 s=64,
+                 marker='o',
+                 color=[0.592, 0.745, 0.051, 1.0],
+                 label='Zone {}'.format(zone))
+
+        _scatter(template, ('outdoor', id(ax)),
+                 ax,
+                 outdoor_x,
+                 outdoor_y,
+                 s=64,
+                 marker='x',
+                 color=[0.992, 0.145, 0.051, 1.0],
+                 label='Outdoor')
+
+    # Add a legend, without the points of the last render
+    if template is not None:
+        template.prune()
     chart.plot_legend(markerscale=.7,
                       frameon=False,
-                      fontsize=LEGEND_FONTSIZE,
+                      fontsize=mpl.rcParams['legend.fontsize'],
                       labelspacing=1.2)
 
-    return ax
-
 
-def iaq_co2(data, living_rooms, bedrooms):
+def psychrochart(data,
+                 zone,
+                 weather,
+                 mode='scatter',
+                 occupied_only=False,
+                 season=None,
+                 ax=None,
+                 window=None):
     '''
-    Prints the indoor CO2 concentration belonging to four different classes of comfort.
+    Prints the standard Ashrae psychrometric chart with data from a zone.
+    With mode='density' the zone and the outdoor conditions are drawn as two
+    images counting the hours in each cell of a fixed grid. The chart itself
+    is drawn once and reused, unless the axes to draw on are given.
     '''
-    # average outdoor value for CO2
-    OUTDOOR_CO2 = 400
+    if mode not in ('scatter', 'density'):
+        raise ValueError('Unrecognized plot mode: {}'.format(mode))
 
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    if ax is not None:
+        with style():
+            chart = _psychrochart_background(ax)
+            _psychrochart_points(None, ax, chart, data, zone, weather, mode,
+                                 occupied_only, season, window)
+        return ax
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
+    def setup(template):
+        template.chart = _psychrochart_background(template.axes)
 
-    # palette
-    colors = ['#1D2F6F', '#8390FA', '#6EAF46', '#FAC748']
+    template = chart_template('psychrochart', setup)
+    with template.render():
+        _psychrochart_points(template, template.axes, template.chart, data,
+                             zone, weather, mode, occupied_only, season,
+                             window)
 
-    # zones used during day have different categories with respect to nightly zones
-    # start with day zones
-    for zone in living_rooms:
-        co2 = 'CO2_' + zone
-        occupancy = 'OCC_' + zone
-
-        co_2 = [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 550, occupancy))[co2].size
-        ]
-        co_2 = co_2 + [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 800, occupancy))[co2].size - sum(co_2)
-        ]
-        co_2 = co_2 + [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 1350, occupancy))[co2].size - sum(co_2)
-        ]
-        co_2 = co_2 + [
-            data.query('({} > {}) and ({} > 0)'.format(co2, OUTDOOR_CO2 + 1350,
-                                                       occupancy))[co2].size
-        ]
+    return template.axes
 
-        co_2 = [float(i) * 100 / sum(co_2) for i in co_2]
 
-        plt.barh(co2, co_2[0], left=[0], color=colors[0])
-        plt.barh(co2, co_2[1], left=co_2[0], color=colors[1])
-        plt.barh(co2, co_2[2], left=sum(co_2[0:2]), color=colors[2])
-        plt.barh(co2, co_2[3], left=sum(co_2[0:3]), color=colors[3])
+def psychrochart_seasons(data, zone, weather, mode='scatter',
+                         occupied_only=False, window=None):
+    '''
+    Prints one psychrometric chart for each season with data from a zone, the
+    other arguments are the same of psychrochart.
+    '''
+    if mode not in ('scatter', 'density'):
+        raise ValueError('Unrecognized plot mode: {}'.format(mode))
+
+    def setup(template):
+        template.charts = []
+        for ax, season in zip(template.axes.flat, SEASONS):
+            template.charts.append(_psychrochart_background(ax))
+            ax.set_title(season.capitalize())
+
+    template = chart_template('psychrochart_seasons',
+                              setup,
+                              nrows=2,
+                              ncols=2,
+                              figsize=(32, 18))
+
+    with template.render():
+        for ax, chart, season in zip(template.axes.flat, template.charts,
+                                     SEASONS):
+            _psychrochart_points(template, ax, chart, data, zone, weather,
+                                 mode, occupied_only, season, window)
 
-    # follow with night zones
-    for zone in bedrooms:
-        co2 = 'CO2_' + zone
-        occupancy = 'OCC_' + zone
+    plt.show()
 
-        co_2 = [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 380, occupancy))[co2].size
-        ]
-        co_2 = co_2 + [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 550, occupancy))[co2].size - sum(co_2)
-        ]
-        co_2 = co_2 + [
-            data.query('({} <= {}) and ({} > 0)'.format(
-                co2, OUTDOOR_CO2 + 950, occupancy))[co2].size - sum(co_2)
-        ]
-        co_2 = co_2 + [
-            data.query('({} > {}) and ({} > 0)'.format(co2, OUTDOOR_CO2 + 950,
-                                                       occupancy))[co2].size
-        ]
 
-        co_2 = [float(i) * 100 / sum(co_2) for i in co_2]
+def _category_bars(name, shares, title, palette):
+    '''
+    Prints the share of the occupied hours of each zone in each category, as
+    computed by chart_data.iaq_co2 or chart_data.relh.
+    '''
+    def setup(template):
+        # remove spines
+        hide_spines(template.axes, 'right', 'top', 'bottom')
 
-        plt.barh(co2, co_2[0], left=[0], color=colors[0])
-        plt.barh(co2, co_2[1], left=co_2[0], color=colors[1])
-        plt.barh(co2, co_2[2], left=sum(co_2[0:2]), color=colors[2])
-        plt.barh(co2, co_2[3], left=sum(co_2[0:3]), color=colors[3])
+        # style
+        template.axes.set_title(title)
+        template.axes.set_xlabel("Occupied Time [%]")
 
-    # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
+    template = chart_template(name, setup)
 
-    # style
-    axs.set_title('Indoor Air Quality - CO2', fontsize=TITLE_FONTSIZE)
-    axs.set_xlabel("Occupied Time [%]", fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    labels = ['Category I', 'Category II', 'Category III', 'Category IV']
-    axs.legend(labels, fontsize=LEGEND_FONTSIZE)
+    with template.render():
+        # one stacked bar per zone
+        _stacked_bars(template, template.axes, shares.index,
+                      shares.to_numpy(), shares.columns, palette,
+                      negative=False, horizontal=True)
+        template.legend(template.axes)
 
     plt.show()
 
 
-def relh(data, zone_names, occupancy):
+def iaq_co2(data, living_rooms, bedrooms):
     '''
+    Prints the indoor CO2 concentration belonging to four different classes of comfort.
+    '''
+    # zones used during day have different categories with respect to nightly zones
+    _category_bars('iaq_co2',
+                   chart_data.iaq_co2(data, living_rooms, bedrooms),
+                   'Indoor Air Quality - CO2',
+                   ['#1D2F6F', '#8390FA', '#6EAF46', '#FAC748'])
 
+
+def relh(data, zone_names, occupancy):
+    '''
+    Prints the relative humidity of the zones belonging to the comfort
+    categories, plus the too humid and too dry hours.
     '''
-    _fig, axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    # in the case of relative humidity the comfort zones are intersecting
+    _category_bars('relh',
+                   chart_data.relh(data, zone_names, occupancy),
+                   'Indoor Relative Humidity',
+                   ['#1D2F6F', '#8390FA', '#6EAF46', '#FAC748'])
 
-    # add x, y gridlines
-    axs.grid(b=True, color='grey', linestyle='-.', linewidth=0.5, alpha=0.6)
 
-    colors = ['#1D2F6F', '#8390FA', '#6EAF46', '#FAC748']
+def _setup_colorbar(template):
+    '''
+    Setup of the charts with a colorbar, drawn in a narrow axes on the right
+    cleared at every render.
+    '''
+    template.axes, template.colorbar_axes = template.axes
+    template.axes.grid(False)
+    template.scratch.append(template.colorbar_axes)
 
-    # in the case of relative humidity the comfort zones are intersecting
-    # be aware that the order of the following lines is important
-    for (zone, occ) in zip(zone_names, occupancy):
-        relh = [
-            data.query('({z} > 30) and ({z} < 50) and ({o} > 0)'.format(
-                z=zone, o=occ))[zone].size
-        ]
-        relh = relh + [
-            data.query('({z} > 20) and ({z} < 70) and ({o} > 0)'.format(
-                z=zone, o=occ))[zone].size - sum(relh)
-        ]
-        relh = relh + [
-            data.query('({z} > 70) and ({o} > 0)'.format(z=zone,
-                                                         o=occ))[zone].size
-        ]
-        relh = relh + [
-            data.query('({} < 20) and ({} > 0)'.format(zone, occ))[zone].size
-        ]
 
-        relh = [float(i) * 100 / sum(relh) for i in relh]
+def _heatmap_chart(name, data, column, title, window=None):
+    '''
+    Prints a heatmap with the value of a column at every hour of the day, for
+    every day of the year or of the window.
+    '''
+    template = chart_template(name,
+                              _setup_colorbar,
+                              ncols=2,
+                              gridspec_kw={'width_ratios': [20, 1]})
 
-        plt.barh(zone, relh[0], left=[0], color=colors[0])
-        plt.barh(zone, relh[1], left=relh[0], color=colors[1])
-        plt.barh(zone, relh[2], left=sum(relh[0:2]), color=colors[2])
-        plt.barh(zone, relh[3], left=sum(relh[0:3]), color=colors[3])
+    # shape data
+    df = chart_data.hourly_map(data, [column], window)[column].unstack('day')
 
-    # remove spines
-    axs.spines['right'].set_visible(False)
-    axs.spines['top'].set_visible(False)
-    axs.spines['bottom'].set_visible(False)
+    with template.render():
+        sns.heatmap(df,
+                    cmap='plasma',
+                    ax=template.axes,
+                    cbar_ax=template.colorbar_axes)
 
-    # style
-    axs.set_title('Indoor Relative Humidity', fontsize=TITLE_FONTSIZE)
-    axs.set_xlabel("Occupied Time [%]", fontsize=LABELS_FONTSIZE)
-    axs.tick_params(labelsize=TICKS_FONTSIZE)
-    labels = ['Category I', 'Category II', 'Too humid', 'Too dry']
-    axs.legend(labels, fontsize=LEGEND_FONTSIZE)
+        # title
+        template.axes.set_title(_window_title(title, window))
 
     plt.show()
 
 
-def airt_heatmap(data, zone):
+def airt_heatmap(data, zone, window=None):
     '''
     Prints a heatmap with the value for temperature at every hour of the day, for every day
     of the year.
     '''
-    _fig, _axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
-
-    def hr_of_day(hour):
-        return int(hour) % 24
+    _heatmap_chart('airt_heatmap', data, 'TAIR_' + zone,
+                   "Hourly mapping of internal temperatures - {}".format(
+                       zone), window)
 
-    def day(hour):
-        return int(hour) // 24
 
-    # shape data
-    df = data[['TIME', 'TAIR_' + zone]].copy()
-    df['DAY'] = df['TIME'].apply(day)
-    df['HOUR'] = df['TIME'].apply(hr_of_day)
-    df = df.pivot(index='HOUR', columns='DAY', values='TAIR_' + zone)
-
-    sns.heatmap(df, cmap='plasma')
+def shd_heatmap(data, zone, window=None):
+    '''
+    Prints a heatmap with the value for the shading at every hour of the day, for every day
+    of the year.
+    '''
+    _heatmap_chart('shd_heatmap', data, 'SHD_' + zone,
+                   "Frequency of use of the shading system - {}".format(zone),
+                   window)
 
-    # title
-    plt.title("Hourly mapping of internal temperatures  - {}".format(zone),
-              fontsize=TITLE_FONTSIZE)
 
-    plt.show()
+def win_heatmap(data, zone, window=None):
+    '''
+    Prints a heatmap with the value for the windows opening at every hour of the day, for every day
+    of the year.
+    '''
+    _heatmap_chart('win_heatmap', data, 'WIN_OF_' + zone,
+                   "Window opening frequency - {}".format(zone),
+                   window)
 
 
-def shd_heatmap(data, zone):
+def tornado(coefficients, kpi):
     '''
-    Prints a heatmap with the value for the shading at every hour of the day, for every day
-    of the year.
+    Prints the sensitivity coefficients of the input parameters on a KPI (one
+    column of the tables computed by src.features.sensitivity), sorted by
+    magnitude.
     '''
-    _fig, _axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
+    def setup(template):
+        template.axes.axvline(0, color='black', linewidth=1)
 
-    def hr_of_day(hour):
-        return int(hour) % 24
+        # remove spines
+        hide_spines(template.axes, 'right', 'top', 'bottom')
+        template.axes.set_xlabel('Sensitivity coefficient [-]')
 
-    def day(hour):
-        return int(hour) // 24
+    template = chart_template('tornado', setup)
+    axs = template.axes
 
-    # shape data
-    df = data[['TIME', 'SHD_' + zone]].copy()
-    df['DAY'] = df['TIME'].apply(day)
-    df['HOUR'] = df['TIME'].apply(hr_of_day)
-    df = df.pivot(index='HOUR', columns='DAY', values='SHD_' + zone)
-    sns.heatmap(df, cmap='plasma')
+    values = chart_data.tornado(coefficients, kpi)[kpi]
+    positions = np.arange(len(values))
 
-    # title
-    plt.title("Frequency of use of the shading system - {}".format(zone),
-              fontsize=TITLE_FONTSIZE)
+    with template.render():
+        axs.barh(positions,
+                 values,
+                 color=np.where(values >= 0, COLOR_PALETTE[0],
+                                COLOR_PALETTE[3]))
+
+        # style graph
+        axs.set_yticks(positions)
+        axs.set_yticklabels(values.index)
+        axs.set_title('Sensitivity of {}'.format(kpi))
 
     plt.show()
 
 
-def win_heatmap(data, zone):
+def parallel_coordinates(inputs, kpis, kpi):
     '''
-    Prints a heatmap with the value for the windows opening at every hour of the day, for every day
-    of the year.
+    Prints every run as a line crossing the normalized values of its varying
+    input parameters and of a KPI, colored by the KPI.
     '''
-    _fig, _axs = plt.subplots(1, 1, figsize=(16, 9), tight_layout=True)
-
-    def hr_of_day(hour):
-        return int(hour) % 24
-
-    def day(hour):
-        return int(hour) // 24
-
-    # shape data
-    df = data[['TIME', 'WIN_OF_' + zone]].copy()
-    df['DAY'] = df['TIME'].apply(day)
-    df['HOUR'] = df['TIME'].apply(hr_of_day)
-    df = df.pivot(index='HOUR', columns='DAY', values='WIN_OF_' + zone)
-    sns.heatmap(df, cmap='plasma')
-
-    # title
-    plt.title("Window opening frequency - {}".format(zone),
-              fontsize=TITLE_FONTSIZE)
+    def setup(template):
+        _setup_colorbar(template)
+        axs = template.axes
+
+        # remove spines
+        hide_spines(axs)
+
+        axs.set_ylim(0, 1)
+        axs.set_yticks([0, 1])
+        axs.set_yticklabels(['min', 'max'])
+        axs.set_title('Parameters of the runs')
+
+    template = chart_template('parallel_coordinates',
+                              setup,
+                              ncols=2,
+                              gridspec_kw={'width_ratios': [20, 1]})
+    axs = template.axes
+
+    # every axis is scaled between its min and max
+    scaled = chart_data.parallel_coordinates(inputs, kpis, kpi)
+    labels = list(scaled.columns)
+    values = scaled.to_numpy()
+
+    with template.render():
+        # all the runs are drawn as a single collection of lines
+        positions = np.broadcast_to(np.arange(len(labels)), values.shape)
+        lines = mcollections.LineCollection(np.stack([positions, values],
+                                                     axis=-1),
+                                            array=kpis.loc[scaled.index, kpi],
+                                            cmap='viridis',
+                                            linewidths=1,
+                                            alpha=0.6)
+        axs.add_collection(lines)
+
+        for n in range(len(labels)):
+            axs.axvline(n, color='grey', linewidth=1)
+
+        # style graph
+        axs.set_xlim(0, len(labels) - 1)
+        axs.set_xticks(range(len(labels)))
+        axs.set_xticklabels(labels, rotation=45, ha='right')
+
+        colorbar = template.figure.colorbar(lines,
+                                            cax=template.colorbar_axes)
+        colorbar.set_label(kpi)
 
     plt.show()
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+import shutil
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# processed run shipped with the repository
+PROCESSED_RUN = Path(__file__).resolve().parents[1] / 'data' / 'processed'
+
+
+@pytest.fixture(scope='session')
+def processed_path(tmp_path_factory):
+    '''
+    Three copies of the processed run of data/processed in run_<n> folders,
+    each one with a different gross floor area. The copies get the PV peak
+    power the run leaves at zero although it produces.
+    '''
+    folder = tmp_path_factory.mktemp('processed')
+    for n in range(1, 4):
+        run = folder / 'run_{}'.format(n)
+        shutil.copytree(PROCESSED_RUN, run,
+                        ignore=shutil.ignore_patterns('.gitkeep'))
+
+        inputs = pd.read_csv(run / 'cultural-e-input.csv', index_col=False)
+        inputs['IN_GFA'] *= n
+        inputs['IN_kWp'] = 4.0
+        inputs.to_csv(run / 'cultural-e-input.csv', index=False)
+    return folder
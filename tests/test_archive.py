@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.data.archive import (read_archive, read_archive_metadata,
+                              read_archive_table, read_archive_weather,
+                              write_archive)
+from src.data.catalog import (Run, build_catalog, load_run_tables,
+                              query_runs, read_input_parameters)
+from src.data.epw import read_epw
+from src.data.shared import load_run
+from src.data.weather_store import (WEATHER_STORE, read_run_weather,
+                                    store_weather, weather_file,
+                                    write_reference)
+from src.features.psychrometrics import weather_psychrometrics
+
+LEGACY_RUN = Path(__file__).resolve().parents[1] / 'data' / 'processed'
+
+
+@pytest.fixture(scope='module')
+def archive(processed_path, tmp_path_factory):
+    # a run with the weather table and the units make_dataset writes
+    run_path = tmp_path_factory.mktemp('archive') / 'run_2'
+    shutil.copytree(processed_path / 'run_2', run_path)
+    weather, _ = read_epw(run_path / 'meteo.epw')
+    weather_psychrometrics(weather).to_csv(run_path / 'meteo.csv',
+                                           index=False)
+    pd.DataFrame({
+        'table': ['energy_zones', 'energy_zones'],
+        'column': ['TIME', '1_B4_QHEAT'],
+        'unit': ['h', 'kJ/h'],
+    }).to_csv(run_path / 'columns.csv', index=False)
+
+    return run_path, write_archive(run_path)
+
+
+def test_archive_round_trip(archive):
+    run_path, filepath = archive
+
+    tables = read_archive(filepath)
+
+    expected = load_run_tables(run_path)
+    assert list(tables) == list(expected)
+    for name, df in expected.items():
+        pd.testing.assert_frame_equal(tables[name], df)
+
+
+def test_read_archive_columns(archive):
+    run_path, filepath = archive
+    columns = ['TOP_F1dayA', 'TIME']
+
+    table = read_archive_table(filepath, 'cultural-e', columns)
+
+    pd.testing.assert_frame_equal(
+        table, load_run_tables(run_path)['cultural-e'][columns])
+
+
+def test_archive_metadata(archive):
+    run_path, filepath = archive
+
+    metadata = read_archive_metadata(filepath)
+
+    assert metadata['inputs'] == pytest.approx(
+        read_input_parameters(run_path / 'cultural-e-input.csv').to_dict())
+    assert metadata['units']['energy_zones']['1_B4_QHEAT'] == 'kJ/h'
+    assert metadata['tables']['cultural-e']['rows'] == 8760
+
+
+def test_read_archive_weather(archive):
+    run_path, filepath = archive
+
+    weather, location = read_archive_weather(filepath)
+
+    expected, expected_location = read_run_weather(run_path)
+    assert location == expected_location
+    pd.testing.assert_series_equal(weather['temp_air'],
+                                   expected['temp_air'],
+                                   check_index=False)
+    assert 'humidity_ratio' in weather
+
+
+def test_load_run_reads_the_archive(archive):
+    run_path, filepath = archive
+
+    tables = load_run(Run('test/' + uuid.uuid4().hex, str(run_path)))
+
+    expected = read_archive(filepath)
+    assert list(tables) == list(expected)
+    pd.testing.assert_frame_equal(tables['summary'], expected['summary'])
+
+
+def test_archive_of_legacy_run(tmp_path):
+    filepath = write_archive(LEGACY_RUN, tmp_path / 'run.zip')
+
+    tables = read_archive(filepath)
+
+    assert 'summary-total' not in tables
+    assert len(tables['meteo']) == 8760
+    assert 'humidity_ratio' in tables['meteo']
+
+
+@pytest.fixture
+def stored_run(processed_path, tmp_path):
+    # a run referencing its weather file and records in the store, archived
+    run_path = tmp_path / 'processed' / 'run_1'
+    store = tmp_path / 'processed' / WEATHER_STORE
+    shutil.copytree(processed_path / 'run_1', run_path)
+    digest = store_weather(run_path / 'meteo.epw', store)
+    write_reference(run_path, digest, store)
+    (run_path / 'meteo.epw').unlink()
+    weather, _ = read_run_weather(run_path)
+    weather_psychrometrics(weather.copy()).to_csv(
+        weather_file(run_path, '.csv'), index=False)
+
+    return run_path, write_archive(run_path), digest
+
+
+def test_archive_references_the_stored_weather(stored_run, tmp_path):
+    run_path, filepath, digest = stored_run
+
+    with zipfile.ZipFile(filepath) as archive:
+        assert all(not name.startswith(('meteo', 'weather'))
+                   for name in archive.namelist())
+    assert read_archive_metadata(filepath)['weather']['sha256'] == digest
+    # the archive moves with the store
+    moved = tmp_path / 'moved'
+    shutil.copytree(tmp_path / 'processed', moved)
+    pd.testing.assert_frame_equal(
+        read_archive(moved / 'run_1' / 'run.zip')['meteo'],
+        load_run_tables(run_path)['meteo'])
+    shutil.rmtree(moved / WEATHER_STORE)
+    with pytest.raises(FileNotFoundError, match=digest):
+        read_archive_weather(moved / 'run_1' / 'run.zip')
+
+
+def test_synced_files_are_enough(stored_run, tmp_path):
+    run_path, _, _ = stored_run
+    expected = load_run_tables(run_path)
+    # the files make sync_data_to_s3 uploads
+    for filepath in run_path.iterdir():
+        if filepath.name not in ('run.zip', 'cultural-e-input.csv'):
+            filepath.unlink()
+
+    runs = query_runs(build_catalog(tmp_path / 'processed'), None)
+    tables = load_run(Run('test/' + uuid.uuid4().hex, runs[0].path))
+
+    assert [run.id for run in runs] == ['run_1']
+    assert list(tables) == list(expected)
+    for name, df in expected.items():
+        pd.testing.assert_frame_equal(tables[name], df)
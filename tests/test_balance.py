@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data.balance import (TOTAL_ZONE, balance_signs, parse_balance,
+                              read_summary)
+
+SUMMARY = Path(__file__).resolve().parents[1] / 'data' / 'raw' / 'SUMMARY.BAL'
+TERMS = [
+    'DQAIRdt', 'QHEAT', 'QCOOL', 'QINF', 'QVENT', 'QCOUPL', 'QTRANS',
+    'QGAININT', 'QWGAIN', 'QSOLGAIN', 'QSOLAIR'
+]
+
+
+def test_parse_balance_keeps_every_block():
+    blocks = parse_balance(SUMMARY)
+
+    assert [b.title for b in blocks] == [
+        'Energy balance per zone', 'Energy balance for sum of all zone'
+    ]
+    assert blocks[0].columns == ['Zonenr', 'Rel_BAL', 'BAL_ENERGY'] + TERMS
+    assert blocks[0].units[:3] == ['-', '%', 'kJ']
+    # the total of all zones shares the header of the zones
+    assert blocks[1].columns == blocks[0].columns
+    assert [b.values.shape for b in blocks] == [(5, 14), (1, 14)]
+    assert blocks[0].values[2, 4] == 5.895E+04
+
+
+def test_read_summary():
+    zones, building, units = read_summary(SUMMARY)
+
+    assert list(zones['Zonenr']) == [1, 2, 3, 4, 5]
+    assert list(building['Zonenr']) == [TOTAL_ZONE]
+    assert units['QHEAT'] == 'kJ'
+    # the building is the sum of its zones, within the printed digits
+    np.testing.assert_allclose(building[TERMS].iloc[0],
+                               zones[TERMS].sum(),
+                               rtol=1e-3,
+                               atol=1e-3 * zones[TERMS].abs().max().max())
+
+
+def test_balance_signs():
+    signs = balance_signs(SUMMARY)
+
+    assert signs['QHEAT'] == 1
+    assert signs['DQAIRdt'] == -1
+    assert signs['QCOOL'] == -1
+
+
+def test_parse_balance_of_hourly_file(tmp_path):
+    # hourly balance of a zone, columns separated by pipes
+    bal = tmp_path / 'Energy_zone.BAL'
+    bal.write_text(' TIME | REL_BAL_ENERGY | 1_B4_QBAL | 1B4_QCOUP\n'
+                   ' h | % | kJ/h | kJ/h\n'
+                   ' 0.0000 | 0.0000E+00 | 1.0000E+00 | -2.5000E+02\n'
+                   ' 1.0000 | 0.0000E+00 | 2.0000E+00 | -3.5000E+02\n'
+                   ' 2.0000 | 0.0000E+00 | 3.0000E+00 | 4.5000E+02\n')
+
+    blocks = parse_balance(bal)
+
+    assert len(blocks) == 1
+    assert blocks[0].columns[:3] == ['TIME', 'REL_BAL_ENERGY', '1_B4_QBAL']
+    assert blocks[0].units[:2] == ['h', '%']
+    assert blocks[0].values.shape == (3, len(blocks[0].columns))
+    np.testing.assert_array_equal(np.diff(blocks[0].values[:, 0]), 1)
+    assert blocks[0].values[2, 3] == 450
+
+
+def test_parse_balance_rejects_ragged_rows(tmp_path):
+    # the missing value of the first row would shift the next one into it
+    bal = tmp_path / 'Energy_zone.BAL'
+    bal.write_text(' TIME | 1_B4_QBAL | 1B4_QCOUP\n'
+                   ' h | kJ/h | kJ/h\n'
+                   ' 0.0000 | 1.0000E+00\n'
+                   ' 1.0000 | 2.0000E+00 | -3.5000E+02 | 4.0000E+00\n')
+
+    with pytest.raises(ValueError, match='2 values in a row'):
+        parse_balance(bal)
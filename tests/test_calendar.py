@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+
+from src.features.calendar import SEASONS, month_of_hour, season_mask
+from src.features.calendar import time_step
+
+
+def test_season_mask():
+    time = np.arange(8760)
+    months = month_of_hour(time)
+
+    assert season_mask(time).all()
+    for season, members in SEASONS.items():
+        np.testing.assert_array_equal(season_mask(time, season),
+                                      np.isin(months, members))
+    # every hour belongs to exactly one season
+    total = sum(season_mask(time, season).astype(int) for season in SEASONS)
+    assert (total == 1).all()
+
+
+def test_time_step():
+    assert time_step(np.arange(0, 10, 0.25)) == 0.25
+    assert time_step(np.arange(10.0)) == 1
+    assert time_step([3.0]) == 1
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import pandas as pd
+import pytest
+
+from src.data.catalog import (INPUT_FILE, build_catalog, load_catalog,
+                              query_runs, read_input_parameters,
+                              save_catalog)
+
+
+def test_build_catalog(processed_path):
+    catalog = build_catalog(processed_path)
+
+    assert list(catalog.index) == ['run_1', 'run_2', 'run_3']
+    assert catalog.columns[0] == 'path'
+    for run, row in catalog.iterrows():
+        inputs = read_input_parameters(processed_path / run / INPUT_FILE)
+        assert row['path'] == str(processed_path / run)
+        assert row[inputs.index].astype(float).to_dict() == pytest.approx(
+            inputs.to_dict())
+
+
+def test_load_catalog(processed_path, tmp_path):
+    pytest.importorskip('pyarrow')
+    catalog = build_catalog(processed_path)
+    save_catalog(catalog, tmp_path / 'catalog.parquet')
+
+    loaded = load_catalog(tmp_path / 'catalog.parquet')
+    pd.testing.assert_frame_equal(loaded, catalog)
+    assert loaded.index.name == 'run'
+    assert list(load_catalog(tmp_path / 'catalog.parquet',
+                             ['IN_GFA']).columns) == ['IN_GFA']
+
+
+def test_query_runs(processed_path):
+    catalog = build_catalog(processed_path)
+    threshold = catalog['IN_GFA'].median()
+
+    runs = query_runs(catalog, 'IN_GFA > {}'.format(threshold))
+    assert [run.id for run in runs] == list(
+        catalog.index[catalog['IN_GFA'] > threshold])
+    assert all(run.path == catalog.loc[run.id, 'path'] for run in runs)
+    assert len(query_runs(catalog, None)) == len(catalog)
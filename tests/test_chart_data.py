@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import build_catalog, load_run_tables, query_runs
+from src.features.chart_data import (export_chart_data, histogram,
+                                     horizontal_irradiance, hourly_map,
+                                     monthly_sums, run_chart_data, tidy)
+from src.features.windows import Window, hour_window, month_window
+
+
+def test_histogram():
+    result = histogram([0.5, 1.5, 1.6, 2.5], [0, 1, 2, 3])
+
+    assert list(result.index) == [0, 1, 2]
+    assert list(result['hours']) == [1, 2, 1]
+    np.testing.assert_allclose(result['cumulative'], [25, 75, 100])
+
+
+def test_horizontal_irradiance_of_a_window():
+    weather = pd.DataFrame({'ghi': [0.0] * 6 + [30.0, 120.0, 978.0] + [0.0]})
+
+    year = horizontal_irradiance(weather)
+    night = horizontal_irradiance(weather, hour_window(0, 5))
+    hour = horizontal_irradiance(weather, hour_window(7, 8))
+
+    # the same bins from 0 for every window, the sunniest hour included
+    assert year.index[0] == 0 and year.index[-1] == 975
+    assert year['hours'].sum() == 3
+    assert list(night.index) == list(year.index)
+    assert night['hours'].sum() == 0
+    assert (night['cumulative'] == 0).all()
+    assert hour.loc[100, 'hours'] == 1
+    assert hour['cumulative'].iloc[-1] == 100
+
+
+def test_horizontal_irradiance_without_sun():
+    result = horizontal_irradiance(pd.DataFrame({'ghi': np.zeros(24)}))
+
+    assert list(result.index) == [0, 25]
+    assert result['hours'].sum() == 0
+
+
+def test_hourly_map_averages_sub_hourly_rows():
+    data = pd.DataFrame({
+        'TIME': np.arange(96) * 0.5,
+        'TAIR_a': np.arange(96.0),
+    })
+
+    result = hourly_map(data, ['TAIR_a'])
+
+    assert len(result) == 48
+    assert result.loc[(1, 3), 'TAIR_a'] == pytest.approx((54 + 55) / 2)
+
+
+def test_hourly_map_of_a_window():
+    data = pd.DataFrame({'TIME': np.arange(100.0), 'TAIR_a': 1.0})
+
+    result = hourly_map(data, ['TAIR_a'], Window(30, 50, 'test'))
+
+    # the stop of a window is excluded
+    assert result.index[0] == (1, 6)
+    assert len(result) == 20
+
+
+def test_monthly_sums_of_half_hours(processed_path):
+    energy = pd.read_csv(processed_path / 'run_1' / 'energy_zones.csv')
+    column = '1_B4_QHEAT'
+    # the same powers held for two half hours each
+    half_hours = energy.loc[energy.index.repeat(2)].reset_index(drop=True)
+    half_hours['TIME'] = np.arange(len(half_hours)) * 0.5
+
+    sums = monthly_sums(half_hours, [column])
+
+    assert len(sums) == 12
+    np.testing.assert_allclose(sums, monthly_sums(energy, [column]))
+    assert sums[column].sum() == pytest.approx(energy[column].sum() / 3600)
+
+
+def test_monthly_sums_of_a_window(processed_path):
+    energy = pd.read_csv(processed_path / 'run_1' / 'energy_zones.csv')
+
+    sums = monthly_sums(energy, ['1_B4_QHEAT'], month_window('March'))
+
+    assert list(sums.index) == [2]
+    assert sums.iloc[0, 0] == pytest.approx(
+        monthly_sums(energy, ['1_B4_QHEAT']).iloc[2, 0])
+
+
+def test_tidy():
+    dataset = pd.DataFrame({'a': [1.0, np.nan], 'b': [3.0, 4.0]},
+                           index=pd.MultiIndex.from_tuples(
+                               [(0, 'x'), (1, 'y')], names=['day', 'zone']))
+
+    long = tidy(dataset)
+
+    assert list(long.columns) == ['series', 'x', 'y', 'label', 'value']
+    assert len(long) == 3
+    assert list(long['label']) == ['x', 'x', 'y']
+    assert long['y'].isna().all()
+
+
+def test_run_chart_data(processed_path):
+    datasets = run_chart_data(load_run_tables(processed_path / 'run_1'))
+
+    for chart in ['air_temperature', 'energy_balance', 'monthly_consumption',
+                  'airt_heatmap', 'adaptive_thermal_comfort', 'psychrochart']:
+        assert chart in datasets
+    assert datasets['air_temperature']['hours'].sum() == 8760
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.parquet'])
+def test_export_chart_data(processed_path, tmp_path, suffix):
+    if suffix == '.parquet':
+        pytest.importorskip('pyarrow')
+    runs = query_runs(build_catalog(processed_path), None)[:2]
+
+    export = export_chart_data(runs, tmp_path / ('charts' + suffix))
+
+    if suffix == '.csv':
+        saved = pd.read_csv(tmp_path / 'charts.csv', dtype={'label': str})
+    else:
+        saved = pd.read_parquet(tmp_path / 'charts.parquet')
+    assert list(saved.columns) == ['run', 'chart', 'series', 'x', 'y',
+                                   'label', 'value']
+    assert len(saved) == len(export)
+    assert set(saved['run']) == {'run_1', 'run_2'}
+    with pytest.raises(ValueError):
+        export_chart_data(runs, tmp_path / 'charts.xlsx')
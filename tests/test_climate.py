@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from src.data.epw import read_epw
+from src.features.climate import (climate_histograms, climate_statistics,
+                                  cumulative_frequency, degree_days,
+                                  design_conditions, histograms,
+                                  read_climates, shared_bins)
+
+EPW = (Path(__file__).resolve().parents[1] / 'data' / 'raw' /
+       'Bolzano-metenorm-extreme.epw')
+
+
+@pytest.fixture(scope='module')
+def epw_files(tmp_path_factory):
+    # the weather file of the repository and a copy 2 C warmer
+    folder = tmp_path_factory.mktemp('climates')
+    lines = EPW.read_text().splitlines(keepends=True)
+    for n, line in enumerate(lines[8:], 8):
+        fields = line.split(',')
+        fields[6] = '{:.1f}'.format(float(fields[6]) + 2)
+        lines[n] = ','.join(fields)
+    shutil.copy(EPW, folder / 'Bolzano.epw')
+    (folder / 'Bolzano-warmer.epw').write_text(''.join(lines))
+    return sorted(folder.glob('*.epw'))
+
+
+def test_histograms_match_numpy():
+    rng = np.random.default_rng(4)
+    values = rng.normal(10, 5, (3, 1000))
+    values[1, :50] = np.nan
+    edges = shared_bins(values, 2.0)
+
+    counts = histograms(values, edges)
+
+    assert edges[0] <= np.nanmin(values) and edges[-1] >= np.nanmax(values)
+    for row, expected in zip(values, counts):
+        np.testing.assert_array_equal(
+            np.histogram(row[~np.isnan(row)], edges)[0], expected)
+    np.testing.assert_allclose(cumulative_frequency(counts)[:, -1], 100)
+
+
+def test_degree_days():
+    temp_air = np.stack([np.full(48, 10.0), np.r_[np.full(24, 20.0),
+                                                  np.full(24, 17.0)]])
+
+    heating, cooling = degree_days(temp_air)
+
+    np.testing.assert_allclose(heating, [16, 1])
+    np.testing.assert_allclose(cooling, [0, 2])
+
+
+def test_design_conditions():
+    temp_air = np.arange(1000.0)[np.newaxis]
+
+    conditions = design_conditions(temp_air)
+
+    # the heating design temperature is exceeded by 99.6 % of the hours
+    assert (temp_air > conditions['heating_99.6']).mean() == pytest.approx(
+        0.996, abs=1e-3)
+    assert (temp_air > conditions['cooling_0.4']).mean() == pytest.approx(
+        0.004, abs=1e-3)
+
+
+def test_climate_statistics(epw_files):
+    weathers, metadata = read_climates(epw_files)
+
+    stats = climate_statistics(weathers, metadata)
+
+    assert list(stats.index) == [f.stem for f in epw_files]
+    for f in epw_files:
+        weather, _ = read_epw(f)
+        assert stats.loc[f.stem, 'temp_air_mean'] == pytest.approx(
+            weather['temp_air'].mean())
+        assert stats.loc[f.stem, 'ghi_yearly'] == pytest.approx(
+            weather['ghi'].sum() / 1000)
+    assert 'latitude' in stats
+
+
+def test_climate_histograms_pad_shorter_files(epw_files):
+    weathers, _ = read_climates(epw_files)
+    first = next(iter(weathers))
+    weathers[first] = weathers[first].iloc[:100]
+
+    counts = climate_histograms(weathers, 'temp_air')
+    irradiance = climate_histograms(weathers, 'ghi', positive_only=True)
+
+    assert list(counts.sum()) == [100, 8760]
+    assert irradiance.index[0] >= 0
+    assert irradiance.iloc[:, 1].sum() == (weathers[list(weathers)[1]]['ghi']
+                                           > 0).sum()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.comfort import NOT_CLASSIFIED, adaptive_comfort_category
+from src.features.comfort import adaptive_thermal_comfort_summary
+from src.features.comfort import daily_mean_temperature
+from src.features.comfort import running_mean_outdoor_temperature
+from src.features.comfort import running_mean_outdoor_temperature_series
+
+
+@pytest.fixture
+def temp_air():
+    # hourly temperatures of a year with a seasonal and a daily cycle
+    hours = np.arange(8760)
+    rng = np.random.default_rng(0)
+    return (12 - 10 * np.cos(2 * np.pi * hours / 8760) +
+            4 * np.sin(2 * np.pi * hours / 24) + rng.normal(0, 1, 8760))
+
+
+def test_daily_mean_temperature_of_incomplete_day():
+    t_dm = daily_mean_temperature(np.r_[np.zeros(24), np.ones(12)])
+    np.testing.assert_allclose(t_dm, [0.0, 1.0])
+
+
+@pytest.mark.parametrize('alpha', [0.6, 0.8, 0.9])
+def test_running_mean_series_matches_closed_form(temp_air, alpha):
+    t_dm = daily_mean_temperature(temp_air)
+    t_rm = running_mean_outdoor_temperature_series(temp_air,
+                                                   alpha,
+                                                   cyclic=False)
+
+    # weighted sum of the previous days, the first one standing for all the
+    # days before the series
+    for day in [1, 2, 10, 200, 364]:
+        past = t_dm[day - 1::-1]
+        expected = ((1 - alpha) * np.dot(alpha**np.arange(day), past) +
+                    alpha**day * t_dm[0])
+        np.testing.assert_allclose(t_rm[24 * day:24 * (day + 1)], expected)
+
+
+def test_running_mean_series_matches_daily_running_mean(temp_air):
+    t_dm = daily_mean_temperature(temp_air)
+    t_rm = running_mean_outdoor_temperature_series(temp_air)
+
+    # with a long enough history the two definitions converge
+    for day in [100, 250, 364]:
+        expected = running_mean_outdoor_temperature(t_dm[day - 1::-1])
+        assert t_rm[24 * day] == pytest.approx(expected, abs=0.05)
+
+
+def test_cyclic_running_mean_wraps_around_the_year(temp_air):
+    t_rm = running_mean_outdoor_temperature_series(temp_air)
+    t_next = running_mean_outdoor_temperature_series(np.r_[temp_air,
+                                                           temp_air])
+
+    # the first day of the year follows the last one
+    np.testing.assert_allclose(t_rm[0], t_next[8760])
+
+
+def test_adaptive_comfort_category():
+    # the comfort temperature is 25.4 C for a running mean of 20 C
+    t_op = np.array([25.4, 27.9, 21.4, 29.0, 31.0, np.nan, 25.4])
+    t_rm = np.array([20.0, 20.0, 20.0, 20.0, 20.0, 20.0, 35.0])
+
+    np.testing.assert_array_equal(
+        adaptive_comfort_category(t_op, t_rm),
+        [1, 2, 3, 3, 4, NOT_CLASSIFIED, NOT_CLASSIFIED])
+
+
+def test_adaptive_comfort_category_of_zones():
+    t_op = np.array([[25.4, 31.0], [np.nan, 25.4]])
+    np.testing.assert_array_equal(adaptive_comfort_category(t_op, [20, 9]),
+                                  [[1, 4], [NOT_CLASSIFIED, NOT_CLASSIFIED]])
+
+
+def test_adaptive_thermal_comfort_summary_of_half_hours():
+    weather = pd.DataFrame({'temp_air': np.full(8760, 20.0)})
+    data = pd.DataFrame({
+        'TIME': np.arange(48) * 0.5,
+        'TOP_hot': np.full(48, 31.4),
+        'TOP_gap': np.r_[np.full(24, np.nan),
+                         np.full(24, 25.4)],
+        'OCC_gap': np.r_[np.ones(36), np.zeros(12)],
+    })
+
+    summary = adaptive_thermal_comfort_summary(data, weather)
+
+    assert summary.loc['hot', 'occupied_hours'] == 24
+    assert summary.loc['hot', 'hours_cat_IV'] == 24
+    assert summary.loc['hot', 'hours_above'] == 24
+    assert summary.loc['hot', 'degree_hours_above'] == pytest.approx(72)
+    # missing temperatures are neither comfortable nor uncomfortable
+    assert summary.loc['gap', 'occupied_hours'] == 18
+    assert summary.loc['gap', 'hours_not_classified'] == 12
+    assert summary.loc['gap', 'hours_cat_I'] == 6
+    assert summary.loc['gap', 'hours_cat_IV'] == 0
+    assert summary.loc['gap', 'hours_below'] == 0
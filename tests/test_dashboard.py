@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+from http.server import ThreadingHTTPServer
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from src.visualization.dashboard import (MAX_POINTS, Dashboard, make_handler,
+                                         series)
+
+
+@pytest.fixture(scope='module')
+def server(processed_path):
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0),
+                                make_handler(Dashboard(processed_path)))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:{}'.format(httpd.server_address[1])
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _get(url):
+    with urlopen(url) as response:
+        return json.loads(response.read())
+
+
+def test_series_within_viewport(processed_path):
+    dashboard = Dashboard(processed_path)
+    table = dashboard.tables('run_1')['cultural-e']
+
+    result = series(table, ['TOP_F1dayA'], 24, 24 * 31, 100)
+
+    assert result['total'] == 24 * 30 + 1
+    points = result['series']['TOP_F1dayA']
+    assert len(points['x']) == 100
+    assert points['x'][0] == 24 and points['x'][-1] == 24 * 31
+
+
+def test_api(server):
+    index = _get(server + '/api/runs')
+    assert index['runs'] == ['run_1', 'run_2', 'run_3']
+    assert 'lttb' in index['methods']
+
+    columns = _get(server + '/api/columns?run=run_2')
+    assert 'TOP_F1dayA' in columns['cultural-e']
+    assert 'TIME' not in columns['cultural-e']
+
+    result = _get(server + '/api/series?run=run_2&table=cultural-e'
+                  '&columns=TOP_F1dayA&points=1000000&method=minmax')
+    assert result['total'] == 8760
+    assert len(result['series']['TOP_F1dayA']['y']) <= MAX_POINTS
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/api/unknown', 404),
+    ('/api/series?run=run_9&table=cultural-e&columns=TIME', 400),
+    ('/api/series?run=run_1&table=cultural-e&columns=TIME&method=mean', 400),
+])
+def test_api_errors(server, path, status):
+    with pytest.raises(HTTPError) as error:
+        urlopen(server + path)
+    assert error.value.code == status
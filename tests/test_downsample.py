@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from src.features.downsample import downsample, lttb, minmax, viewport
+
+
+def _reference_lttb(x, y, n_out):
+    # point by point version of the algorithm, with the same buckets
+    n = len(x)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = [0]
+    for i in range(n_out - 2):
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        a = selected[-1]
+        best, best_area = None, -1.0
+        for j in range(edges[i], edges[i + 1]):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) -
+                       (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+
+    return np.array(selected + [n - 1])
+
+
+@pytest.fixture
+def signal():
+    rng = np.random.default_rng(2)
+    x = np.arange(5000.0)
+    y = np.sin(x / 300) + rng.normal(0, 0.1, len(x))
+    y[1234] = 8.0
+    return x, y
+
+
+@pytest.mark.parametrize('n_out', [3, 10, 97, 500])
+def test_lttb_matches_reference(signal, n_out):
+    x, y = signal
+    np.testing.assert_array_equal(lttb(x, y, n_out),
+                                  _reference_lttb(x, y, n_out))
+
+
+def test_lttb_keeps_ends_and_peaks(signal):
+    x, y = signal
+    idx = lttb(x, y, 200)
+
+    assert len(idx) == 200
+    assert idx[0] == 0 and idx[-1] == len(x) - 1
+    assert (np.diff(idx) > 0).all()
+    assert 1234 in idx
+    np.testing.assert_array_equal(lttb(x, y, len(x)), np.arange(len(x)))
+
+
+def test_minmax_keeps_extremes_of_every_bucket(signal):
+    x, y = signal
+    idx = minmax(x, y, 100)
+
+    assert len(idx) <= 100
+    assert (np.diff(idx) > 0).all()
+    for bucket in np.array_split(np.arange(len(x)), 50):
+        assert bucket[np.argmin(y[bucket])] in idx
+        assert bucket[np.argmax(y[bucket])] in idx
+
+
+def test_viewport():
+    x = np.arange(0, 100, 0.5)
+
+    window = viewport(x, 10, 20)
+    assert x[window][0] == 10 and x[window][-1] == 20
+    assert viewport(x) == slice(0, len(x))
+
+
+def test_downsample(signal):
+    x, y = signal
+
+    xs, ys = downsample(x, y, 100, 'minmax')
+    np.testing.assert_array_equal(ys, y[xs.astype(int)])
+    with pytest.raises(ValueError):
+        downsample(x, y, 100, 'mean')
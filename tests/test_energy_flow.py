@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import build_catalog, query_runs
+from src.features.energy_flow import (BATTERY_EFFICIENCY, FLOWS,
+                                      battery_sweep, collect_battery_sweeps,
+                                      hourly_flows, monthly_flows,
+                                      yearly_flows)
+
+
+def _reference_battery(load, production, capacity, efficiency):
+    # hour by hour simulation of a single battery
+    eta = np.sqrt(efficiency)
+    soc, grid_import, grid_export = 0.0, 0.0, 0.0
+    for demand, pv in zip(load, production):
+        direct = min(demand, pv)
+        charge = min((pv - direct) * eta, capacity - soc)
+        discharge = min((demand - direct) / eta, soc)
+        soc += charge - discharge
+        grid_export += pv - direct - charge / eta
+        grid_import += demand - direct - discharge * eta
+
+    return grid_import, grid_export
+
+
+@pytest.fixture
+def power():
+    rng = np.random.default_rng(3)
+    hours = np.arange(24 * 20)
+    load = rng.uniform(0.2, 1.5, len(hours))
+    production = np.clip(3 * np.sin(2 * np.pi * (hours % 24 - 6) / 24), 0,
+                         None)
+    return load, production
+
+
+def test_hourly_flows_of_half_hours():
+    data = pd.DataFrame({
+        'TIME': [0.0, 0.5, 1.0],
+        'QEL_TOT': [3600.0, 7200.0, 0.0],
+        'PV_p': [7200.0, 3600.0, 3600.0],
+    })
+
+    flows = hourly_flows(data)
+
+    np.testing.assert_allclose(flows['load'], [0.5, 1, 0])
+    np.testing.assert_allclose(flows['self_consumption'], [0.5, 0.5, 0])
+    np.testing.assert_allclose(flows['grid_import'], [0, 0.5, 0])
+    np.testing.assert_allclose(flows['grid_export'], [0.5, 0, 0.5])
+
+
+def test_yearly_flows_are_the_sum_of_the_months(processed_path):
+    data = pd.read_csv(processed_path / 'run_1' / 'cultural-e.csv')
+
+    monthly = monthly_flows(data)
+    yearly = yearly_flows(data)
+
+    assert len(monthly) == 12
+    np.testing.assert_allclose(monthly[FLOWS].sum(), yearly[FLOWS])
+    assert yearly['self_consumption'] <= yearly['production']
+    assert 0 <= yearly['self_sufficiency_ratio'] <= 100
+
+
+@pytest.mark.parametrize('scale', [0.5, 1.0, 2.0])
+@pytest.mark.parametrize('capacity', [0.0, 1.0, 5.0])
+def test_battery_sweep_matches_reference(power, scale, capacity):
+    load, production = power
+
+    sweep = battery_sweep(load, production, [0.0, 1.0, 5.0],
+                          [0.5, 1.0, 2.0])
+    grid_import, grid_export = _reference_battery(load, production * scale,
+                                                  capacity,
+                                                  BATTERY_EFFICIENCY)
+
+    row = sweep.loc[(scale, capacity)]
+    assert row['grid_import'] == pytest.approx(grid_import)
+    assert row['grid_export'] == pytest.approx(grid_export)
+    assert row['production'] == pytest.approx(production.sum() * scale)
+
+
+def test_battery_sweep_without_production():
+    sweep = battery_sweep(np.ones(10), np.zeros(10), [2.0])
+
+    assert sweep['grid_import'].iloc[0] == 10
+    assert np.isnan(sweep['self_consumption_ratio'].iloc[0])
+    assert sweep['cycles'].iloc[0] == 0
+
+
+def test_collect_battery_sweeps(processed_path):
+    runs = query_runs(build_catalog(processed_path), 'IN_GFA > 0')
+
+    sweeps = collect_battery_sweeps(runs, capacities=[0, 5], kwp=[4, 8])
+
+    assert sweeps.index.names == ['run', 'kwp', 'capacity']
+    assert len(sweeps) == len(runs) * 4
+    # a larger battery never imports more
+    imports = sweeps['grid_import'].unstack('capacity')
+    assert (imports[5] <= imports[0] + 1e-9).all()
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from src.benchmarks.import_time import HEAVY_MODULES, measure_import
+from src.lazy import LazyModule
+
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+PROBE = '''
+import sys
+import src.visualization.visualize as visualize
+print(','.join(m for m in {heavy!r} if m in sys.modules))
+visualize.plt.get_backend()
+print('matplotlib.pyplot' in sys.modules)
+'''
+
+
+def test_visualize_loads_matplotlib_on_first_use():
+    out = subprocess.run(
+        [sys.executable, '-c',
+         PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=str(PROJECT_DIR),
+        env=dict(os.environ, MPLBACKEND='Agg'),
+        check=True,
+        stdout=subprocess.PIPE,
+        universal_newlines=True).stdout.split('\n')
+
+    assert out[0] == ''
+    assert out[1] == 'True'
+
+
+def test_lazy_module():
+    module = LazyModule('json.decoder')
+
+    assert 'not loaded' in repr(module)
+    assert module.JSONDecodeError.__module__ == 'json.decoder'
+    assert 'not loaded' not in repr(module)
+
+
+def test_measure_import():
+    elapsed, heavy = measure_import('src.features.comfort', repeat=1)
+
+    assert elapsed > 0
+    assert heavy == []
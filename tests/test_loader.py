@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+from src.data.catalog import (Run, build_catalog, load_run_tables,
+                              query_runs)
+from src.data.loader import iter_runs, stream_runs
+
+
+@pytest.fixture(scope='module')
+def runs(processed_path):
+    return query_runs(build_catalog(processed_path), None)
+
+
+@pytest.mark.parametrize('max_reads', [1, 4])
+def test_stream_runs_reads_every_run_once(runs, max_reads):
+    loaded = dict(stream_runs(runs, max_reads=max_reads))
+
+    assert sorted(run.id for run in loaded) == [run.id for run in runs]
+    for run, tables in loaded.items():
+        expected = load_run_tables(run.path)
+        assert set(tables) == set(expected)
+        for name in tables:
+            pd.testing.assert_frame_equal(tables[name], expected[name])
+
+
+def test_stream_runs_extra_tables(runs):
+    for run, tables in stream_runs(runs, ['inputs', 'weather', 'missing']):
+        # missing tables are skipped
+        assert set(tables) == {'inputs', 'weather'}
+        assert 'IN_GFA' in tables['inputs']
+        assert len(tables['weather']) == 8760
+
+
+def test_iter_runs_in_an_event_loop(runs):
+    async def collect():
+        return [run.id async for run, _ in iter_runs(runs, ['summary'])]
+
+    assert sorted(asyncio.run(collect())) == [run.id for run in runs]
+
+
+def test_stream_runs_within_a_running_loop(runs):
+    # e.g. in a notebook
+    async def collect():
+        return [run.id for run, _ in stream_runs(runs, ['summary'])]
+
+    assert sorted(asyncio.run(collect())) == [run.id for run in runs]
+
+
+def test_stream_runs_raises_read_errors(tmp_path):
+    (tmp_path / 'summary.csv').mkdir()
+
+    with pytest.raises(OSError):
+        list(stream_runs([Run('broken', str(tmp_path))], ['summary']))
+
+
+def test_stream_runs_stops_with_the_consumer(runs):
+    threads = threading.active_count()
+    # more runs than the queue holds, the producer waits for the consumer
+    loaded = stream_runs(runs * 4, ['summary'], max_reads=1)
+
+    run, tables = next(loaded)
+    loaded.close()
+
+    assert 'summary' in tables
+    assert threading.active_count() == threads
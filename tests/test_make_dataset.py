@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.make_dataset import (compile_schema, finish_table, fix_year,
+                                   match_file, parse_bal)
+from src.data.schema import DEFAULT_SCHEMA, read_schema
+
+
+def _baseline_energy_zones(df):
+    # fix_year_in_energy_zones before the schema, without the files
+    df = df.drop(range(0, 745))
+    df = df.reindex(chain(range(8760, 9505), range(745, 8760)))
+    df = df.reset_index(drop=True).drop(columns='TIME')
+    df['TIME'] = df.index
+
+    return df.reindex(columns=['TIME'] +
+                      [i for i in df.columns if i != 'TIME'])
+
+
+def _baseline_cultural_e(df):
+    # fix_year_in_cultural_e before the schema, without the files
+    df = df.reindex(chain(range(8015, 8760), range(0, 8015)))
+    df = df.reset_index(drop=True).drop(columns='TIME')
+    df['TIME'] = df.index
+
+    return df.reindex(columns=['TIME'] +
+                      [i for i in df.columns if i != 'TIME'])
+
+
+def _table(rows):
+    rng = np.random.default_rng(5)
+    return pd.DataFrame({
+        'TIME': np.arange(rows, dtype=float),
+        'A': rng.normal(size=rows),
+        'B': rng.integers(0, 10, rows),
+    })
+
+
+def test_fix_year_matches_baseline():
+    schema = read_schema()['tables']
+
+    energy = _table(9505)
+    options = schema['energy_zones']
+    pd.testing.assert_frame_equal(
+        fix_year(energy, options['skip'], options['rotate']),
+        _baseline_energy_zones(energy))
+
+    cultural_e = _table(8760)
+    options = schema['cultural-e']
+    pd.testing.assert_frame_equal(
+        fix_year(cultural_e, options['skip'], options['rotate']),
+        _baseline_cultural_e(cultural_e))
+
+
+def test_fix_year_with_timestep():
+    fixed = fix_year(_table(20), skip=4, rotate=2, timestep=0.5)
+
+    np.testing.assert_allclose(fixed['TIME'], np.arange(16) * 0.5)
+    assert list(fixed.columns) == ['TIME', 'A', 'B']
+
+
+def test_read_schema_fills_defaults():
+    schema = read_schema(DEFAULT_SCHEMA)
+
+    assert schema['timestep'] == 1
+    assert schema['tables']['summary']['skip'] == 0
+    assert schema['tables']['cultural-e']['dtypes'] == {}
+    assert schema['tables']['energy_zones']['rotate'] == 745
+
+
+@pytest.mark.parametrize('table', [
+    'summary: {parser: summary}',
+    'summary: {pattern: SUMMARY.BAL, parser: xlsx}',
+])
+def test_read_schema_rejects_invalid_tables(tmp_path, table):
+    filepath = tmp_path / 'schema.yaml'
+    filepath.write_text('tables:\n  {}\n'.format(table))
+
+    with pytest.raises(ValueError):
+        read_schema(filepath)
+
+
+def test_compile_schema(tmp_path):
+    filepath = tmp_path / 'schema.yaml'
+    filepath.write_text('timestep: 0.5\n'
+                        'tables:\n'
+                        '  out:\n'
+                        '    pattern: "*.out"\n'
+                        '    parser: out\n'
+                        '    rotate: 2\n'
+                        '    dtypes: {"B*": int8}\n')
+
+    steps = compile_schema(read_schema(filepath))
+
+    assert [(s.table, s.pattern, s.parser)
+            for s in steps] == [('out', '*.out', 'out')]
+    fixed = steps[0].finish(_table(10))
+    assert fixed['B'].dtype == np.int8
+    assert fixed['TIME'].iloc[-1] == 4.5
+    # tables without warm-up or rotation keep their rows as they are
+    table = _table(10)
+    assert finish_table(table, 0, 0, 1, ()) is table
+
+
+def test_finish_table_completes_the_zones():
+    table = pd.DataFrame({
+        'TIME': [0.0, 1.0],
+        'TAIR_a': [20.0, 25.0],
+        'RELHUM_a': [50.0, 60.0],
+        'QEL_TOT': [1.0, 2.0],
+    })
+
+    finished = finish_table(table, 0, 0, 1, (), pressure=101325.0)
+
+    assert {'ABSHUM_a', 'TDEW_a', 'ENTH_a'} <= set(finished)
+    pd.testing.assert_frame_equal(finished[table.columns], table)
+    assert finish_table(table, 0, 0, 1, ()) is table
+
+
+def test_match_file(tmp_path):
+    (tmp_path / 'a.epw').touch()
+
+    assert match_file(tmp_path, '*.epw') == tmp_path / 'a.epw'
+    with pytest.raises(FileNotFoundError):
+        match_file(tmp_path, '*.BAL')
+    (tmp_path / 'b.epw').touch()
+    with pytest.raises(FileNotFoundError):
+        match_file(tmp_path, '*.epw')
+
+
+def test_parse_bal_keeps_the_zone_numbers(tmp_path):
+    bal = tmp_path / 'Energy_zone.BAL'
+    bal.write_text(' TIME | 1_B4_QHEAT | 10_B4_QHEAT | 10B4_QCOUP\n'
+                   ' h | kJ/h | kJ/h | kJ/h\n'
+                   ' 0.0000 | 1.0000E+00 | 2.0000E+00 | 3.0000E+00\n'
+                   ' 1.0000 | 4.0000E+00 | 5.0000E+00 | 6.0000E+00\n')
+
+    tables, units = parse_bal(bal)
+
+    table = tables['']
+    assert list(table.columns) == ['TIME', '1_B4_QHEAT', '10_B4_QHEAT',
+                                   '10B4_QCOUP']
+    assert units['10_B4_QHEAT'] == 'kJ/h'
+    assert table['10B4_QCOUP'].tolist() == [3, 6]
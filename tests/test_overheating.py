@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import build_catalog, query_runs
+from src.features.calendar import HOURS_IN_A_MONTH
+from src.features.overheating import (collect_overheating,
+                                      overheating_summary, run_overheating,
+                                      threshold_exceedance, tm52_criteria)
+
+
+@pytest.fixture
+def weather():
+    # a constant running mean of 20 C, the limit of category II is 27.4 C
+    return pd.DataFrame({'temp_air': np.full(8760, 20.0)})
+
+
+def test_threshold_exceedance():
+    t_op = np.array([[24.0, 27.0], [26.5, 29.0], [30.0, 20.0]])
+    occupied = np.array([[True, True], [True, True], [False, True]])
+
+    hours, degree_hours = threshold_exceedance(t_op, occupied, [25, 28], 0.5)
+
+    np.testing.assert_allclose(hours, [[0.5, 0], [1, 0.5]])
+    np.testing.assert_allclose(degree_hours, [[0.75, 0], [3, 0.5]])
+
+
+def test_tm52_criteria_of_days():
+    delta = np.array([[1.0], [2.0], [0.0], [3.0], [-1.0], [5.0]])
+    occupied = np.array([[True], [True], [True], [True], [True], [False]])
+    days = np.array([0, 0, 0, 1, 1, 1])
+
+    share, daily, largest = tm52_criteria(delta, occupied, days)
+
+    np.testing.assert_allclose(share, [60])
+    np.testing.assert_allclose(daily, [3])
+    np.testing.assert_allclose(largest, [3])
+
+
+def test_overheating_summary(weather):
+    time = np.arange(8760.0)
+    june = (time >= 5 * HOURS_IN_A_MONTH) & (time < 6 * HOURS_IN_A_MONTH)
+    data = pd.DataFrame({
+        'TIME': time,
+        'TOP_hot': np.where(june, 30.4, 24.0),
+        'TOP_cool': np.full(8760, 24.0),
+    })
+
+    summary = overheating_summary(data, weather)
+
+    assert summary.loc['hot', 'hours_above_28'] == HOURS_IN_A_MONTH
+    assert summary.loc['hot', 'degree_hours_above_25'] == pytest.approx(
+        HOURS_IN_A_MONTH * 5.4)
+    # June is a fifth of the TM52 season, 2 K above the limit all day
+    assert summary.loc['hot', 'tm52_hours_of_exceedance'] == pytest.approx(20)
+    assert summary.loc['hot', 'tm52_daily_weighted_exceedance'] == 48
+    assert summary.loc['hot', 'tm52_upper_limit_exceedance'] == 2
+    assert summary.loc['hot', 'tm52_fail']
+    assert summary.loc['cool', 'tm52_failed_criteria'] == 0
+    assert not summary.loc['cool', 'tm52_fail']
+
+
+def test_overheating_summary_of_half_hours(weather):
+    hourly = pd.DataFrame({'TIME': np.arange(8760.0), 'TOP_a': 29.0})
+    half_hourly = pd.DataFrame({'TIME': np.arange(17520) * 0.5,
+                                'TOP_a': 29.0})
+
+    pd.testing.assert_frame_equal(overheating_summary(half_hourly, weather),
+                                  overheating_summary(hourly, weather))
+
+
+def test_collect_overheating(processed_path):
+    runs = query_runs(build_catalog(processed_path), None)
+
+    summaries = collect_overheating(runs)
+
+    assert summaries.index.names == ['run', 'zone']
+    for run in runs:
+        pd.testing.assert_frame_equal(summaries.loc[run.id],
+                                      run_overheating(run.path))
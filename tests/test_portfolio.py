@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import build_catalog
+from src.features.chart_data import ENERGY_BALANCE_FIELDS
+from src.features.portfolio import (HOURS_IN_A_YEAR, PortfolioLoads,
+                                    build_portfolio, hourly_loads,
+                                    portfolio_balance, portfolio_duration,
+                                    portfolio_monthly, portfolio_peaks,
+                                    portfolio_runs, stack_loads)
+
+
+@pytest.fixture(scope='module')
+def portfolio(processed_path, tmp_path_factory):
+    # two buildings with the runs as variants, the second run of the first
+    # building processed before summary-total.csv was written
+    root = tmp_path_factory.mktemp('portfolio')
+    for building, runs in (('school', ['run_1', 'run_2']),
+                           ('office', ['run_3'])):
+        for run in runs:
+            shutil.copytree(processed_path / run, root / building / run)
+            if run == 'run_2':
+                continue
+            summary = pd.read_csv(root / building / run / 'summary.csv')
+            summary[ENERGY_BALANCE_FIELDS].sum().to_frame().T.to_csv(
+                root / building / run / 'summary-total.csv', index=False)
+
+    return build_portfolio(build_catalog(root))
+
+
+@pytest.fixture(scope='module')
+def half_hourly_path(processed_path, tmp_path_factory):
+    # a run with the same powers held for two half hours each
+    root = tmp_path_factory.mktemp('half_hourly')
+    shutil.copytree(processed_path / 'run_1', root / 'run_1')
+    data = pd.read_csv(root / 'run_1' / 'cultural-e.csv')
+    data = data.loc[data.index.repeat(2)].reset_index(drop=True)
+    data['TIME'] = np.arange(len(data)) * 0.5
+    data.to_csv(root / 'run_1' / 'cultural-e.csv', index=False)
+    return root
+
+
+@pytest.fixture
+def loads():
+    values = np.zeros((2, HOURS_IN_A_YEAR, 1))
+    values[0, 100, 0] = 4.0
+    values[0, 200, 0] = 1.0
+    values[1, 200, 0] = 3.0
+    values[1, 5000, 0] = 3.5
+    return PortfolioLoads(['a', 'b'], ['QHEAT_TOT'], values)
+
+
+def test_hourly_loads_bins_the_timesteps():
+    time = np.array([0.0, 0.5, 1.0, 1.5, 3.0, HOURS_IN_A_YEAR])
+    loads = np.array([[1.0], [3.0], [2.0], [2.0], [5.0], [9.0]])
+
+    hourly = hourly_loads(time, loads)
+
+    assert hourly.shape == (HOURS_IN_A_YEAR, 1)
+    np.testing.assert_allclose(hourly[:4, 0], [2, 2, np.nan, 5])
+
+
+def test_portfolio_runs(portfolio):
+    assert list(portfolio['building'].unique()) == ['office', 'school']
+
+    runs = portfolio_runs(portfolio, 'index != "school/run_1"')
+    assert {b: run.id for b, run in runs.items()} == {
+        'office': 'office/run_3',
+        'school': 'school/run_2'
+    }
+    with pytest.raises(ValueError, match='school'):
+        portfolio_runs(portfolio)
+
+
+def test_portfolio_peaks(loads):
+    peaks = portfolio_peaks(loads).loc['QHEAT_TOT']
+
+    assert peaks['coincident_peak'] == 4
+    assert peaks['peak_hour'] == 100
+    assert peaks['sum_of_peaks'] == 7.5
+    assert peaks['diversity_factor'] == pytest.approx(7.5 / 4)
+
+
+def test_portfolio_monthly_and_duration(loads):
+    monthly = portfolio_monthly(loads, ['QHEAT_TOT'])
+    curves = portfolio_duration(loads, 'QHEAT_TOT')
+
+    assert list(monthly.index) == list(range(12))
+    assert monthly['QHEAT_TOT'].sum() == pytest.approx(11.5)
+    assert monthly.loc[6, 'QHEAT_TOT'] == 3.5
+    assert list(curves.columns) == ['Portfolio', 'a', 'b']
+    assert list(curves['Portfolio'][:3]) == [4, 4, 3.5]
+    assert (curves.diff().iloc[1:] <= 0).all().all()
+
+
+def test_stack_loads(portfolio):
+    runs = portfolio_runs(portfolio, 'index != "school/run_2"')
+
+    loads = stack_loads(runs, ['QEL_TOT'], max_reads=1)
+
+    assert loads.buildings == ['office', 'school']
+    assert loads.values.shape == (2, HOURS_IN_A_YEAR, 1)
+    data = pd.read_csv(runs['school'].path + '/cultural-e.csv')
+    np.testing.assert_allclose(loads.values[1, :, 0],
+                               data['QEL_TOT'] / 3600)
+
+
+def test_stack_loads_of_half_hours(half_hourly_path):
+    runs = portfolio_runs(build_portfolio(build_catalog(half_hourly_path)))
+
+    loads = stack_loads(runs, ['QEL_TOT'])
+
+    data = pd.read_csv(half_hourly_path / 'run_1' / 'cultural-e.csv')
+    # the mean power of each hour keeps the energy of the year
+    assert np.nansum(loads.values) == pytest.approx(
+        data['QEL_TOT'].sum() * 0.5 / 3600)
+
+
+def test_portfolio_balance_without_building_total(portfolio):
+    new = portfolio_balance(
+        portfolio_runs(portfolio, 'index != "school/run_2"'))
+    legacy = portfolio_balance(
+        portfolio_runs(portfolio, 'index != "school/run_1"'))
+    summary = pd.read_csv(portfolio.loc['school/run_2', 'path'] +
+                          '/summary.csv')
+
+    np.testing.assert_allclose(
+        legacy.loc['school'],
+        summary[legacy.columns].sum() / 3600)
+    pd.testing.assert_series_equal(new.loc['office'], legacy.loc['office'])
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.psychrometrics import STANDARD_PRESSURE
+from src.features.psychrometrics import dew_point_from_vapor_pressure
+from src.features.psychrometrics import humidity_ratio_from_rel_hum
+from src.features.psychrometrics import moist_air_enthalpy
+from src.features.psychrometrics import rel_hum_from_humidity_ratio
+from src.features.psychrometrics import saturation_vapor_pressure
+from src.features.psychrometrics import weather_psychrometrics
+from src.features.psychrometrics import zone_psychrometrics
+
+T_DRY = np.array([-20.0, -5.0, 0.0, 0.01, 12.5, 20.0, 26.0, 40.0])
+REL_HUM = np.array([90.0, 70.0, 50.0, 100.0, 45.0, 60.0, 35.0, 20.0])
+
+
+def test_matches_psychrolib():
+    psychrolib = pytest.importorskip('psychrolib')
+    psychrolib.SetUnitSystem(psychrolib.SI)
+
+    for t_dry, rel_hum in zip(T_DRY, REL_HUM):
+        w = psychrolib.GetHumRatioFromRelHum(t_dry, rel_hum / 100,
+                                             STANDARD_PRESSURE)
+        p_vap = psychrolib.GetVapPresFromHumRatio(w, STANDARD_PRESSURE)
+        t_dew = psychrolib.GetTDewPointFromHumRatio(t_dry, w,
+                                                    STANDARD_PRESSURE)
+
+        assert saturation_vapor_pressure(t_dry) == pytest.approx(
+            psychrolib.GetSatVapPres(t_dry))
+        assert humidity_ratio_from_rel_hum(t_dry, rel_hum) == pytest.approx(w)
+        assert moist_air_enthalpy(t_dry, w) == pytest.approx(
+            psychrolib.GetMoistAirEnthalpy(t_dry, w) / 1000)
+        assert dew_point_from_vapor_pressure(p_vap) == pytest.approx(
+            t_dew, abs=1e-3)
+
+
+def test_relative_humidity_round_trip():
+    hum_ratio = humidity_ratio_from_rel_hum(T_DRY, REL_HUM)
+    np.testing.assert_allclose(rel_hum_from_humidity_ratio(T_DRY, hum_ratio),
+                               REL_HUM)
+
+
+def test_dew_point_of_saturated_air():
+    np.testing.assert_allclose(
+        dew_point_from_vapor_pressure(saturation_vapor_pressure(T_DRY)),
+        T_DRY,
+        atol=1e-3)
+
+
+def test_zone_psychrometrics_fills_the_missing_humidity():
+    data = pd.DataFrame({
+        'TIME': [0.0, 1.0],
+        'TAIR_a': [20.0, 25.0],
+        'RELHUM_a': [50.0, 60.0],
+        'TAIR_b': [20.0, 25.0],
+        'ABSHUM_b': humidity_ratio_from_rel_hum([20.0, 25.0], [50.0, 60.0]),
+        'TAIR_c': [18.0, 19.0],
+    })
+
+    result = zone_psychrometrics(data)
+
+    np.testing.assert_allclose(result['ABSHUM_a'], result['ABSHUM_b'])
+    np.testing.assert_allclose(result['RELHUM_b'], data['RELHUM_a'])
+    np.testing.assert_allclose(result['TDEW_a'], result['TDEW_b'])
+    np.testing.assert_allclose(result['ENTH_a'], result['ENTH_b'])
+    # zones without humidity are left alone
+    assert 'TDEW_c' not in result
+    assert 'TDEW_a' not in data
+
+
+def test_weather_psychrometrics_uses_the_station_pressure():
+    weather = pd.DataFrame({
+        'temp_air': [20.0, 20.0],
+        'relative_humidity': [50.0, 50.0],
+        'atmospheric_pressure': [STANDARD_PRESSURE, 90000.0],
+    })
+
+    weather_psychrometrics(weather)
+
+    assert weather['humidity_ratio'][1] > weather['humidity_ratio'][0]
+    assert weather['humidity_ratio'][0] == pytest.approx(
+        humidity_ratio_from_rel_hum(20.0, 50.0))
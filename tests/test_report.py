@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+import re
+
+import numpy as np
+import pytest
+
+mpl = pytest.importorskip('matplotlib')
+mpl.use('Agg')
+pytest.importorskip('PIL')
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from src.data.catalog import load_run_tables  # noqa: E402
+from src.visualization.report import (dense_layers,  # noqa: E402
+                                      figure_image, rasterized_layers,
+                                      report_charts, save_chart,
+                                      write_report)
+
+# first bytes of the files of each format
+SIGNATURES = {
+    'pdf': b'%PDF',
+    'svg': b'<?xml',
+    'png': b'\x89PNG',
+    'webp': b'RIFF',
+}
+
+
+@pytest.fixture
+def figure():
+    figure, ax = plt.subplots(figsize=(4, 3))
+    x = np.linspace(0, 1, 5000)
+    ax.plot(x, np.sin(x), label='dense')
+    ax.plot([0, 1], [0, 1], label='sparse')
+    ax.scatter(x, np.cos(x), s=1)
+    yield figure
+    plt.close(figure)
+
+
+@pytest.fixture(scope='module')
+def tables(processed_path):
+    tables = load_run_tables(processed_path / 'run_1')
+    # a run without weather, its charts do not need psychrochart
+    del tables['meteo']
+    return tables
+
+
+def test_dense_layers(figure):
+    dense, sparse, scatter = figure.axes[0].lines + figure.axes[0].collections
+
+    assert dense_layers(figure) == [dense, scatter]
+    # PDF files write the marker of a scatter plot once
+    assert dense_layers(figure, markers=False) == [dense]
+    assert sparse not in dense_layers(figure)
+
+
+def test_rasterized_layers_are_restored(figure):
+    dense = figure.axes[0].lines[0]
+
+    with rasterized_layers(figure, fmt='svg') as layers:
+        assert len(layers) == 2
+        assert dense.get_rasterized()
+    assert not dense.get_rasterized()
+    with rasterized_layers(figure, rasterize=False) as layers:
+        assert layers == []
+
+
+def test_figure_image(figure):
+    image = figure_image(figure, dpi=50)
+
+    assert image.size == (200, 150)
+    assert image.mode == 'RGB'
+
+
+@pytest.mark.parametrize('fmt', list(SIGNATURES))
+def test_save_chart(figure, tmp_path, fmt):
+    if fmt == 'webp':
+        features = pytest.importorskip('PIL.features')
+        if not features.check('webp'):
+            pytest.skip('Pillow without WebP support')
+    filepath = tmp_path / ('chart.' + fmt)
+
+    save_chart(figure, filepath, dpi=50, colors=16)
+
+    assert filepath.read_bytes().startswith(SIGNATURES[fmt])
+    assert not figure.axes[0].lines[0].get_rasterized()
+
+
+def test_save_chart_rejects_unknown_formats(figure, tmp_path):
+    with pytest.raises(ValueError):
+        save_chart(figure, tmp_path / 'chart.bmp')
+
+
+def test_report_charts_without_weather(tables):
+    names = [name for name, _ in report_charts(tables)]
+
+    assert 'heating_loads' in names
+    assert 'zone_energy_balance_1' in names
+    assert 'airt_heatmap_F1dayA' in names
+    for name in names:
+        assert not name.startswith(('air_temperature', 'psychrochart',
+                                    'adaptive_thermal_comfort'))
+
+
+def test_report_charts_with_weather(processed_path):
+    names = [
+        name for name, _ in report_charts(
+            load_run_tables(processed_path / 'run_1'))
+    ]
+
+    assert 'air_temperature' in names
+    assert 'adaptive_thermal_comfort' in names
+    assert 'psychrochart_F1dayA' in names
+
+
+def test_write_report(tables, tmp_path):
+    pytest.importorskip('seaborn')
+    filepath = tmp_path / 'report.pdf'
+
+    write_report(tables, filepath, dpi=30, title='run_1')
+
+    pages = re.findall(rb'/Type /Page\b(?!s)', filepath.read_bytes())
+    assert len(pages) == len(report_charts(tables))
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import build_catalog, query_runs
+from src.features.sensitivity import collect_kpis, compute_kpis, correlation
+from src.features.sensitivity import elementary_effects, run_kpis
+from src.features.sensitivity import standardized_regression_coefficients
+
+
+@pytest.fixture
+def grid():
+    # full factorial design of two parameters and a constant one
+    x1, x2 = np.array(list(itertools.product([1, 2, 3], [0, 1, 2, 5]))).T
+    inputs = pd.DataFrame({'IN_A': x1, 'IN_B': x2, 'IN_C': 7.0},
+                          index=['r{}'.format(n) for n in range(len(x1))])
+    kpis = pd.DataFrame({'linear': 3 * x1 - 2 * x2, 'square': x2**2},
+                        index=inputs.index)
+    return inputs, kpis
+
+
+def test_compute_kpis_integrates_over_the_timestep():
+    data = pd.DataFrame({
+        'TIME': np.arange(48) * 0.5,
+        'QHEAT_TOT': np.full(48, 3600.0),
+        'QEL_TOT': np.r_[np.full(47, 100.0), 500.0],
+    })
+
+    kpis = compute_kpis(data)
+
+    assert kpis['QHEAT_TOT'] == pytest.approx(24 * 3600)
+    assert kpis['PEAK_QEL_TOT'] == 500
+    assert 'DISCOMFORT_HOURS' not in kpis
+
+
+def test_collect_kpis_matches_run_kpis(processed_path):
+    runs = query_runs(build_catalog(processed_path), None)
+
+    kpis = collect_kpis(runs)
+
+    assert list(kpis.index) == [run.id for run in runs]
+    for run in runs:
+        pd.testing.assert_series_equal(kpis.loc[run.id],
+                                       run_kpis(run.path),
+                                       check_names=False)
+    assert (kpis['DISCOMFORT_HOURS'] >= 0).all()
+
+
+def test_correlation(grid):
+    inputs, kpis = grid
+
+    result = correlation(inputs, kpis)
+
+    # constant parameters are dropped
+    assert list(result.index) == ['IN_A', 'IN_B']
+    expected = pd.concat([inputs, kpis], axis=1).corr()
+    np.testing.assert_allclose(result,
+                               expected.loc[result.index, result.columns],
+                               atol=1e-12)
+
+
+def test_standardized_regression_coefficients(grid):
+    inputs, kpis = grid
+
+    result = standardized_regression_coefficients(inputs, kpis)
+
+    std = inputs.std()
+    expected = [3 * std['IN_A'], -2 * std['IN_B']] / kpis['linear'].std()
+    np.testing.assert_allclose(result['linear'], expected)
+
+
+def test_elementary_effects(grid):
+    inputs, kpis = grid
+
+    mu_star, sigma = elementary_effects(inputs, kpis)
+
+    # effects scaled by the range of the parameter
+    assert mu_star.loc['IN_A', 'linear'] == pytest.approx(3 * 2)
+    assert mu_star.loc['IN_B', 'linear'] == pytest.approx(2 * 5)
+    assert sigma.loc['IN_A', 'linear'] == pytest.approx(0)
+    assert mu_star.loc['IN_A', 'square'] == pytest.approx(0)
+    assert sigma.loc['IN_B', 'square'] > 0
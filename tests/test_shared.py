@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+import subprocess
+import sys
+import uuid
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.catalog import Run, load_run_tables
+from src.data.shared import (_create_block, _write_json, attach_run,
+                             block_name, detach_run, load_run,
+                             load_run_columns, publish_run, unlink_blocks)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@pytest.fixture
+def published():
+    run_id = 'test/' + uuid.uuid4().hex
+    tables = {
+        'cultural-e': pd.DataFrame({
+            'TIME': np.arange(5),
+            'TOP_a': np.linspace(20, 24, 5),
+            'OCC_a': np.array([0, 1, 1, 0, 1], dtype='int8'),
+            'label': list('abcde'),
+        }),
+        'summary': pd.DataFrame({'Zonenr': [1, 2], 'QHEAT': [1.5, 2.5]}),
+    }
+    blocks = publish_run(run_id, tables)
+    yield run_id, tables
+    unlink_blocks(blocks)
+
+
+def test_publish_attach_round_trip(published):
+    run_id, tables = published
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        attached = attach_run(run_id)
+    try:
+        assert list(attached) == list(tables)
+        for name, df in tables.items():
+            numeric = df.select_dtypes('number')
+            pd.testing.assert_frame_equal(attached[name][numeric.columns],
+                                          numeric)
+        # float columns come first and view the shared memory
+        assert list(attached['cultural-e'].columns) == ['TOP_a', 'TIME',
+                                                        'OCC_a']
+        with pytest.raises(ValueError):
+            attached['cultural-e']['TOP_a'].to_numpy()[0] = 0
+        assert not attached['cultural-e']['TOP_a'].to_numpy().flags.writeable
+    finally:
+        detach_run(run_id)
+
+
+def test_attach_from_another_process(published):
+    run_id, tables = published
+    code = ('from src.data.shared import attach_run; '
+            'print(attach_run({!r})["summary"]["QHEAT"].sum())'.format(run_id))
+
+    result = subprocess.run([sys.executable, '-c', code],
+                            cwd=ROOT,
+                            capture_output=True,
+                            text=True,
+                            check=True)
+
+    assert float(result.stdout) == tables['summary']['QHEAT'].sum()
+
+
+def test_publish_over_a_running_server(published):
+    run_id, tables = published
+
+    # the blocks of this process are not replaced
+    with pytest.raises(FileExistsError, match='running process'):
+        publish_run(run_id, tables)
+    assert attach_run(run_id)['summary']['QHEAT'].sum() == 4
+    detach_run(run_id)
+
+
+def test_publish_over_a_stale_server():
+    run_id = 'test/' + uuid.uuid4().hex
+    dead = subprocess.run(
+        [sys.executable, '-c', 'import os; print(os.getpid())'],
+        capture_output=True,
+        text=True,
+        check=True)
+    # the blocks of a server that did not shut down cleanly
+    stale = [
+        _write_json(block_name(run_id), {
+            'pid': int(dead.stdout),
+            'tables': {
+                'summary': {
+                    'block': block_name(run_id, 0)
+                }
+            }
+        }),
+        _create_block(block_name(run_id, 0), 8),
+    ]
+    for block in stale:
+        block.close()
+    tables = {'summary': pd.DataFrame({'QHEAT': [1.5, 2.5]})}
+
+    blocks = publish_run(run_id, tables)
+    try:
+        attached = attach_run(run_id)
+        assert list(attached['summary']['QHEAT']) == [1.5, 2.5]
+        detach_run(run_id)
+    finally:
+        unlink_blocks(blocks)
+
+
+def test_attach_unpublished_run():
+    with pytest.raises(FileNotFoundError):
+        attach_run('test/' + uuid.uuid4().hex)
+
+
+def test_load_run_without_server(processed_path):
+    path = processed_path / 'run_1'
+    run = Run('test/' + uuid.uuid4().hex, str(path))
+
+    tables = load_run(run)
+    expected = load_run_tables(path)
+    assert set(tables) == set(expected)
+    pd.testing.assert_frame_equal(
+        load_run_columns(run, 'cultural-e', ['TIME', 'TOP_F1dayA']),
+        expected['cultural-e'][['TIME', 'TOP_F1dayA']])
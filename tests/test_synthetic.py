@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+import filecmp
+from pathlib import Path
+
+from click.testing import CliRunner
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+from src.data import make_dataset
+from src.data.make_dataset import parse_bal
+from src.data.synthetic import (RUN_FILES, WARMUP_HOURS, generate_runs, main,
+                                write_schema, zone_names)
+from src.data.weather_store import WEATHER_STORE, file_digest, weather_file
+
+
+@pytest.fixture(scope='module')
+def raw_path(tmp_path_factory):
+    '''
+    Raw files of three small synthetic runs sharing two climates.
+    '''
+    folder = tmp_path_factory.mktemp('raw')
+    list(generate_runs(folder, runs=3, zones=3, climates=2))
+    return folder
+
+
+@pytest.fixture(scope='module')
+def synthetic_path(raw_path, tmp_path_factory):
+    '''
+    The synthetic runs of raw_path processed by make_dataset, with the schema
+    they were written with.
+    '''
+    folder = tmp_path_factory.mktemp('synthetic')
+    result = CliRunner().invoke(make_dataset.main, [
+        str(raw_path),
+        str(folder), '--schema',
+        str(raw_path / 'schema.yaml')
+    ])
+    assert result.exit_code == 0, result.output
+    return folder
+
+
+def _run_files(folder):
+    return sorted(p.relative_to(folder) for p in folder.rglob('*')
+                  if p.is_file())
+
+
+def test_same_seed_same_files(raw_path, tmp_path):
+    list(generate_runs(tmp_path / 'a', runs=3, zones=3, climates=2))
+    list(generate_runs(tmp_path / 'b', runs=1, zones=3, seed=1))
+
+    files = _run_files(raw_path)
+    assert files == _run_files(tmp_path / 'a')
+    _, mismatch, errors = filecmp.cmpfiles(raw_path, tmp_path / 'a', files,
+                                           shallow=False)
+    assert mismatch == errors == []
+    bal = Path('run_1') / RUN_FILES['energy_zones']
+    assert not filecmp.cmp(raw_path / bal, tmp_path / 'b' / bal,
+                           shallow=False)
+
+
+def test_processed_runs_are_valid(synthetic_path):
+    for run in ['run_1', 'run_2', 'run_3']:
+        validation = pd.read_csv(synthetic_path / run / 'validation.csv')
+        assert len(validation) > 0
+        assert not validation['failed'].any()
+
+
+def test_processed_columns_metadata(synthetic_path):
+    run = synthetic_path / 'run_1'
+    columns = pd.read_csv(run / 'columns.csv')
+    with open(run / 'cultural-e.csv', 'r') as f:
+        header = f.readline().rstrip('\n').split(',')
+
+    # the columns as written, repeated names included
+    listed = columns.loc[columns['table'] == 'cultural-e', 'column']
+    assert list(listed) == header
+    assert any(c.startswith('TDEW_') for c in header)
+    assert 'humidity_ratio' in set(
+        columns.loc[columns['table'] == 'meteo', 'column'])
+
+
+def test_processed_runs_share_their_climates(raw_path, synthetic_path):
+    # three runs over two climates
+    store = synthetic_path / WEATHER_STORE
+    assert len(list(store.glob('*.epw'))) == 2
+    assert len(list(store.glob('*.csv'))) == 2
+    for run in ['run_1', 'run_2', 'run_3']:
+        raw = next((raw_path / run).glob('*.epw'))
+        assert weather_file(synthetic_path / run).stem == file_digest(raw)
+
+
+@pytest.mark.parametrize('timestep', [1, 0.5, 0.25])
+def test_schema_skips_the_warm_up(tmp_path, timestep):
+    write_schema(tmp_path, timestep)
+    with open(tmp_path / 'schema.yaml', 'r') as f:
+        schema = yaml.safe_load(f)
+
+    assert schema['timestep'] == timestep
+    rows = [
+        table[field] for table in schema['tables'].values()
+        for field in ['skip', 'rotate'] if field in table
+    ]
+    assert rows and set(rows) == {round(WARMUP_HOURS / timestep)}
+
+
+def test_zone_names_without_zeros():
+    names = zone_names(90)
+
+    assert len(set(names)) == 90
+    assert not any('0' in name for name in names)
+    assert names[:2] == ['F1dayA1', 'F1nightA2']
+
+
+def test_parse_bal_of_synthetic_runs(tmp_path):
+    run, = generate_runs(tmp_path, zones=10)
+
+    tables, units = parse_bal(run / RUN_FILES['energy_zones'])
+    table = tables['']
+
+    assert '10_B4_QHEAT' in table
+    assert '1_B4_QHEAT' in table
+    assert list(units) == list(table.columns)
+    np.testing.assert_allclose(np.diff(table['TIME'][:3]), 1)
+
+
+def test_main_rejects_timestep_not_dividing_an_hour(tmp_path):
+    result = CliRunner().invoke(main, [str(tmp_path), '--timestep', '0.4'])
+
+    assert result.exit_code != 0
+    assert 'must divide an hour' in result.output
+    assert not (tmp_path / 'schema.yaml').exists()
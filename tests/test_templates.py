@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+mpl = pytest.importorskip('matplotlib')
+mpl.use('Agg')
+
+import matplotlib.pyplot as plt  # noqa: E402
+
+from src.visualization.templates import (ChartTemplate,  # noqa: E402
+                                         chart_template)
+
+
+def _setup(template):
+    template.axes.set_xlabel('static label')
+    template.axes.axhline(0, color='black')
+
+
+def _render(template, values, key='line'):
+    with template.render():
+        line = template.artist(
+            key, lambda: _create(template, values),
+            lambda line: line.set_data(range(len(values)), values))
+        template.axes.scatter(range(len(values)), values, label='points')
+        template.legend(template.axes)
+    return line
+
+
+def _create(template, values):
+    line, = template.axes.plot(range(len(values)), values, label='line')
+    return line, [line]
+
+
+def test_chart_template_is_built_once():
+    template = chart_template('test_built_once', _setup)
+
+    assert chart_template('test_built_once', _setup) is template
+    plt.close(template.figure)
+    assert chart_template('test_built_once', _setup) is not template
+
+
+def test_renders_replace_the_data_only():
+    template = ChartTemplate(_setup)
+    static = set(template.axes.get_children())
+
+    first = _render(template, [1, 2, 3])
+    second = _render(template, [3, 2, 1, 0])
+
+    # the line is updated in place, the scatter drawn again
+    assert second is first
+    assert list(second.get_ydata()) == [3, 2, 1, 0]
+    assert len(template.axes.collections) == 1
+    assert static <= set(template.axes.get_children())
+    assert template.axes.get_xlabel() == 'static label'
+    # the limits follow the data of the last render
+    assert template.axes.get_xlim()[1] >= 3
+    legend = template.axes.get_legend()
+    assert [t.get_text() for t in legend.get_texts()] == ['line', 'points']
+    plt.close(template.figure)
+
+
+def test_artists_not_drawn_again_are_removed():
+    template = ChartTemplate(_setup)
+
+    line = _render(template, [1, 2, 3], key='first')
+    _render(template, [1, 2, 3], key='second')
+
+    assert line not in template.axes.lines
+    assert len(template.axes.lines) == 2
+    plt.close(template.figure)
+
+
+def test_scratch_axes_are_cleared():
+    template = ChartTemplate(ncols=2)
+    template.axes, scratch = template.axes
+    template.scratch.append(scratch)
+
+    for n in range(2):
+        with template.render():
+            scratch.plot([0, 1], [n, n])
+
+    assert len(scratch.lines) == 1
+    plt.close(template.figure)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.make_dataset import write_columns_metadata
+from src.features.units import (UnitTable, conversion_factor,
+                                convert_columns, infer_unit,
+                                integrated_units, read_units)
+
+
+def test_conversion_factor():
+    assert conversion_factor('kJ', 'kJ') == 1
+    assert conversion_factor('kJ/h', 'W') == pytest.approx(1 / 3.6)
+    assert conversion_factor('kWh', 'kJ') == pytest.approx(3600)
+    with pytest.raises(ValueError):
+        conversion_factor('kJ', 'C')
+
+
+def test_infer_unit():
+    assert infer_unit('TIME') == 'h'
+    assert infer_unit('TOP_F1dayA1') == 'C'
+    assert infer_unit('QHEAT_TOT') == 'kJ/h'
+    assert infer_unit('12_B4_QTRANS') == 'kJ/h'
+    assert infer_unit('label') == '-'
+
+
+def test_integrated_units():
+    units = integrated_units(['QHEAT_TOT', 'TOP_a', 'P'], {'P': 'kW'})
+    assert units == {'QHEAT_TOT': 'kJ', 'TOP_a': 'C', 'P': 'kWh'}
+
+
+def test_convert_columns():
+    data = pd.DataFrame({'QHEAT_TOT': [3600.0, 7200.0], 'P': [1.0, 2.0]})
+
+    values = convert_columns(data, ['QHEAT_TOT', 'P'], 'kW', {'P': 'W'})
+
+    np.testing.assert_allclose(values, [[1, 0.001], [2, 0.002]])
+
+
+def test_unit_table_caches_the_conversions():
+    data = pd.DataFrame({'QHEAT_TOT': [3600.0, 7200.0]})
+    table = UnitTable(data, parameters={'IN_GFA': 100.0, 'IN_NIA': 80.0})
+
+    values = table.get(['QHEAT_TOT'], 'kW')
+    assert table.get(['QHEAT_TOT'], 'kW') is values
+    assert not values.flags.writeable
+    np.testing.assert_allclose(table.get(['QHEAT_TOT'], 'kW', 'NIA'),
+                               [[1 / 80], [2 / 80]])
+
+
+def test_read_units(tmp_path):
+    tables = {
+        'summary': ['Zonenr', 'QHEAT'],
+        'summary-total': ['Zonenr', 'QHEAT'],
+        'energy_zones': ['TIME', '1_B4_QHEAT', '1B4_QCOUP'],
+        'cultural-e': ['TIME', 'TOP_a'],
+        'meteo': ['temp_air'],
+    }
+    write_columns_metadata(
+        str(tmp_path),
+        {table: pd.DataFrame(columns=c) for table, c in tables.items()},
+        {'energy_zones': {'1B4_QCOUP': 'kJ'}})
+
+    units = read_units(tmp_path / 'columns.csv', 'energy_zones')
+
+    assert units == {'TIME': 'h', '1_B4_QHEAT': 'kJ/h', '1B4_QCOUP': 'kJ'}
+    assert read_units(tmp_path / 'columns.csv', 'cultural-e')['TOP_a'] == 'C'
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.schema import read_schema
+from src.data.validation import (BALANCE_TERMS, REPORT_COLUMNS,
+                                 balance_closure, seam_jumps, summary_totals,
+                                 validate_run, zone_balance_columns)
+
+
+@pytest.fixture(scope='module')
+def parsed():
+    # tables of a run of three zones as parsed by make_dataset, before fixing
+    # the year: yearly cycles with the warm-up of the default schema
+    schema = read_schema()
+    rows = schema['tables']['energy_zones']['skip'] + 8760
+    phase = 2 * np.pi * np.arange(rows) / 8760
+
+    energy = pd.DataFrame({'TIME': np.arange(rows, dtype=float),
+                           'REL_BAL_ENERGY': 0.0})
+    summary = pd.DataFrame({'Zonenr': [1, 2, 3], 'Rel_BAL': 0.0})
+    for zone in [1, 2, 3]:
+        balance = 0
+        for n, (term, (name, sign)) in enumerate(BALANCE_TERMS.items()):
+            column = '{}{}B4_{}'.format(zone, '' if term == 'QCOUP' else '_',
+                                        term)
+            energy[column] = 100 * zone * (1.5 + np.sin(phase + n))
+            balance = balance + sign * energy[column]
+            summary.loc[zone - 1, name] = energy[column].sum()
+        energy['{}_B4_QBAL'.format(zone)] = balance
+        summary.loc[zone - 1, 'BAL_ENERGY'] = balance.sum()
+
+    cultural_e = pd.DataFrame({'TIME': np.arange(1.0, 8761.0),
+                               'TOP_a': 22 + 4 * np.sin(phase[:8760])})
+
+    return {
+        'energy_zones': energy,
+        'summary': summary,
+        'cultural-e': cultural_e,
+    }, schema
+
+
+def test_zone_balance_columns():
+    columns = ['TIME', '2_B4_QHEAT', '1_B4_QHEAT', '1B4_QCOUP', '1_B4_QBAL']
+
+    zones, positions = zone_balance_columns(columns)
+
+    assert zones == [1, 2]
+    assert positions.shape == (2, 12)
+    assert positions[0, 1] == 2 and positions[0, 5] == 3
+    assert positions[0, -1] == 4 and positions[1, -1] == -1
+
+
+def test_validate_run_passes_on_consistent_tables(parsed):
+    tables, schema = parsed
+
+    report = validate_run(tables, schema)
+
+    assert list(report.columns) == REPORT_COLUMNS
+    assert {'missing_values', 'seam_jump', 'balance_closure',
+            'summary_totals'} <= set(report['check'])
+    assert (report['failed'] == 0).all()
+
+
+def test_balance_closure_finds_the_zone(parsed):
+    energy = parsed[0]['energy_zones'].copy()
+    energy.loc[100, '2_B4_QHEAT'] += 1e+04
+
+    closure = balance_closure(energy)
+
+    assert list(closure.index[closure['failed']]) == [2]
+
+
+def test_summary_totals_find_the_term(parsed):
+    tables = parsed[0]
+    summary = tables['summary'].copy()
+    summary.loc[summary['Zonenr'] == 3, 'QINF'] *= 1.5
+
+    deviation = summary_totals(tables['energy_zones'], summary)
+
+    assert deviation.stack().idxmax() == (3, 'QINF')
+    assert (deviation.drop(index=3) < 1e-2).all().all()
+
+
+def test_summary_totals_of_half_hours():
+    energy = pd.DataFrame({
+        'TIME': [0.0, 0.5, 1.0, 1.5],
+        '1_B4_QHEAT': [2.0, 2.0, 4.0, 4.0],
+    })
+    summary = pd.DataFrame({'Zonenr': [1], 'QHEAT': [6.0]})
+
+    assert summary_totals(energy, summary).loc[1, 'QHEAT'] == 0
+    assert summary_totals(energy, summary, 1).loc[1, 'QHEAT'] == 1
+
+
+def test_seam_jumps():
+    # a yearly cycle joins at the seam, another period does not
+    hours = np.arange(8760 + 100)
+    df = pd.DataFrame({
+        'TIME': hours,
+        'smooth': np.sin(2 * np.pi * hours / 8760),
+        'jump': np.sin(2 * np.pi * hours / 5000),
+    })
+
+    ratio = seam_jumps(df, skip=100)
+
+    assert ratio['smooth'] < 1
+    assert ratio['jump'] > 1
+    assert 'TIME' not in ratio
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.calendar import season_mask
+from src.features.windows import day_window, hour_window
+
+mpl = pytest.importorskip('matplotlib')
+mpl.use('Agg')
+
+from src.visualization import visualize  # noqa: E402
+from src.visualization.templates import chart_template  # noqa: E402
+
+
+@pytest.fixture
+def weather():
+    hours = np.arange(8760)
+    return pd.DataFrame(
+        {'temp_air': 12 - 10 * np.cos(2 * np.pi * hours / 8760)})
+
+
+@pytest.fixture
+def sun():
+    # a clear sky with the sun from 6 to 18
+    hours = np.arange(8760)
+    return pd.DataFrame({
+        'ghi': np.clip(800 * np.sin(np.pi * (hours % 24 - 6) / 12), 0, None)
+    })
+
+
+@pytest.fixture
+def zones():
+    rng = np.random.default_rng(1)
+    return pd.DataFrame({
+        'TIME': np.arange(8760.0),
+        'TOP_a': rng.normal(24, 2, 8760),
+        'TOP_b': rng.normal(22, 3, 8760),
+        'OCC_b': rng.integers(0, 2, 8760),
+    })
+
+
+def test_adaptive_thermal_comfort_density(zones, weather):
+    visualize.adaptive_thermal_comfort(zones,
+                                       weather,
+                                       mode='density',
+                                       season='summer')
+
+    images = chart_template('adaptive_thermal_comfort').axes.get_images()
+    summer = season_mask(zones['TIME'], 'summer')
+    occupied = summer.sum() + (summer & (zones['OCC_b'] > 0)).sum()
+    # a single layer with every occupied hour of both zones
+    assert len(images) == 1
+    assert images[0].get_array().sum() == occupied
+
+
+def test_adaptive_thermal_comfort_density_without_occupancy(zones, weather):
+    zones.loc[:2, 'OCC_b'] = 0
+
+    visualize.adaptive_thermal_comfort(zones,
+                                       weather,
+                                       zones=['b'],
+                                       mode='density',
+                                       window=hour_window(0, 3))
+
+    images = chart_template('adaptive_thermal_comfort').axes.get_images()
+    assert len(images) == 1
+    assert images[0].get_array().count() == 0
+
+
+def test_adaptive_thermal_comfort_scatter(zones, weather):
+    visualize.adaptive_thermal_comfort(zones, weather, zones=['a'])
+
+    axes = chart_template('adaptive_thermal_comfort').axes
+    points = [
+        len(c.get_offsets()) for c in axes.collections
+        if isinstance(c, mpl.collections.PathCollection)
+    ]
+    assert not axes.get_images()
+    assert points == [8760]
+
+
+def test_unrecognized_mode(zones, weather):
+    with pytest.raises(ValueError):
+        visualize.adaptive_thermal_comfort(zones, weather, mode='hexbin')
+
+
+def test_heatmap_of_a_window(zones):
+    pytest.importorskip('seaborn')
+    zones['TAIR_a'] = zones['TOP_a']
+
+    visualize.airt_heatmap(zones, 'a', day_window(10, 7))
+
+    axes = chart_template('airt_heatmap').axes
+    mesh = axes.collections[0]
+    # one column per day of the window, one row per hour
+    assert mesh.get_array().shape == (24, 7)
+    assert axes.get_title() == (
+        'Hourly mapping of internal temperatures - a - Days 11-17')
+
+
+@pytest.mark.parametrize('window', [hour_window(0, 5), hour_window(12, 13)])
+def test_horizontal_irradiance_of_a_window(sun, window):
+    visualize.horizontal_irradiance(sun, window)
+
+    axes = chart_template('horizontal_irradiance').axes
+    heights = [p.get_height() for p in axes.patches]
+    # the bins of the whole year, with the sunny hours of the window
+    assert len(heights) == 32
+    assert sum(heights) == (window.start == 12)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from pathlib import Path
+import shutil
+
+import numpy as np
+import pytest
+
+from src.data.catalog import table_file
+from src.data.weather_store import (WEATHER_STORE, file_digest,
+                                    read_run_weather, read_weather,
+                                    read_weather_records, store_weather,
+                                    weather_file, write_reference)
+from src.features.psychrometrics import weather_psychrometrics
+
+LEGACY_RUN = Path(__file__).resolve().parents[1] / 'data' / 'processed'
+RAW_WEATHER = (Path(__file__).resolve().parents[1] / 'data' / 'raw' /
+               'Bolzano-metenorm-extreme.epw')
+
+
+@pytest.fixture(scope='module')
+def stored_path(processed_path, tmp_path_factory):
+    '''
+    The processed runs referencing their weather file in the store as
+    make_dataset does, the second one with a copy 2 C warmer.
+    '''
+    folder = tmp_path_factory.mktemp('stored')
+    store = folder / WEATHER_STORE
+    for run in ['run_1', 'run_2', 'run_3']:
+        shutil.copytree(processed_path / run, folder / run)
+        src = folder / run / 'meteo.epw'
+        if run == 'run_2':
+            lines = src.read_text().splitlines(keepends=True)
+            for n, line in enumerate(lines[8:], 8):
+                fields = line.split(',')
+                fields[6] = '{:.1f}'.format(float(fields[6]) + 2)
+                lines[n] = ','.join(fields)
+            src.write_text(''.join(lines))
+        write_reference(folder / run, store_weather(src, store), store)
+        src.unlink()
+    return folder
+
+
+def test_runs_share_their_weather_files(stored_path):
+    store = stored_path / WEATHER_STORE
+
+    # three runs over two climates
+    assert len(list(store.glob('*.epw'))) == 2
+    assert weather_file(stored_path / 'run_1').resolve() == weather_file(
+        stored_path / 'run_3').resolve()
+    assert weather_file(stored_path / 'run_1').stem == file_digest(
+        RAW_WEATHER)
+    for run in ['run_1', 'run_2', 'run_3']:
+        stored = weather_file(stored_path / run)
+        assert stored.parent.resolve() == store.resolve()
+        assert stored.exists()
+
+
+def test_store_weather_once(tmp_path):
+    digest = store_weather(RAW_WEATHER, tmp_path)
+    assert store_weather(RAW_WEATHER, tmp_path) == digest
+
+    assert [p.name for p in tmp_path.iterdir()] == [digest + '.epw']
+    assert (tmp_path / (digest + '.epw')).read_bytes() == \
+        RAW_WEATHER.read_bytes()
+
+
+def test_moved_runs_keep_their_weather(stored_path, tmp_path):
+    moved = tmp_path / 'moved'
+    shutil.copytree(stored_path, moved)
+
+    weather, _ = read_run_weather(moved / 'run_2')
+
+    assert weather_file(moved / 'run_2').resolve().is_relative_to(moved)
+    assert len(weather) == 8760
+
+
+def test_weather_is_parsed_once(stored_path):
+    first, metadata = read_weather(weather_file(stored_path / 'run_1'))
+    second, _ = read_run_weather(stored_path / 'run_3')
+
+    assert np.shares_memory(first['temp_air'].to_numpy(),
+                            second['temp_air'].to_numpy())
+    # the shared records are not affected by new columns
+    first['extra'] = 1
+    assert 'extra' not in second
+    assert 'latitude' in metadata
+
+
+def test_legacy_run_derives_its_meteo():
+    filepath = table_file(LEGACY_RUN, 'meteo')
+
+    records = read_weather_records(filepath)
+
+    assert filepath == LEGACY_RUN / 'meteo.epw'
+    expected = weather_psychrometrics(read_weather(filepath)[0].copy())
+    np.testing.assert_allclose(records['humidity_ratio'],
+                               expected['humidity_ratio'])
+    assert records['enthalpy'].notna().all()
+    with pytest.raises(FileNotFoundError):
+        read_weather_records(LEGACY_RUN / 'meteo.csv')
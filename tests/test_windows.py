@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.calendar import HOURS_IN_A_MONTH
+from src.features.windows import (Window, detect_events, month_window,
+                                  parse_window, rolling_sums, select_window)
+
+
+@pytest.fixture
+def data():
+    time = np.arange(8760.0)
+    heating = np.zeros(8760)
+    heating[24 * 40:24 * 47] = 1.0
+    heating[24 * 44] = 5.0
+    cooling = np.zeros(8760)
+    cooling[24 * 200:24 * 207] = 2.0
+    t_op = np.full(8760, 22.0)
+    t_op[24 * 180 + 15] = 35.0
+    return pd.DataFrame({
+        'TIME': time,
+        'SQHEAT_1': heating,
+        'SQCOOL_1': cooling,
+        'TOP_a': t_op,
+    })
+
+
+def test_parse_window():
+    assert parse_window(None) is None
+    assert parse_window('march') == month_window(2)
+    assert parse_window('100-200') == Window(100, 200, 'Hours 100-200')
+    assert parse_window('8000-').stop is None
+    with pytest.raises(ValueError):
+        parse_window('tomorrow')
+    with pytest.raises(ValueError):
+        parse_window('peak_heating_week')
+
+
+def test_month_window():
+    assert month_window('February') == Window(HOURS_IN_A_MONTH,
+                                              2 * HOURS_IN_A_MONTH,
+                                              'February')
+    # the last month takes the remaining hours
+    assert month_window(11).stop is None
+
+
+def test_select_window_is_a_view(data):
+    rows = select_window(data, Window(24, 48, 'Day 2'))
+
+    assert list(rows['TIME']) == list(range(24, 48))
+    assert np.shares_memory(rows['SQHEAT_1'].to_numpy(),
+                            data['SQHEAT_1'].to_numpy())
+    assert select_window(data) is data
+
+
+def test_select_window_of_weather():
+    weather = pd.DataFrame({'temp_air': np.arange(8760.0)})
+
+    rows = select_window(weather, Window(8750, None, 'end'))
+
+    assert list(rows['temp_air']) == list(range(8750, 8760))
+
+
+def test_rolling_sums():
+    values = np.arange(10.0)
+    np.testing.assert_allclose(rolling_sums(values, 3),
+                               np.convolve(values, np.ones(3), 'valid'))
+
+
+def test_detect_events(data):
+    events = detect_events(data)
+
+    assert events['peak_heating_week'].start == 24 * 40
+    assert events['peak_heating_week'].stop == 24 * 47
+    assert events['peak_cooling_week'].start == 24 * 200
+    assert events['max_overheating_day'] == Window(24 * 180, 24 * 181,
+                                                   'Max overheating day')
+    assert parse_window('peak_cooling_week', data) == \
+        events['peak_cooling_week']